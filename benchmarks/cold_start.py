@@ -0,0 +1,78 @@
+"""Cold-start import time of the Streamlit apps' module-level imports
+
+Run from the repository root:
+
+    python -m benchmarks.cold_start [streamlit_app.py ...]
+
+Each measurement runs the app's top-level import statements in a fresh
+interpreter, so nothing is shared between runs, and lists the heavy
+libraries that those imports pulled in (they should load lazily, when a
+feature first needs them). The same is measured for importing streamlit
+and pandas alone, the floor every app pays; the difference is what the
+app's own modules add. The machine (Python, CPUs, load average) and every
+raw timing are printed too, as a busy machine inflates all of them.
+"""
+import ast
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+DEFAULT_APPS = ["streamlit_app.py", "streamlit_app_gps.py"]
+# Imports every app needs whatever its own modules do
+FLOOR_IMPORTS = "import streamlit\nimport pandas"
+HEAVY_MODULES = ["geopandas", "matplotlib", "shapely", "scipy", "rapidfuzz", "docx"]
+RUNS = 5
+
+# Target for the UI shell: imports done and the first element on screen
+BUDGET_SECONDS = 1.0
+
+MEASURE = """
+import sys, time
+started = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - started
+print(elapsed, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def top_level_imports(app):
+    """Source of the module-level import statements of an app script"""
+    with open(app) as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+def measure(imports, runs=RUNS):
+    """Return (import times in seconds, heavy modules loaded) over fresh interpreters"""
+    code = MEASURE.format(imports=imports, heavy=HEAVY_MODULES)
+    times, loaded = [], ""
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        fields = output.split()
+        times.append(float(fields[0]))
+        loaded = fields[1] if len(fields) > 1 else ""
+    return times, loaded
+
+def main(apps):
+    load = ", ".join(f"{value:.2f}" for value in os.getloadavg()) if hasattr(os, "getloadavg") else "n/a"
+    print(f"Python {platform.python_version()}, {os.cpu_count()} CPU(s), load average {load}, {RUNS} runs each")
+
+    floor_times, _ = measure(FLOOR_IMPORTS)
+    floor = statistics.median(floor_times)
+    print(f"{'imports':<24}{'median':>9}{'max':>9}{'app modules':>13}  heavy modules loaded")
+    print(f"{'streamlit + pandas':<24}{floor:>8.2f}s{max(floor_times):>8.2f}s{'-':>13}  -")
+    rows = [("streamlit + pandas", floor_times)]
+    for app in apps:
+        times, loaded = measure(top_level_imports(app))
+        median = statistics.median(times)
+        flag = "" if median < BUDGET_SECONDS else f"  (over the {BUDGET_SECONDS:.1f}s budget)"
+        print(f"{app:<24}{median:>8.2f}s{max(times):>8.2f}s{median - floor:>12.2f}s  {loaded or '-'}{flag}")
+        rows.append((app, times))
+
+    print("raw timings (s):")
+    for name, times in rows:
+        print(f"  {name:<22}" + " ".join(f"{t:.3f}" for t in times))
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or DEFAULT_APPS)
@@ -0,0 +1,97 @@
+"""Memory footprint of the extracted submission frame: compact layout vs the previous one
+
+Run from the repository root:
+
+    python -m benchmarks.memory [--sizes real,100k]
+
+"real" is the largest submission workbook in the repository; 10k, 100k and
+1M are synthetic exports (benchmarks.synthetic). For each dataset the deep
+memory usage is printed for the raw workbook frame with every column (what
+ingestion used to read and hold during extraction), the raw frame with
+only the columns extraction reads, and the extracted frame in the previous
+layout (text columns, float64 coordinates, the raw GPS text) and in the
+compact one, followed by a per-column comparison of the two layouts.
+"""
+import argparse
+import glob
+import os
+
+import pandas as pd
+
+from benchmarks.synthetic import SIZES, load_seed, synthetic_export
+from sbd.extract import SOURCE_COLUMNS, extract_gps_data_from_excel, find_qr_column
+
+# Dtypes of the extracted frame before the compact layout
+PREVIOUS_TEXT_COLUMNS = ["District", "PHU", "Community"]
+PREVIOUS_DTYPES = {"Latitude": "float64", "Longitude": "float64", "Enrollment": "Int64"}
+
+
+def megabytes(frame):
+    """Deep memory usage of a frame in MB"""
+    return frame.memory_usage(deep=True).sum() / 2**20
+
+def previous_layout(extracted_df, raw):
+    """The extracted frame as the previous extraction laid it out"""
+    previous = extracted_df.astype(PREVIOUS_DTYPES)
+    for column in PREVIOUS_TEXT_COLUMNS:
+        previous[column] = previous[column].astype(str).where(previous[column].notna())
+    gps_text = raw["GPS Location"].where(raw[find_qr_column(raw)].notna()).reset_index(drop=True)
+    previous.insert(2, "GPS_Location", gps_text)
+    return previous
+
+def largest_workbook():
+    """Path of the largest submissions export in the repository"""
+    for path in sorted(glob.glob("*.xlsx"), key=os.path.getsize, reverse=True):
+        raw = pd.read_excel(path, nrows=0)
+        try:
+            find_qr_column(raw)
+        except KeyError:
+            continue  # Not a submissions export
+        return path
+    raise FileNotFoundError("No submissions workbook found")
+
+def datasets(sizes):
+    """Yield (dataset name, raw export frame with every column)"""
+    if "real" in sizes:
+        path = largest_workbook()
+        yield path, pd.read_excel(path)
+
+    synthetic = [size for size in sizes if size in SIZES]
+    if synthetic:
+        seed_df = load_seed()
+        for size in synthetic:
+            yield size, synthetic_export(SIZES[size], seed_df)
+
+def report(name, raw):
+    """Print the footprint of one dataset"""
+    projected = raw[[column for column in raw.columns if column in SOURCE_COLUMNS]]
+    compact = extract_gps_data_from_excel(projected)
+    previous = previous_layout(compact, raw)
+
+    print(f"{name} ({len(raw):,} rows)")
+    print(f"  {'raw workbook, all columns':<34}{megabytes(raw):>10.2f} MB")
+    print(f"  {'raw workbook, columns read':<34}{megabytes(projected):>10.2f} MB")
+    print(f"  {'extracted, previous layout':<34}{megabytes(previous):>10.2f} MB")
+    print(f"  {'extracted, compact layout':<34}{megabytes(compact):>10.2f} MB"
+          f"  ({megabytes(compact) / megabytes(previous):.0%} of previous)")
+
+    before = previous.memory_usage(deep=True, index=False) / 2**10
+    after = compact.memory_usage(deep=True, index=False) / 2**10
+    print(f"  {'column':<14}{'previous dtype':>16}{'KB':>10}{'compact dtype':>16}{'KB':>10}")
+    for column in previous.columns:
+        if column in compact.columns:
+            print(f"  {column:<14}{str(previous[column].dtype):>16}{before[column]:>10.1f}"
+                  f"{str(compact[column].dtype):>16}{after[column]:>10.1f}")
+        else:
+            print(f"  {column:<14}{str(previous[column].dtype):>16}{before[column]:>10.1f}{'(dropped)':>16}{0:>10.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.memory", description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="real", help=f"comma-separated datasets: real, {', '.join(SIZES)} (default: real)")
+    args = parser.parse_args(argv)
+
+    for name, raw in datasets([size.strip() for size in args.sizes.split(",")]):
+        report(name, raw)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Parse time and peak memory of each workbook reader on the repository's exports
+
+Run from the repository root:
+
+    python -m benchmarks.readers [--repeat 3] [workbook.xlsx ...]
+
+For every submissions workbook (by default each one in the repository) the
+best of --repeat wall times and the peak traced allocation are printed for
+each installed Excel engine, reading every column and only the columns
+ingestion needs (sbd.extract.SOURCE_COLUMNS), and for the workbook's Parquet
+archive (python -m sbd convert) read with the same projection. Each reader's
+frame is checked against the first engine's.
+"""
+import argparse
+import glob
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from sbd.extract import SOURCE_COLUMNS, find_qr_column
+from sbd.ingest import available_engines, convert_workbook, read_workbook
+
+
+def submission_workbooks():
+    """Submissions exports in the repository, largest first"""
+    paths = []
+    for path in sorted(glob.glob("*.xlsx"), key=os.path.getsize, reverse=True):
+        try:
+            find_qr_column(pd.read_excel(path, nrows=0))
+        except KeyError:
+            continue  # Not a submissions export
+        paths.append(path)
+    return paths
+
+def measure(read, repeat):
+    """(best seconds, peak traced MB, frame) of a reader"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        frame = read()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    frame = read()
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return best, peak, frame
+
+def readers(path, archive_dir):
+    """Yield (name, columns read, reader) for every way of reading a workbook"""
+    empty_dir = os.path.join(archive_dir, "none")
+    for engine in available_engines():
+        for label, columns in (("all", None), ("projected", SOURCE_COLUMNS)):
+            yield f"{engine}, {label}", columns, (
+                lambda engine=engine, columns=columns: read_workbook(path, columns, engine, empty_dir))
+    yield "parquet archive, projected", SOURCE_COLUMNS, lambda: read_workbook(path, SOURCE_COLUMNS, archive_dir=archive_dir)
+
+def report(path, repeat, archive_dir):
+    """Print every reader's numbers for one workbook"""
+    started = time.perf_counter()
+    convert_workbook(path, archive_dir)
+    convert_seconds = time.perf_counter() - started
+
+    print(f"{path} ({os.path.getsize(path) / 2**20:.2f} MB, converted in {convert_seconds:.2f}s)")
+    print(f"  {'reader':<28}{'s':>8}{'peak MB':>10}{'rows':>8}{'cols':>6}  same frame")
+    reference = {}
+    for name, columns, read in readers(path, archive_dir):
+        seconds, peak, frame = measure(read, repeat)
+        key = "all" if columns is None else "projected"
+        reference.setdefault(key, frame)
+        same = frame.astype(str).equals(reference[key][frame.columns].astype(str))
+        print(f"  {name:<28}{seconds:>8.3f}{peak:>10.1f}{len(frame):>8,}{frame.shape[1]:>6}  {'yes' if same else 'NO'}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.readers", description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="timed reads per reader (default: 3)")
+    parser.add_argument("workbooks", nargs="*", help="workbooks to read (default: every submissions export)")
+    args = parser.parse_args(argv)
+
+    print(f"engines: {', '.join(available_engines())}")
+    with tempfile.TemporaryDirectory() as archive_dir:
+        for path in args.workbooks or submission_workbooks():
+            report(path, args.repeat, archive_dir)
+
+if __name__ == "__main__":
+    main()
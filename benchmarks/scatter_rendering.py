@@ -0,0 +1,82 @@
+"""Artist count and render time of the GPS dashboard: per-school vs batched scatter
+
+Run from the repository root:
+
+    python -m benchmarks.scatter_rendering [workbook.xlsx]
+
+The "per-school" mode reproduces the previous behaviour of one ax.scatter
+call per marker; the "batched" mode is the current plot_school_points.
+Markers are the school clusters the dashboard draws (see sbd.clusters), so
+both modes draw the same markers with the same per-marker sizes.
+"""
+import sys
+import time
+from io import BytesIO
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import PathCollection
+
+import sbd.plotting
+from sbd.geometry import load_chiefdoms
+from sbd.ingest import load_submissions
+
+# Largest submission workbook in the repository
+DEFAULT_WORKBOOK = "SBD_Final_data_dissemination_7_15_2025.xlsx"
+DISTRICTS = ["BO", "BOMBALI"]
+
+batched_plot_school_points = sbd.plotting.plot_school_points
+
+
+def per_school_plot_school_points(ax, lats, lons, colors='red', sizes=100):
+    """Previous behaviour: a separate PathCollection for every marker"""
+    sizes = np.broadcast_to(sizes, len(lats))
+    colors = np.broadcast_to(np.asarray(colors, dtype=object), len(lats))
+    for lat, lon, color, size in zip(lats, lons, colors, sizes):
+        ax.scatter(lon, lat, c=color, s=size, alpha=1.0,
+                   edgecolors='white', linewidth=2, zorder=100, marker='o')
+
+def measure(gdf, extracted_df, district_name):
+    """Build, draw and save one district dashboard; return timings and artist count"""
+    start = time.perf_counter()
+    fig = sbd.plotting.create_chiefdom_subplot_dashboard(gdf, extracted_df, district_name)
+    build_time = time.perf_counter() - start
+
+    artists = sum(
+        1 for ax in fig.axes for artist in ax.get_children()
+        if isinstance(artist, PathCollection)
+    )
+
+    start = time.perf_counter()
+    fig.canvas.draw()
+    draw_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fig.savefig(BytesIO(), format='png', dpi=300, bbox_inches='tight')
+    save_time = time.perf_counter() - start
+
+    plt.close(fig)
+    return artists, build_time, draw_time, save_time
+
+def main(workbook=DEFAULT_WORKBOOK):
+    extracted_df = load_submissions(workbook)
+    gdf = load_chiefdoms()
+
+    print(f"Workbook: {workbook} ({len(extracted_df)} records)")
+    print(f"{'district':<10} {'mode':<11} {'scatter artists':>15} {'build s':>8} {'draw s':>8} {'savefig 300dpi s':>17}")
+
+    modes = [("per-school", per_school_plot_school_points), ("batched", batched_plot_school_points)]
+    for district_name in DISTRICTS:
+        for mode, plot_fn in modes:
+            sbd.plotting.plot_school_points = plot_fn
+            try:
+                artists, build_time, draw_time, save_time = measure(gdf, extracted_df, district_name)
+            finally:
+                sbd.plotting.plot_school_points = batched_plot_school_points
+            print(f"{district_name:<10} {mode:<11} {artists:>15} {build_time:>8.2f} {draw_time:>8.2f} {save_time:>17.2f}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,64 @@
+"""Memory held per concurrent dashboard session
+
+Run from the repository root:
+
+    python -m benchmarks.sessions [--sessions 5] [streamlit_app.py ...]
+
+Opens the given number of sessions of each app one after the other in this
+process (Streamlit's own test harness, so each has its own session state)
+and keeps them all alive, printing the traced memory still allocated after
+each one, and how long each session's first run took. The first session
+pays for the shared data (sbd.shared); every further session should add
+little time or memory beyond its own page state.
+"""
+import argparse
+import gc
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from sbd.shared import shared_entries
+
+DEFAULT_APPS = ["streamlit_app.py", "streamlit_app_gps.py"]
+TIMEOUT_SECONDS = 600
+
+
+def open_sessions(app, count):
+    """Run count sessions of an app; returns (sessions, traced MB after each, seconds of each run)"""
+    from streamlit.testing.v1 import AppTest
+
+    sessions, held, seconds = [], [], []
+    for _ in range(count):
+        started = time.perf_counter()
+        session = AppTest.from_file(os.path.abspath(app), default_timeout=TIMEOUT_SECONDS).run()
+        seconds.append(time.perf_counter() - started)
+        if session.exception:
+            raise RuntimeError(f"{app}: {session.exception[0].message}")
+        sessions.append(session)
+        gc.collect()
+        held.append(tracemalloc.get_traced_memory()[0] / 2**20)
+    return sessions, held, seconds
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.sessions", description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=5, help="sessions per app (default: 5)")
+    parser.add_argument("apps", nargs="*", default=DEFAULT_APPS)
+    args = parser.parse_args(argv)
+
+    tracemalloc.start()
+    print(f"{'app':<24}{'first MB':>10}{'first s':>9}{'per extra session MB':>22}{'s':>7}")
+    for app in args.apps:
+        baseline = tracemalloc.get_traced_memory()[0] / 2**20
+        sessions, held, seconds = open_sessions(app, args.sessions)
+        extra = (held[-1] - held[0]) / (len(held) - 1) if len(held) > 1 else 0.0
+        extra_seconds = sum(seconds[1:]) / (len(seconds) - 1) if len(seconds) > 1 else 0.0
+        print(f"{app:<24}{held[0] - baseline:>10.1f}{seconds[0]:>9.2f}{extra:>22.2f}{extra_seconds:>7.2f}")
+        del sessions
+
+    gc.collect()
+    print(f"shared entries: {len(shared_entries())}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Time and peak-memory benchmarks of ingestion, coverage, rendering and Word export
+
+Run from the repository root:
+
+    python -m benchmarks.suite [--sizes real,10k,100k,1M] [--json results.json] [--compare baseline.json]
+
+"real" runs every submission workbook in the repository; 10k, 100k and 1M
+are synthetic exports in the same QR-text format (benchmarks.synthetic).
+Each case reports the best wall time over --repeat runs and the peak
+memory allocated by one extra run (tracemalloc: Python, NumPy and pandas
+allocations; matplotlib's C++ renderer buffers are not included).
+
+With --compare, cases more than --tolerance slower or larger than in the
+baseline file are listed and the exit status is 1, so a nightly job can
+catch regressions before they ship.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import SIZES, load_seed, synthetic_export
+from sbd.artifacts import SCREEN_DPI
+from sbd.coverage import compute_coverage
+from sbd.dedup import find_duplicates, update_duplicates
+from sbd.extract import extract_gps_data_from_excel, extract_qr_fields, find_qr_column
+from sbd.geometry import load_chiefdoms
+from sbd.gps import parse_gps_column
+from sbd.names import resolve_chiefdom_names
+from sbd.plotting import create_chiefdom_subplot_dashboard, create_coverage_dashboard
+from sbd.render import render_pngs
+from sbd.reports import COVERAGE_LEGEND, district_report
+from sbd.targets import load_targets
+
+DISTRICT = "BO"
+
+# Relative slowdown or memory growth reported as a regression
+TOLERANCE = 0.25
+# Absolute changes below these are timer or allocator noise
+NOISE_FLOOR = {"seconds": 0.02, "peak_mb": 1.0}
+
+
+def cases(raw, gdf, targets):
+    """The benchmark cases for one raw export: {name: zero-argument callable}
+
+    Inputs of later stages are computed here, once, so each case times only
+    its own stage.
+    """
+    qr = raw[find_qr_column(raw)]
+    chiefdom_names = extract_qr_fields(qr)["Chiefdom"]
+    extracted_df = extract_gps_data_from_excel(raw)
+    coverage_df = compute_coverage(extracted_df, targets, gdf, districts=[DISTRICT])
+
+    district_gdf = gdf[gdf["FIRST_DNAM"] == DISTRICT]
+    district_rows = extracted_df[extracted_df["District"].str.upper() == DISTRICT]
+    # The last 1% of rows arrives as a new batch over stored rows with known repeats
+    stored_rows = extracted_df.iloc[:len(extracted_df) - max(len(extracted_df) // 100, 1)].reset_index(drop=True)
+    new_rows = extracted_df.iloc[len(stored_rows):].reset_index(drop=True)
+    stored_duplicates = find_duplicates(stored_rows)
+    coverage_png = render_pngs(create_coverage_dashboard, (district_gdf, coverage_df, DISTRICT), (SCREEN_DPI,))
+
+    return {
+        "extract_gps_data_from_excel": lambda: extract_gps_data_from_excel(raw),
+        "resolve_chiefdom_names": lambda: resolve_chiefdom_names(chiefdom_names),
+        "parse_gps_column": lambda: parse_gps_column(raw["GPS Location"]),
+        "compute_coverage": lambda: compute_coverage(extracted_df, targets, gdf, districts=[DISTRICT]),
+        "find_duplicates": lambda: find_duplicates(extracted_df),
+        "update_duplicates": lambda: update_duplicates(
+            stored_rows, stored_duplicates, np.ones(len(stored_rows), dtype=bool), new_rows),
+        "create_coverage_dashboard": lambda: render_pngs(
+            create_coverage_dashboard, (district_gdf, coverage_df, DISTRICT), (SCREEN_DPI,)),
+        "create_chiefdom_subplot_dashboard": lambda: render_pngs(
+            create_chiefdom_subplot_dashboard, (district_gdf, district_rows, DISTRICT), (SCREEN_DPI,)),
+        "district_report": lambda: district_report(
+            f"{DISTRICT} District - School Coverage Analysis", coverage_png[SCREEN_DPI], ["benchmark"],
+            summary_level=2, legend_items=COVERAGE_LEGEND),
+    }
+
+def measure(function, repeat):
+    """Return (best wall time in seconds, peak traced memory in bytes)"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), peak
+
+def datasets(sizes):
+    """Yield (dataset name, raw export frame, read_excel seconds or None)"""
+    if "real" in sizes:
+        for path in sorted(glob.glob("*.xlsx")):
+            started = time.perf_counter()
+            raw = pd.read_excel(path)
+            elapsed = time.perf_counter() - started
+            try:
+                find_qr_column(raw)
+            except KeyError:
+                continue  # Not a submissions export
+            yield path, raw, elapsed
+
+    synthetic = [size for size in sizes if size in SIZES]
+    if synthetic:
+        seed_df = load_seed()
+        for size in synthetic:
+            yield size, synthetic_export(SIZES[size], seed_df), None
+
+def run(sizes, repeat):
+    """Run every case on every dataset, printing one line per case; returns the results"""
+    gdf = load_chiefdoms()
+    targets = load_targets()
+    results = []
+
+    print(f"{'dataset':<46}{'rows':>9}  {'case':<34}{'best s':>9}{'peak MB':>10}")
+    for dataset, raw, read_seconds in datasets(sizes):
+        measured = {}
+        if read_seconds is not None:
+            measured["read_excel"] = (read_seconds, None)
+        for name, function in cases(raw, gdf, targets).items():
+            measured[name] = measure(function, repeat)
+
+        for name, (seconds, peak) in measured.items():
+            peak_mb = None if peak is None else peak / 2**20
+            results.append({"dataset": dataset, "rows": len(raw), "case": name, "seconds": seconds, "peak_mb": peak_mb})
+            peak_text = "-" if peak_mb is None else f"{peak_mb:.1f}"
+            print(f"{dataset[:45]:<46}{len(raw):>9}  {name:<34}{seconds:>9.3f}{peak_text:>10}")
+    return results
+
+def regressions(results, baseline, tolerance=TOLERANCE):
+    """Cases slower or more memory-hungry than the baseline by more than tolerance"""
+    previous = {(r["dataset"], r["case"]): r for r in baseline}
+    found = []
+    for result in results:
+        before = previous.get((result["dataset"], result["case"]))
+        if before is None:
+            continue
+        for metric in ("seconds", "peak_mb"):
+            if result[metric] is None or not before[metric]:
+                continue
+            change = result[metric] / before[metric] - 1
+            if change > tolerance and result[metric] - before[metric] > NOISE_FLOOR[metric]:
+                found.append(f"{result['dataset']} / {result['case']}: {metric} "
+                             f"{before[metric]:.3f} -> {result[metric]:.3f} (+{change:.0%})")
+    return found
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="real," + ",".join(SIZES),
+                        help=f"comma-separated datasets: real, {', '.join(SIZES)} (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (default: 3)")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="baseline results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help=f"allowed relative slowdown or memory growth (default: {TOLERANCE})")
+    args = parser.parse_args(argv)
+
+    results = run([size.strip() for size in args.sizes.split(",")], args.repeat)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        return 1 if found else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Synthetic submission exports in the real QR-text format, at any size
+
+Rows are resampled from a real export: the QR payload is rebuilt from the
+sampled fields with a unique school name and enrollment per row, and GPS
+fixes are jittered around the sampled ones, so extraction, name resolution,
+GPS parsing, coverage and plotting see realistic values at 10k-1M rows.
+"""
+import numpy as np
+import pandas as pd
+
+from sbd.extract import extract_qr_fields, find_qr_column
+
+SEED_WORKBOOK = "SBD_Final_data_dissemination_7_15_2025.xlsx"
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000}
+
+# Standard deviation of the GPS jitter, in degrees (about 500 m)
+GPS_JITTER = 0.005
+
+
+def load_seed(path=SEED_WORKBOOK):
+    """Raw rows of a real export that carry a QR payload"""
+    raw = pd.read_excel(path)
+    return raw[raw[find_qr_column(raw)].notna()].reset_index(drop=True)
+
+def synthetic_export(n_rows, seed_df, random_state=0):
+    """A raw export frame of n_rows rows in the layout of seed_df"""
+    rng = np.random.default_rng(random_state)
+    qr_column = find_qr_column(seed_df)
+    sample = seed_df.iloc[rng.integers(0, len(seed_df), n_rows)].reset_index(drop=True)
+    fields = extract_qr_fields(sample[qr_column])
+
+    number = pd.Series(np.arange(n_rows)).astype(str)
+    enrollment = pd.Series(rng.integers(20, 900, n_rows)).astype(str)
+    qr_text = (
+        "District: " + fields["District"]
+        + "\nChiefdom: " + fields["Chiefdom"]
+        + "\nPHU name: " + fields["PHU"].fillna("")
+        + "\nCommunity name: " + fields["Community"].fillna("")
+        + "\nName of school: " + fields["School"].fillna("School") + " " + number
+        + "\nEnrollment: " + enrollment
+    )
+
+    coordinates = sample["GPS Location"].astype(str).str.split(",", n=1, expand=True)
+    latitude = pd.to_numeric(coordinates[0], errors="coerce") + rng.normal(0, GPS_JITTER, n_rows)
+    longitude = pd.to_numeric(coordinates[1], errors="coerce") + rng.normal(0, GPS_JITTER, n_rows)
+    gps = latitude.round(7).astype(str) + "," + longitude.round(7).astype(str)
+
+    return pd.DataFrame({
+        "Submission Id": "SYN" + number.str.zfill(7),
+        "Created At": sample["Created At"],
+        qr_column: qr_text,
+        "GPS Location": gps.where(latitude.notna() & longitude.notna()),
+    })
@@ -0,0 +1,69 @@
+"""Size and build time of the interactive map document, with its outline and cluster parts
+
+Run from the repository root:
+
+    python -m benchmarks.webmap [--sizes real,100k]
+
+The document (sbd.webmap.build_map) is built once per dataset over every
+chiefdom in the shapefile, as the GPS app does once per data snapshot.
+"real" is the largest submission workbook in the repository; 10k, 100k and
+1M are synthetic exports (benchmarks.synthetic). The cluster part is the
+embedded zoom levels and labels, which the browser queries per view.
+"""
+import argparse
+import json
+import time
+
+from benchmarks.memory import largest_workbook
+from benchmarks.synthetic import SIZES, load_seed, synthetic_export
+from sbd.clusters import build_cluster_index, school_points
+from sbd.extract import extract_gps_data_from_excel
+from sbd.geometry import load_chiefdoms
+from sbd.ingest import load_submissions
+from sbd.webmap import build_map, cluster_levels, map_bounds, outlines_geojson
+
+
+def timed(function, *args):
+    """(result, seconds) of one call"""
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+def json_mb(value):
+    """Size of value as compact JSON, in MB"""
+    return len(json.dumps(value, separators=(",", ":"))) / 2**20
+
+def datasets(sizes):
+    """Yield (dataset name, extracted frame)"""
+    if "real" in sizes:
+        path = largest_workbook()
+        yield path, load_submissions(path)
+
+    synthetic = [size for size in sizes if size in SIZES]
+    if synthetic:
+        seed_df = load_seed()
+        for size in synthetic:
+            yield size, extract_gps_data_from_excel(synthetic_export(SIZES[size], seed_df))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.webmap", description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="real,100k", help=f"comma-separated datasets: real, {', '.join(SIZES)} (default: real,100k)")
+    args = parser.parse_args(argv)
+
+    gdf = load_chiefdoms()
+    outlines_size = json_mb(outlines_geojson(gdf))
+    print(f"{len(gdf)} chiefdoms, outlines {outlines_size:.2f} MB")
+    print(f"{'dataset':<48}{'rows':>10}{'clusters':>10}{'cluster MB':>12}{'document MB':>13}{'build s':>9}")
+
+    for name, extracted_df in datasets([size.strip() for size in args.sizes.split(",")]):
+        points = school_points(extracted_df)
+        index, index_seconds = timed(build_cluster_index, points)
+        levels, labels = cluster_levels(index, points, map_bounds(gdf))
+        html, build_seconds = timed(build_map, gdf, points, index)
+        clusters = sum(len(level["lon"]) for level in levels.values())
+        print(f"{str(name):<48}{len(extracted_df):>10,}{clusters:>10,}"
+              f"{json_mb({'levels': levels, 'labels': labels}):>12.2f}"
+              f"{len(html) / 2**20:>13.2f}{index_seconds + build_seconds:>9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Shared data and plotting helpers for the SBD Streamlit dashboards"""
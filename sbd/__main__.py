@@ -0,0 +1,7 @@
+"""Entry point of python -m sbd (see sbd.cli)"""
+import sys
+
+from sbd.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+"""Stand-in __main__ module for starting render workers (see sbd.render._submit)
+
+Deliberately empty: a worker runs its parent's __main__ module before any
+task, and this one has nothing to run.
+"""
@@ -0,0 +1,78 @@
+"""Rasterized dashboard figures shared by the screen, PNG download and Word export
+
+Each district figure is built at most once for a given input and rendered
+once per DPI. The PNG bytes are kept in a bounded in-process cache keyed on
+(data hash, district, DPI), so reruns and exports reuse them and nothing is
+written to disk. Only sessions asking for the same district figure wait for
+each other while it renders.
+"""
+import threading
+from collections import OrderedDict
+from contextlib import ExitStack
+
+from sbd.render import render_figures
+from sbd.shared import KeyLocks
+
+# Resolution of the on-screen image and the Word export (st.pyplot's default)
+SCREEN_DPI = 200
+# Resolution of the PNG download button
+DOWNLOAD_DPI = 300
+
+MAX_ARTIFACTS = 64
+
+_artifacts = OrderedDict()
+_lock = threading.Lock()
+_render_locks = KeyLocks()
+
+
+def _cached_figures(keys):
+    """{district: {dpi: png_bytes}} of the districts whose every DPI is cached (lock held)"""
+    figures = {}
+    for district, district_keys in keys.items():
+        if all(key in _artifacts for key in district_keys.values()):
+            for key in district_keys.values():
+                _artifacts.move_to_end(key)
+            figures[district] = {dpi: _artifacts[key] for dpi, key in district_keys.items()}
+    return figures
+
+def district_figures(data_key, tasks, dpis=(SCREEN_DPI, DOWNLOAD_DPI)):
+    """Return {district: {dpi: png_bytes} or None}, rendering only what is missing
+
+    tasks maps each district to (build_figure, args) as accepted by
+    sbd.render.render_figures; build_figure is called with the highest
+    requested DPI. Districts not yet cached are rendered together, in
+    parallel when there are several.
+    """
+    keys = {district: {dpi: (data_key, district, dpi) for dpi in dpis} for district in tasks}
+
+    with _lock:
+        figures = _cached_figures(keys)
+
+    with ExitStack() as rendering:
+        # Sorted, so sessions rendering overlapping districts cannot deadlock
+        for district in sorted(district for district in tasks if district not in figures):
+            rendering.enter_context(_render_locks((data_key, district, dpis)))
+
+        # Another session may have rendered some of them while this one waited
+        with _lock:
+            figures.update(_cached_figures({d: k for d, k in keys.items() if d not in figures}))
+        missing = {district: task for district, task in tasks.items() if district not in figures}
+        rendered = render_figures(missing, dpis) if missing else {}
+
+        with _lock:
+            for district, pngs in rendered.items():
+                # None: nothing to draw for this district
+                figures[district] = pngs
+                if pngs is not None:
+                    for dpi, key in keys[district].items():
+                        _artifacts[key] = pngs[dpi]
+
+            while len(_artifacts) > MAX_ARTIFACTS:
+                _artifacts.popitem(last=False)
+
+    return {district: figures[district] for district in tasks}
+
+def clear_artifacts():
+    """Drop every cached figure rendering"""
+    with _lock:
+        _artifacts.clear()
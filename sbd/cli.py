@@ -0,0 +1,161 @@
+"""Headless report generation, independent of Streamlit
+
+    python -m sbd report --input SBD_Final_data_dissemination_7_15_2025.xlsx --districts all --out reports/
+
+Writes, for every selected district, the coverage dashboard (PNG), the
+district coverage report (DOCX) and the chiefdom coverage table (CSV),
+plus a district summary table. Districts are built in parallel worker
+processes (see sbd.render; SBD_RENDER_WORKERS sets their number).
+
+    python -m sbd convert [workbook.xlsx ...]
+
+Converts archived export workbooks (by default the dated snapshots) to
+Parquet once, so later loads skip parsing the sheets (see sbd.ingest).
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Headless: never try to open a display
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from sbd.artifacts import DOWNLOAD_DPI, SCREEN_DPI
+from sbd.coverage import chiefdom_counts, coverage_from_counts, summarize_districts
+from sbd.dedup import deduplicated_counts, find_duplicates
+from sbd.districts import district_registry
+from sbd.geometry import load_chiefdoms
+from sbd.ingest import ARCHIVE_DIR, convert_workbook, excel_engine, load_submissions
+from sbd.plotting import create_coverage_dashboard
+from sbd.render import render_pngs, run_tasks
+from sbd.reports import COVERAGE_LEGEND, coverage_summary_items, district_report
+from sbd.snapshots import SNAPSHOT_FILES
+from sbd.targets import TARGETS_FILE, load_targets
+
+CSV_COLUMNS = ["District", "Chiefdom", "Actual", "Target", "Coverage", "Band", "Gap"]
+
+
+def write_district_artifacts(out_dir, district, district_gdf, district_coverage, summary_items, cols):
+    """Build one district's dashboard and write its PNG, DOCX and CSV files; returns the paths
+
+    Runs in a worker process, so every input is sent to it by value.
+    """
+    out_dir = Path(out_dir)
+    paths = []
+
+    csv_path = out_dir / f"{district}_District_Coverage.csv"
+    district_coverage[CSV_COLUMNS].to_csv(csv_path, index=False, float_format="%.1f")
+    paths.append(csv_path)
+
+    pngs = render_pngs(create_coverage_dashboard, (district_gdf, district_coverage, district, cols),
+                       (SCREEN_DPI, DOWNLOAD_DPI))
+    if pngs is None:
+        return paths
+
+    png_path = out_dir / f"{district}_District_Coverage_Dashboard.png"
+    png_path.write_bytes(pngs[DOWNLOAD_DPI])
+    paths.append(png_path)
+
+    docx_path = out_dir / f"{district}_District_Coverage_Report.docx"
+    docx_path.write_bytes(district_report(
+        f'{district} District - School Coverage Analysis',
+        pngs[SCREEN_DPI],
+        summary_items,
+        summary_level=2,
+        legend_items=COVERAGE_LEGEND,
+    ))
+    paths.append(docx_path)
+    return paths
+
+def select_districts(registry, requested):
+    """Resolve --districts ('all' or a comma-separated list) against the registry"""
+    if requested.strip().lower() == "all":
+        return registry.index.tolist()
+
+    districts = [d.strip().upper() for d in requested.split(",") if d.strip()]
+    unknown = [d for d in districts if d not in registry.index]
+    if unknown:
+        raise ValueError(f"Unknown district(s) {', '.join(unknown)}; available: {', '.join(registry.index)}")
+    return districts
+
+def report(args):
+    """The 'report' command: write coverage artifacts for the selected districts"""
+    started = time.perf_counter()
+
+    extracted_df = load_submissions(args.input)
+    gdf = load_chiefdoms(args.shapefile)
+    targets = load_targets(args.targets)
+
+    registry = district_registry(gdf, targets, extracted_df)
+    districts = select_districts(registry, args.districts)
+
+    counts = chiefdom_counts(extracted_df)
+    if not args.keep_duplicates:
+        counts = deduplicated_counts(counts, extracted_df, find_duplicates(extracted_df))
+    coverage_df = coverage_from_counts(counts, targets, gdf, districts=districts, campaign_round=args.round)
+    district_summary = summarize_districts(coverage_df)
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    written = run_tasks({
+        district: (write_district_artifacts, (
+            out_dir,
+            district,
+            gdf[gdf["FIRST_DNAM"] == district],
+            coverage_df[coverage_df["District"] == district],
+            coverage_summary_items(district, registry.at[district, "Chiefdoms"], district_summary.loc[district]),
+            args.cols,
+        ))
+        for district in districts
+    })
+
+    summary_path = out_dir / "District_Coverage_Summary.csv"
+    district_summary.to_csv(summary_path, float_format="%.1f")
+
+    for district in districts:
+        print(f"{district}: {', '.join(path.name for path in written[district])}")
+    print(f"{summary_path.name}: {len(districts)} district(s) in {time.perf_counter() - started:.1f}s")
+    return 0
+
+def convert(args):
+    """The 'convert' command: archive workbooks as Parquet"""
+    engine = excel_engine(args.engine)
+    for path in args.workbooks or SNAPSHOT_FILES:
+        started = time.perf_counter()
+        archived = convert_workbook(path, args.out, engine)
+        print(f"{path}: {archived} ({engine}, {time.perf_counter() - started:.1f}s)")
+    return 0
+
+def build_parser():
+    """Command-line interface of python -m sbd"""
+    parser = argparse.ArgumentParser(prog="python -m sbd", description="SBD school coverage tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    report_parser = commands.add_parser("report", help="write district coverage reports (PNG, DOCX, CSV)")
+    report_parser.add_argument("--input", required=True, help="submissions workbook (.xlsx)")
+    report_parser.add_argument("--districts", default="all", help="'all' or a comma-separated list (default: all)")
+    report_parser.add_argument("--out", default="reports", help="output directory (default: reports)")
+    report_parser.add_argument("--targets", default=TARGETS_FILE, help=f"targets table (default: {TARGETS_FILE})")
+    report_parser.add_argument("--shapefile", default="Chiefdom2021.shp", help="chiefdom boundaries")
+    report_parser.add_argument("--round", type=int, help="campaign round of the targets (default: latest)")
+    report_parser.add_argument("--cols", type=int, default=4, help="dashboard grid columns (default: 4)")
+    report_parser.add_argument("--keep-duplicates", action="store_true",
+                               help="count repeated school submissions towards coverage")
+    report_parser.set_defaults(run=report)
+
+    convert_parser = commands.add_parser("convert", help="archive export workbooks as Parquet for faster loading")
+    convert_parser.add_argument("workbooks", nargs="*", help="workbooks to convert (default: the dated snapshots)")
+    convert_parser.add_argument("--out", default=ARCHIVE_DIR, help=f"archive directory (default: {ARCHIVE_DIR})")
+    convert_parser.add_argument("--engine", help="Excel engine: calamine or openpyxl (default: fastest installed)")
+    convert_parser.set_defaults(run=convert)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.run(args)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
@@ -0,0 +1,152 @@
+"""Precomputed zoom pyramid of school point clusters, queryable by bounding box
+
+Points are aggregated on a Web Mercator grid of fixed screen-size cells at
+every zoom level, optionally without merging points of different groups
+(e.g. chiefdoms). The pyramid is built once per data snapshot (the
+dashboards share it through sbd.shared); a map view then asks only for the
+clusters whose centre falls inside its bounds at its zoom.
+"""
+import numpy as np
+import pandas as pd
+
+from sbd.gps import GPS_OK
+
+MIN_ZOOM = 5
+MAX_ZOOM = 16
+
+# Side of a grid cell, in screen pixels at the cell's zoom level
+CLUSTER_CELL_PX = 60
+TILE_SIZE = 256
+
+
+def mercator_pixels(lats, lons, zoom):
+    """Web Mercator pixel coordinates (x, y) of points at a zoom level"""
+    scale = TILE_SIZE * 2.0 ** zoom
+    lat = np.radians(np.clip(np.asarray(lats, dtype=float), -85.05, 85.05))
+    x = (np.asarray(lons, dtype=float) + 180.0) / 360.0 * scale
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0 * scale
+    return x, y
+
+def chiefdom_group(district, chiefdom):
+    """Group key of a chiefdom's school points (see school_points)"""
+    return f"{district.upper()}/{chiefdom}"
+
+def school_points(extracted_df, by_chiefdom=False):
+    """Validated school GPS points in the layout expected by cluster_points
+
+    Labels name the school and its declared chiefdom; Flagged marks points
+    outside that chiefdom when extracted_df has a Chiefdom_Mismatch column
+    (see sbd.spatial). With by_chiefdom, points declared in different
+    chiefdoms are never merged (Group is chiefdom_group's key).
+    """
+    located = extracted_df[extracted_df["GPS_Status"] == GPS_OK]
+    points = pd.DataFrame({
+        "Latitude": located["Latitude"],
+        "Longitude": located["Longitude"],
+        "Label": (located["School"].astype(object).fillna("Unnamed school")
+                  + " (" + located["Chiefdom"].astype(object).fillna("unknown chiefdom") + ")"),
+    })
+    if "Chiefdom_Mismatch" in located:
+        points["Flagged"] = located["Chiefdom_Mismatch"].astype(bool)
+    if by_chiefdom:
+        # Same keys as chiefdom_group, built column-wise
+        points["Group"] = located["District"].astype(object).str.upper() + "/" + located["Chiefdom"].astype(object)
+    return points.reset_index(drop=True)
+
+def zoom_for_cell_size(cell_degrees, cell_px=CLUSTER_CELL_PX):
+    """Zoom level whose grid cells are closest to cell_degrees of longitude wide"""
+    zoom = np.log2(360.0 * cell_px / (TILE_SIZE * cell_degrees))
+    return int(np.clip(round(zoom), MIN_ZOOM, MAX_ZOOM))
+
+def _aggregate(group_codes, cell_x, cell_y, lats, lons, counts, flagged, labels):
+    """Merge entries sharing (group, cell); returns the per-cluster arrays in the same order"""
+    keys = (group_codes.astype(np.int64) << 42) | (cell_x << 21) | cell_y
+    cluster, unique_keys = pd.factorize(keys)
+    n_clusters = len(unique_keys)
+
+    # Position of the first entry of every cluster (reversed writes keep the first)
+    first = np.empty(n_clusters, dtype=np.int64)
+    first[cluster[::-1]] = np.arange(len(cluster))[::-1]
+
+    count = np.bincount(cluster, weights=counts, minlength=n_clusters).astype(np.int64)
+    return (
+        group_codes[first], cell_x[first], cell_y[first],
+        np.bincount(cluster, weights=lats * counts, minlength=n_clusters) / count,
+        np.bincount(cluster, weights=lons * counts, minlength=n_clusters) / count,
+        count,
+        np.bincount(cluster, weights=flagged, minlength=n_clusters).astype(np.int64),
+        np.where(count == 1, labels[first], None),
+    )
+
+def _cluster_frame(groups, group_codes, cell_x, cell_y, lats, lons, count, flagged, labels):
+    """One zoom level of the index, sorted by Longitude for bounding-box queries"""
+    clusters = pd.DataFrame({
+        "Longitude": lons,
+        "Latitude": lats,
+        "Count": count,
+        "Flagged": flagged,
+        "Label": labels,
+        "Group": np.asarray(groups, dtype=object)[group_codes],
+        "CellX": cell_x,
+        "CellY": cell_y,
+    })
+    return clusters.sort_values("Longitude", kind="stable").reset_index(drop=True)
+
+def build_cluster_index(points, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM, cell_px=CLUSTER_CELL_PX):
+    """Return {zoom: clusters} for every zoom level from min_zoom to max_zoom
+
+    points has Latitude and Longitude columns and optional Label (shown for
+    single points), Flagged (bool) and Group columns. Every level has one
+    row per cluster with its mean position, Count, number of Flagged
+    points, Label, Group and grid cell (CellX, CellY). Points are gridded
+    once at max_zoom; as cells halve in size at each zoom level, every
+    coarser level merges the clusters of the level below it, so the cost
+    past the first level depends on the number of clusters, not points.
+    """
+    points = points[points["Latitude"].notna() & points["Longitude"].notna()]
+    n_points = len(points)
+    lats = points["Latitude"].to_numpy(dtype=float)
+    lons = points["Longitude"].to_numpy(dtype=float)
+    labels = points["Label"].astype(object).to_numpy() if "Label" in points else np.full(n_points, None)
+    flagged = points["Flagged"].to_numpy(dtype=float) if "Flagged" in points else np.zeros(n_points)
+    if "Group" in points:
+        group_codes, groups = pd.factorize(points["Group"], use_na_sentinel=False)
+    else:
+        group_codes, groups = np.zeros(n_points, dtype=np.int64), [None]
+
+    x, y = mercator_pixels(lats, lons, max_zoom)
+    cell_x, cell_y = np.floor(x / cell_px).astype(np.int64), np.floor(y / cell_px).astype(np.int64)
+    level = _aggregate(group_codes, cell_x, cell_y,
+                       lats, lons, np.ones(n_points), flagged, labels)
+
+    index = {}
+    for zoom in range(max_zoom, min_zoom - 1, -1):
+        if zoom < max_zoom:
+            codes, cell_x, cell_y, level_lats, level_lons, count, level_flagged, level_labels = level
+            level = _aggregate(codes, cell_x // 2, cell_y // 2, level_lats, level_lons, count,
+                               level_flagged, level_labels)
+        index[zoom] = _cluster_frame(groups, *level)
+    return dict(sorted(index.items()))
+
+def select_groups(index, groups):
+    """The part of an index covering only the given groups (e.g. to send to a worker)"""
+    return {zoom: clusters[clusters["Group"].isin(groups)].reset_index(drop=True) for zoom, clusters in index.items()}
+
+def query_clusters(index, bounds, zoom, groups=None):
+    """Clusters with their centre inside bounds (minx, miny, maxx, maxy) at a zoom level
+
+    zoom is clamped to the levels present in the index; groups optionally
+    restricts the result to clusters of those groups.
+    """
+    zoom = min(max(int(zoom), min(index)), max(index))
+    clusters = index[zoom]
+
+    longitudes = clusters["Longitude"].to_numpy()
+    start = np.searchsorted(longitudes, bounds[0], side="left")
+    stop = np.searchsorted(longitudes, bounds[2], side="right")
+    candidates = clusters.iloc[start:stop]
+
+    inside = candidates["Latitude"].between(bounds[1], bounds[3])
+    if groups is not None:
+        inside &= candidates["Group"].isin(groups)
+    return candidates[inside]
@@ -0,0 +1,101 @@
+"""School coverage engine: actual submissions vs target schools per chiefdom
+
+All coverage metrics, tables and charts are derived from the single frame
+returned by compute_coverage, which is built with one groupby.
+"""
+import numpy as np
+
+from sbd.targets import round_targets
+
+# Lower bounds (percent) of each coverage band, highest first
+COVERAGE_BANDS = [
+    (80, "Excellent"),
+    (60, "Good"),
+    (40, "Fair"),
+    (20, "Poor"),
+    (0, "Critical"),
+]
+
+# The one rule for chiefdoms without a target row in the targets table:
+# their target is 0 and their coverage is reported as 0%
+MISSING_TARGET = 0
+
+
+def coverage_band(coverage):
+    """Vectorised band label for an array of coverage percentages"""
+    coverage = np.asarray(coverage, dtype=float)
+    conditions = [coverage >= lower for lower, _ in COVERAGE_BANDS]
+    labels = [label for _, label in COVERAGE_BANDS]
+    return np.select(conditions, labels, default=COVERAGE_BANDS[-1][1])
+
+def chiefdom_counts(extracted_df):
+    """Submissions per (District, Chiefdom) as a Series named Actual
+
+    Rows without a chiefdom are ignored and districts are upper-cased to match
+    the shapefile and targets.
+    """
+    data = extracted_df[extracted_df["Chiefdom"].notna()]
+    district_key = data["District"].str.upper()
+    chiefdom_key = data["Chiefdom"].astype(str)
+    return data.groupby([district_key.rename("District"), chiefdom_key.rename("Chiefdom")]).size().rename("Actual")
+
+def compute_coverage(extracted_df, targets, gdf=None, districts=None, campaign_round=None):
+    """Compute coverage for every (District, Chiefdom) in one pass
+
+    targets is a frame as returned by sbd.targets.load_targets; the given
+    campaign round (default: the latest) is joined to the actuals on
+    (District, Chiefdom). Returns one row per chiefdom with Actual, Target,
+    Coverage, Band and Gap columns. When a shapefile GeoDataFrame is given,
+    chiefdoms of the selected districts that have no submissions yet are
+    included with Actual = 0.
+    """
+    # Single aggregation over all rows
+    return coverage_from_counts(chiefdom_counts(extracted_df), targets, gdf, districts, campaign_round)
+
+def coverage_from_counts(counts, targets, gdf=None, districts=None, campaign_round=None):
+    """Coverage frame from precomputed per-chiefdom counts (see chiefdom_counts)
+
+    Used by compute_coverage and by incrementally maintained aggregates
+    (sbd.delta), so both follow exactly the same target and band rules.
+    """
+    coverage_df = counts.rename("Actual").reset_index()
+
+    if districts is not None:
+        districts = [d.upper() for d in districts]
+        coverage_df = coverage_df[coverage_df["District"].isin(districts)]
+
+    # Add shapefile chiefdoms with no submissions
+    if gdf is not None:
+        selected = districts if districts is not None else coverage_df["District"].unique()
+        shapes = gdf.loc[gdf["FIRST_DNAM"].isin(selected), ["FIRST_DNAM", "FIRST_CHIE"]].dropna()
+        shapes = shapes.rename(columns={"FIRST_DNAM": "District", "FIRST_CHIE": "Chiefdom"})
+        coverage_df = shapes.drop_duplicates().merge(coverage_df, on=["District", "Chiefdom"], how="outer")
+        coverage_df["Actual"] = coverage_df["Actual"].fillna(0)
+
+    coverage_df["Actual"] = coverage_df["Actual"].astype(int)
+
+    # One merge against the round's targets; unmatched chiefdoms get MISSING_TARGET
+    coverage_df = coverage_df.merge(
+        round_targets(targets, campaign_round), on=["District", "Chiefdom"], how="left", validate="one_to_one"
+    )
+    coverage_df["Target"] = coverage_df["Target"].fillna(MISSING_TARGET).astype(int)
+
+    return _add_coverage_columns(coverage_df).sort_values(["District", "Chiefdom"]).reset_index(drop=True)
+
+def _add_coverage_columns(frame):
+    """Add Coverage (percent, 0 without a target), Band and Gap from the Actual and Target columns"""
+    actual = frame["Actual"].to_numpy(dtype=float)
+    target = frame["Target"].to_numpy(dtype=float)
+    frame["Coverage"] = np.divide(actual * 100, target, out=np.zeros_like(actual), where=target > 0)
+    frame["Band"] = coverage_band(frame["Coverage"])
+    frame["Gap"] = frame["Target"] - frame["Actual"]
+    return frame
+
+def summarize_districts(coverage_df, by=("District",)):
+    """Aggregate a coverage frame to one row per district (per combination of the by columns)"""
+    summary = coverage_df.groupby(list(by)).agg(
+        Chiefdoms=("Chiefdom", "size"),
+        Actual=("Actual", "sum"),
+        Target=("Target", "sum"),
+    )
+    return _add_coverage_columns(summary)
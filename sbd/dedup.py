@@ -0,0 +1,247 @@
+"""Detection of schools submitted more than once
+
+Two submissions are the same school when their QR payloads name a school
+and are otherwise identical, or when they lie within DUPLICATE_DISTANCE_M of each other and their school
+names match fuzzily within the same chiefdom. Nearby pairs come from a
+KD-tree over projected coordinates, their names are scored with rapidfuzz's
+batched cdist per chiefdom, and all pairs are merged with a sparse
+connected-components pass, so there is no pairwise Python loop. The first
+submission of each group is kept.
+
+When rows are appended to a set whose repeats are known (sbd.delta,
+sbd.snapshots), update_duplicates queries only the new rows against the
+stored ones and regroups only the groups they touch, so the cost follows
+the new rows rather than the whole season.
+"""
+import numpy as np
+import pandas as pd
+
+from sbd.coverage import chiefdom_counts
+
+# Extracted QR payload fields; rows naming a school and equal on all of them
+# are exact duplicates
+QR_KEY_COLUMNS = ["District", "Chiefdom", "PHU", "Community", "School", "Enrollment"]
+
+# Submissions closer than this (metres) are candidate near-duplicates
+DUPLICATE_DISTANCE_M = 50
+
+# Minimum rapidfuzz token_sort_ratio (0-100) for two school names to match
+NAME_SIMILARITY = 90
+
+# Rows scored per cdist call, bounding the score matrix of a large chiefdom
+NAME_BLOCK_ROWS = 2048
+
+# A chiefdom's names are scored as one cdist matrix unless the matrix would
+# hold more than this many cells per candidate pair (then pairs are scored alone)
+MATRIX_PAIR_RATIO = 4
+
+# School (EMIS) code embedded in many names, e.g. "... (2109-2-04571)"
+SCHOOL_CODE_PATTERN = r"\((\d{4}-\d-\d{5})\)"
+
+EARTH_RADIUS_M = 6_371_000
+
+# Bump whenever the repeat rules change (stored repeat flags carry it)
+DEDUP_VERSION = 1
+
+
+def _pair_codes(left, right, n):
+    """Encode unordered row pairs (left != right) as single int64 codes"""
+    low = np.minimum(left, right).astype(np.int64)
+    high = np.maximum(left, right).astype(np.int64)
+    return np.unique(low * n + high)
+
+def exact_pairs(extracted_df):
+    """Pairs of rows with identical QR payloads (each row linked to its group's first row)
+
+    Only payloads naming a school count: partial payloads (e.g. only a
+    district and chiefdom) are shared by unrelated schools.
+    """
+    n = len(extracted_df)
+    named = extracted_df["School"].notna().to_numpy()
+    group = extracted_df[QR_KEY_COLUMNS].groupby(QR_KEY_COLUMNS, sort=False, dropna=False, observed=True).ngroup().to_numpy()
+
+    rows = np.flatnonzero(named)
+    first = pd.Series(rows).groupby(group[rows]).transform("min").to_numpy()
+    linked = rows != first
+    return _pair_codes(rows[linked], first[linked], n)
+
+def _projected_points(extracted_df):
+    """(rows with a GPS fix, their positions in metres) for KD-tree queries"""
+    latitude = extracted_df["Latitude"].to_numpy(dtype=float)
+    longitude = extracted_df["Longitude"].to_numpy(dtype=float)
+    rows = np.flatnonzero(np.isfinite(latitude) & np.isfinite(longitude))
+
+    # Local equirectangular projection: accurate to well under a metre at these distances
+    lat = np.radians(latitude[rows])
+    points = np.column_stack([
+        np.radians(longitude[rows]) * np.cos(lat) * EARTH_RADIUS_M,
+        lat * EARTH_RADIUS_M,
+    ])
+    return rows, points
+
+def spatial_pairs(extracted_df, distance_m=DUPLICATE_DISTANCE_M):
+    """Pairs of rows with GPS fixes within distance_m metres of each other"""
+    from scipy.spatial import cKDTree
+
+    n = len(extracted_df)
+    rows, points = _projected_points(extracted_df)
+    if len(rows) < 2:
+        return np.empty(0, dtype=np.int64)
+
+    pairs = cKDTree(points).query_pairs(distance_m, output_type="ndarray")
+    return _pair_codes(rows[pairs[:, 0]], rows[pairs[:, 1]], n)
+
+def similar_names(extracted_df, pairs, threshold=NAME_SIMILARITY):
+    """Mask of the row pairs (as pair codes) in one chiefdom whose school names match fuzzily
+
+    The distinct names of each chiefdom's candidate rows are scored against
+    each other with one batched cdist and looked up per pair; when names are
+    mostly distinct, the pairs are scored directly with cpdist. Names
+    carrying different school codes never match, however similar the rest
+    of the name is.
+    """
+    from rapidfuzz import fuzz, process, utils
+
+    if len(pairs) == 0:
+        return np.zeros(0, dtype=bool)
+
+    n = max(len(extracted_df), 1)
+    left, right = pairs // n, pairs % n
+    # District and Chiefdom are categorical; join them as text (missing stays missing)
+    chiefdom_key = extracted_df["District"].astype(str).str.upper() + "|" + extracted_df["Chiefdom"].astype(str)
+    chiefdom = pd.factorize(chiefdom_key.where(extracted_df["Chiefdom"].notna()))[0]
+    name_id, names = pd.factorize(extracted_df["School"])
+    school_codes = names.str.extract(SCHOOL_CODE_PATTERN, expand=False).to_numpy()
+
+    matched = np.zeros(len(pairs), dtype=bool)
+    comparable = np.flatnonzero(
+        (chiefdom[left] >= 0) & (chiefdom[left] == chiefdom[right]) & (name_id[left] >= 0) & (name_id[right] >= 0)
+    )
+    for members in pd.Series(comparable).groupby(chiefdom[left[comparable]]).indices.values():
+        members = comparable[members]
+        left_names, right_names = name_id[left[members]], name_id[right[members]]
+        distinct = np.unique(np.concatenate([left_names, right_names]))
+        left_local = np.searchsorted(distinct, left_names)
+        right_local = np.searchsorted(distinct, right_names)
+        choices = names[distinct].tolist()
+        scoring = {
+            "scorer": fuzz.token_sort_ratio, "processor": utils.default_process,
+            "score_cutoff": threshold, "dtype": np.uint8, "workers": -1,
+        }
+
+        if len(distinct) ** 2 > MATRIX_PAIR_RATIO * len(members):
+            # Few pairs among many names: score just those pairs
+            scores = process.cpdist(names[left_names].tolist(), names[right_names].tolist(), **scoring)
+            matched[members] = scores > 0
+            continue
+
+        for start in range(0, len(distinct), NAME_BLOCK_ROWS):
+            scores = process.cdist(choices[start:start + NAME_BLOCK_ROWS], choices, **scoring)
+            in_block = (left_local >= start) & (left_local < start + NAME_BLOCK_ROWS)
+            matched[members[in_block]] = scores[left_local[in_block] - start, right_local[in_block]] > 0
+
+    left_codes, right_codes = school_codes[name_id[left]], school_codes[name_id[right]]
+    return matched & (pd.isna(left_codes) | pd.isna(right_codes) | (left_codes == right_codes))
+
+def find_duplicates(extracted_df, distance_m=DUPLICATE_DISTANCE_M, name_threshold=NAME_SIMILARITY):
+    """Flag repeated school submissions
+
+    Returns a frame aligned with extracted_df with Group (the first row of
+    each school's group of submissions, as a position), Duplicate (True for
+    every submission but the first) and Reason ("Exact QR" or "Nearby,
+    similar name", None for kept rows).
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    n = len(extracted_df)
+    exact = exact_pairs(extracted_df)
+
+    # Names are only compared for nearby rows
+    nearby = spatial_pairs(extracted_df, distance_m)
+    nearby = nearby[similar_names(extracted_df, nearby, name_threshold)]
+    codes = np.union1d(exact, nearby)
+
+    graph = coo_matrix((np.ones(len(codes), dtype=bool), (codes // max(n, 1), codes % max(n, 1))), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+
+    # Each component is represented by its first row
+    positions = np.arange(n)
+    group = pd.Series(positions).groupby(labels).transform("min").to_numpy()
+    duplicate = group != positions
+
+    in_exact = np.zeros(n, dtype=bool)
+    in_exact[np.concatenate([exact // max(n, 1), exact % max(n, 1)])] = True
+    reason = np.where(in_exact, "Exact QR", "Nearby, similar name").astype(object)
+    reason[~duplicate] = None
+
+    return pd.DataFrame({"Group": group, "Duplicate": duplicate, "Reason": reason}, index=extracted_df.index)
+
+def _payload_keys(extracted_df):
+    """uint64 hash of each row's QR_KEY_COLUMNS (candidates for exact repeats)"""
+    return pd.util.hash_pandas_object(extracted_df[QR_KEY_COLUMNS], index=False).to_numpy()
+
+def _touching_rows(rows, batch, distance_m):
+    """Positions in rows of the rows that could repeat a batch row (same payload, or nearby)"""
+    from scipy.spatial import cKDTree
+
+    if len(rows) == 0 or len(batch) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    # Exact repeats name the same school: only those rows are hashed
+    named_batch = batch[batch["School"].notna()]
+    same_school = np.flatnonzero(rows["School"].isin(named_batch["School"].unique()).to_numpy())
+    same_payload = same_school[np.isin(_payload_keys(rows.iloc[same_school]), _payload_keys(named_batch))]
+
+    nearby = np.zeros(len(rows), dtype=bool)
+    stored, stored_points = _projected_points(rows)
+    _, batch_points = _projected_points(batch)
+    if len(stored) and len(batch_points):
+        pairs = cKDTree(batch_points).sparse_distance_matrix(cKDTree(stored_points), distance_m, output_type="ndarray")
+        nearby[stored[pairs["j"]]] = True
+    nearby[same_payload] = True
+    return np.flatnonzero(nearby)
+
+def update_duplicates(rows, duplicates, kept, batch, distance_m=DUPLICATE_DISTANCE_M,
+                      name_threshold=NAME_SIMILARITY):
+    """find_duplicates of rows[kept] followed by batch, from the known repeats of rows
+
+    duplicates is find_duplicates(rows) (or an earlier result of this
+    function); kept masks the rows still present, e.g. not replaced by an
+    edited version. Only the batch is queried against the stored rows (one
+    KD-tree over their points and a hash match of QR payloads), and
+    find_duplicates runs again only over the groups a batch row can join or
+    that lost a row, so the cost depends on the batch, not on len(rows).
+    Returns the same frame as a full find_duplicates over the new rows.
+    """
+    kept = np.asarray(kept, dtype=bool)
+    group = duplicates["Group"].to_numpy(dtype=np.int64)
+    # New position of every kept row
+    position = np.cumsum(kept) - 1
+    n_kept = int(kept.sum())
+
+    # Groups that lost a row or that a batch row can join are regrouped
+    touching = _touching_rows(rows[kept], batch, distance_m)
+    regrouped = np.union1d(group[~kept], group[np.flatnonzero(kept)[touching]])
+    redo = np.flatnonzero(kept & np.isin(group, regrouped))
+
+    subset = pd.concat([rows.iloc[redo], batch], ignore_index=True)
+    subset_positions = np.concatenate([position[redo], n_kept + np.arange(len(batch))])
+    subset_duplicates = find_duplicates(subset, distance_m, name_threshold)
+
+    # Untouched groups keep their first row, so their flags carry over
+    result_group = np.empty(n_kept + len(batch), dtype=np.int64)
+    result_group[:n_kept] = position[group[kept]]
+    result_group[subset_positions] = subset_positions[subset_duplicates["Group"].to_numpy()]
+    reason = np.empty(n_kept + len(batch), dtype=object)
+    reason[:n_kept] = duplicates["Reason"].to_numpy()[kept]
+    reason[subset_positions] = subset_duplicates["Reason"].to_numpy()
+
+    duplicate = result_group != np.arange(len(result_group))
+    return pd.DataFrame({"Group": result_group, "Duplicate": duplicate, "Reason": reason})
+
+def deduplicated_counts(counts, extracted_df, duplicates):
+    """Per-chiefdom counts (see chiefdom_counts) with flagged duplicates removed"""
+    removed = chiefdom_counts(extracted_df[duplicates["Duplicate"].to_numpy()])
+    counts = counts.sub(removed, fill_value=0)
+    return counts[counts > 0].astype(int).rename("Actual")
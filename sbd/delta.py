@@ -0,0 +1,227 @@
+"""Incremental ingestion of growing submission exports
+
+Every export is a superset of the previous one, so only rows not seen
+before are extracted. A row is identified by its Submission Id and a
+fingerprint hashed over its QR text, GPS location and Created At fields:
+an unknown id is a new submission, a known id with a new fingerprint is an
+edited one that replaces the stored version. Each batch is appended to a
+Parquet dataset as one part file and the per-chiefdom counts are updated
+by the batch's counts alone, so a refresh costs in proportion to the new
+rows rather than the whole season. Repeated school submissions
+(sbd.dedup) are tracked the same way: only the batch is queried against
+the stored rows, and the repeat flags are written next to the counts.
+
+The store is append-only: rows that disappear from a later export are kept.
+Each store is read and updated under a lock of its own, so ingesting into
+one store never makes readers of another wait.
+"""
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from sbd.coverage import chiefdom_counts
+from sbd.dedup import DEDUP_VERSION, find_duplicates, update_duplicates
+from sbd.extract import QR_COLUMNS, compact_submissions, extract_gps_data_from_excel, find_qr_column
+from sbd.ingest import CACHE_DIR, EXTRACT_VERSION, file_fingerprint, read_workbook
+from sbd.shared import KeyLocks
+
+# Parts hold extracted rows, so a new extraction layout starts a new store
+DELTA_DIR = Path(os.environ.get("SBD_DELTA_DIR", CACHE_DIR / f"submissions-v{EXTRACT_VERSION}"))
+
+# Fields a row fingerprint is hashed over (the QR column is found per export)
+FINGERPRINT_COLUMNS = ["GPS Location", "Created At"]
+ID_COLUMN = "Submission Id"
+
+# Only these workbook columns are needed to fingerprint and extract a row
+READ_COLUMNS = {ID_COLUMN, *FINGERPRINT_COLUMNS, *QR_COLUMNS}
+
+# Columns kept for every live row to detect edits and retract their counts
+KEY_COLUMNS = ["Submission", "Fingerprint", "District", "Chiefdom"]
+
+_stores = {}
+_lock = threading.Lock()
+_store_locks = KeyLocks()
+
+
+def row_fingerprints(df):
+    """uint64 hash per row over the QR text, GPS location and Created At fields"""
+    columns = [find_qr_column(df)] + [c for c in FINGERPRINT_COLUMNS if c in df.columns]
+    # Compare as text: exports do not agree on cell types (e.g. Created At)
+    return pd.util.hash_pandas_object(df[columns].astype(str), index=False).rename("Fingerprint")
+
+def submission_ids(df, fingerprints):
+    """Submission Id per row, falling back to the fingerprint where there is none"""
+    fallback = fingerprints.map("{:016x}".format)
+    if ID_COLUMN not in df.columns:
+        return fallback.rename("Submission")
+    return df[ID_COLUMN].astype(str).where(df[ID_COLUMN].notna(), fallback).rename("Submission")
+
+def _part_paths(store_dir):
+    """Part files of a store in ingestion order"""
+    return sorted(store_dir.glob("part-*.parquet"))
+
+def _counts_path(store_dir, part_number):
+    """Counts snapshot written together with the given part"""
+    return store_dir / f"counts-{part_number:05d}.parquet"
+
+def _repeats_path(store_dir, part_number):
+    """Repeat flags of the live rows, written together with the given part"""
+    return store_dir / f"repeats-v{DEDUP_VERSION}-{part_number:05d}.parquet"
+
+def _open_store(store_dir):
+    """Rebuild the live row keys and counts of a store from its part files"""
+    parts = _part_paths(store_dir)
+    frames = [pd.read_parquet(part, columns=KEY_COLUMNS) for part in parts]
+    keys = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=KEY_COLUMNS)
+    keys = keys.drop_duplicates("Submission", keep="last").reset_index(drop=True)
+
+    counts_path = _counts_path(store_dir, len(parts) - 1)
+    if parts and counts_path.exists():
+        counts = pd.read_parquet(counts_path).set_index(["District", "Chiefdom"])["Actual"]
+    else:
+        counts = chiefdom_counts(keys)
+
+    return {
+        "parts": len(parts),
+        "sources": {part.stem.split("-", 2)[2] for part in parts},
+        "keys": keys,
+        "counts": counts,
+        "rows": None,
+        "duplicates": None,
+    }
+
+def _store_lock(store_dir):
+    """The lock a store is read and updated under"""
+    return _store_locks(str(Path(store_dir).resolve()))
+
+def _store(store_dir):
+    """In-process state of a store, opened on first use (caller holds the store's lock)"""
+    store_dir = Path(store_dir)
+    key = str(store_dir.resolve())
+    with _lock:
+        store = _stores.get(key)
+    if store is None:
+        store = _open_store(store_dir)
+        with _lock:
+            _stores[key] = store
+    return store
+
+def _rows(store_dir, store):
+    """Every live row of a store, read from its part files on first use (caller holds the store's lock)"""
+    if store["rows"] is None:
+        frames = [pd.read_parquet(part) for part in _part_paths(store_dir)]
+        rows = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=KEY_COLUMNS)
+        rows = rows.drop_duplicates("Submission", keep="last").reset_index(drop=True)
+        # Parts concatenate with their own categories; restore the compact layout
+        store["rows"] = compact_submissions(rows)
+    return store["rows"]
+
+def _duplicates(store_dir, store):
+    """Repeat flags of a store's live rows, read or (once) computed on first use (caller holds the store's lock)"""
+    if store["duplicates"] is None:
+        rows = _rows(store_dir, store)
+        path = _repeats_path(store_dir, store["parts"] - 1)
+        duplicates = pd.read_parquet(path) if store["parts"] and path.exists() else None
+        if len(rows) == 0:
+            duplicates = pd.DataFrame(columns=["Group", "Duplicate", "Reason"])
+        elif duplicates is None or len(duplicates) != len(rows):
+            # A store written before repeats were tracked (or with other rules)
+            duplicates = find_duplicates(rows).reset_index(drop=True)
+            if store["parts"]:
+                _write_parquet(duplicates, path)
+        store["duplicates"] = duplicates
+    return store["duplicates"]
+
+def ingest_delta(path, store_dir=DELTA_DIR):
+    """Append the new and edited rows of an export to the store; returns how many
+
+    An export whose content was already ingested is skipped without being
+    read. Otherwise only rows whose (Submission Id, fingerprint) pair is not
+    stored are extracted, and only they are checked for repeats of the
+    stored rows (update_duplicates).
+    """
+    store_dir = Path(store_dir)
+    content = file_fingerprint(path).split("-")[0]
+
+    with _store_lock(store_dir):
+        store = _store(store_dir)
+        if content in store["sources"]:
+            return 0
+
+        raw = read_workbook(path, READ_COLUMNS)
+        fingerprints = row_fingerprints(raw)
+        ids = submission_ids(raw, fingerprints)
+
+        keys = store["keys"]
+        stored_pairs = pd.MultiIndex.from_arrays([keys["Submission"], keys["Fingerprint"].astype("uint64")])
+        fresh = ~pd.MultiIndex.from_arrays([ids, fingerprints]).isin(stored_pairs)
+
+        batch = extract_gps_data_from_excel(raw[fresh])
+        batch["Chiefdom"] = batch["Chiefdom"].astype(str).where(batch["Chiefdom"].notna())
+        batch.insert(0, "Submission", ids[fresh].to_numpy())
+        batch.insert(1, "Fingerprint", fingerprints[fresh].to_numpy())
+        batch = batch.drop_duplicates("Submission", keep="last")
+
+        # Edited submissions replace their stored version: retract its counts
+        replaced = keys["Submission"].isin(batch["Submission"])
+        counts = store["counts"].sub(chiefdom_counts(keys[replaced]), fill_value=0)
+        counts = counts.add(chiefdom_counts(batch), fill_value=0)
+        counts = counts[counts > 0].astype(int).rename("Actual")
+
+        rows = _rows(store_dir, store)
+        live = ~rows["Submission"].isin(batch["Submission"]).to_numpy()
+        duplicates = update_duplicates(rows, _duplicates(store_dir, store), live, batch)
+
+        part_number = store["parts"]
+        store_dir.mkdir(parents=True, exist_ok=True)
+        _write_parquet(batch, store_dir / f"part-{part_number:05d}-{content}.parquet")
+        _write_parquet(counts.reset_index(), _counts_path(store_dir, part_number))
+        _write_parquet(duplicates, _repeats_path(store_dir, part_number))
+        for stale in [_counts_path(store_dir, part_number - 1), _repeats_path(store_dir, part_number - 1)]:
+            if stale.exists():
+                stale.unlink()
+
+        store["parts"] = part_number + 1
+        store["sources"].add(content)
+        store["keys"] = pd.concat([keys[~replaced], batch[KEY_COLUMNS]], ignore_index=True)
+        store["counts"] = counts
+        store["rows"] = compact_submissions(pd.concat([rows[live], batch], ignore_index=True))
+        store["duplicates"] = duplicates
+        return len(batch)
+
+def _write_parquet(frame, path):
+    """Write a frame atomically so readers never see a partial part"""
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    frame.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+def delta_counts(store_dir=DELTA_DIR):
+    """Live submissions per (District, Chiefdom), maintained batch by batch
+
+    The returned Series is shared between callers and must be treated as read-only.
+    """
+    with _store_lock(store_dir):
+        return _store(store_dir)["counts"]
+
+def load_delta_rows(store_dir=DELTA_DIR):
+    """Every live extracted row in the store (the latest version of each submission)
+
+    Read from the part files once per process and then kept up to date by
+    ingest_delta. The returned frame is shared between callers and must be
+    treated as read-only.
+    """
+    store_dir = Path(store_dir)
+    with _store_lock(store_dir):
+        return _rows(store_dir, _store(store_dir))
+
+def delta_duplicates(store_dir=DELTA_DIR):
+    """Repeat flags (see find_duplicates) of the rows of load_delta_rows, in the same order
+
+    Maintained batch by batch by ingest_delta. The returned frame is shared
+    between callers and must be treated as read-only.
+    """
+    store_dir = Path(store_dir)
+    with _store_lock(store_dir):
+        return _duplicates(store_dir, _store(store_dir))
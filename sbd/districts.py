@@ -0,0 +1,45 @@
+"""Registry of the districts the dashboards are built for
+
+Districts come from the shapefile's FIRST_DNAM column. A district is listed
+as soon as it has target data or submissions, so extending the campaign
+only needs new targets or data, not new code.
+"""
+import pandas as pd
+
+
+def district_registry(gdf, targets=None, extracted_df=None):
+    """Return one row per district with Chiefdoms, Targeted and Submissions counts
+
+    Targeted counts shapefile chiefdoms with a row in the targets table (any
+    campaign round) and Submissions counts extracted rows per (upper-case)
+    district. Only districts with targets or submissions are kept, unless
+    neither source is given. The index (District) is sorted by name.
+    """
+    chiefdoms = gdf[["FIRST_DNAM", "FIRST_CHIE"]].dropna().drop_duplicates()
+    by_district = chiefdoms.groupby("FIRST_DNAM")
+
+    registry = pd.DataFrame({"Chiefdoms": by_district.size()})
+    registry.index.name = "District"
+    registry["Targeted"] = 0
+    registry["Submissions"] = 0
+
+    if targets is not None:
+        target_keys = targets.index.droplevel("Round").unique()
+        targeted = pd.MultiIndex.from_frame(chiefdoms).isin(target_keys)
+        registry["Targeted"] = pd.Series(targeted, index=chiefdoms.index).groupby(chiefdoms["FIRST_DNAM"]).sum().astype(int)
+
+    if extracted_df is not None:
+        submissions = extracted_df["District"].dropna().str.upper().value_counts()
+        registry["Submissions"] = submissions.reindex(registry.index, fill_value=0).astype(int)
+
+    if targets is not None or extracted_df is not None:
+        registry = registry[(registry["Targeted"] > 0) | (registry["Submissions"] > 0)]
+
+    return registry.sort_index()
+
+def format_district_list(districts):
+    """Join district names for prose, e.g. 'BO, KENEMA and BOMBALI'"""
+    districts = list(districts)
+    if len(districts) <= 1:
+        return "".join(districts)
+    return f"{', '.join(districts[:-1])} and {districts[-1]}"
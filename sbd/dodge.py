@@ -0,0 +1,76 @@
+"""Separation of overlapping GPS points for map display
+
+Points closer than min_distance are grouped into clusters with a KD-tree
+(O(n log n)) and each cluster is spread deterministically around its
+centroid: small clusters on a ring, larger ones on a sunflower spiral.
+"""
+import numpy as np
+
+# Clusters up to this size are laid out on a single ring
+MAX_RING_SIZE = 6
+
+GOLDEN_ANGLE = np.pi * (3 - np.sqrt(5))
+
+
+def find_clusters(lats, lons, min_distance=0.001):
+    """Label points so that any two within min_distance share a cluster"""
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+    from scipy.spatial import cKDTree
+
+    n_points = len(lats)
+    if n_points == 0:
+        return np.zeros(0, dtype=int)
+
+    tree = cKDTree(np.column_stack([lats, lons]))
+    pairs = tree.query_pairs(min_distance, output_type="ndarray")
+    if len(pairs) == 0:
+        return np.arange(n_points)
+
+    graph = coo_matrix(
+        (np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])),
+        shape=(n_points, n_points),
+    )
+    _, labels = connected_components(graph, directed=False)
+    return labels
+
+def separate_overlapping_points(lats, lons, min_distance=0.001):
+    """Separate overlapping GPS points by spreading each cluster around its centroid
+
+    Returns (adjusted_lats, adjusted_lons, cluster_sizes); cluster_sizes gives,
+    for every point, the number of points in its cluster (1 = not moved).
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+
+    labels = find_clusters(lats, lons, min_distance)
+    counts = np.bincount(labels) if len(labels) else np.zeros(0, dtype=int)
+    cluster_sizes = counts[labels]
+
+    adjusted_lats, adjusted_lons = lats.copy(), lons.copy()
+    moved = cluster_sizes > 1
+    if not moved.any():
+        return adjusted_lats, adjusted_lons, cluster_sizes
+
+    # Cluster centroids
+    centre_lats = np.bincount(labels, weights=lats) / counts
+    centre_lons = np.bincount(labels, weights=lons) / counts
+
+    # Position of each point within its cluster, in input order
+    order = np.argsort(labels, kind="stable")
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.empty(len(labels), dtype=int)
+    rank[order] = np.arange(len(labels)) - starts[labels[order]]
+
+    spacing = min_distance * 1.5
+    ring = cluster_sizes <= MAX_RING_SIZE
+
+    # Small clusters: evenly spaced on a ring
+    angle = np.where(ring, 2 * np.pi * rank / cluster_sizes, rank * GOLDEN_ANGLE)
+    # Large clusters: sunflower spiral keeps neighbours roughly `spacing` apart
+    radius = np.where(ring, spacing, spacing * np.sqrt(rank))
+
+    adjusted_lats[moved] = centre_lats[labels[moved]] + radius[moved] * np.cos(angle[moved])
+    adjusted_lons[moved] = centre_lons[labels[moved]] + radius[moved] * np.sin(angle[moved])
+
+    return adjusted_lats, adjusted_lons, cluster_sizes
@@ -0,0 +1,128 @@
+"""Extraction of district, chiefdom and GPS fields from SBD submissions"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from sbd.gps import parse_gps_column
+from sbd.names import resolve_chiefdom_names
+
+# QR payload fields: (label in the QR text, output column, dtype)
+QR_FIELDS = [
+    ("District", "District", "text"),
+    ("Chiefdom", "Chiefdom", "text"),
+    ("PHU name", "PHU", "text"),
+    ("Community name", "Community", "text"),
+    ("Name of school", "School", "text"),
+    ("Enrollment", "Enrollment", "int"),
+]
+
+# Column holding the QR payload, by export layout (first match wins)
+QR_COLUMNS = ["Scan QR code", "Scan the QR code"]
+
+# The only workbook columns extraction reads
+SOURCE_COLUMNS = {*QR_COLUMNS, "GPS Location"}
+
+# Compact dtypes of the extracted frame: repeated names as categories,
+# coordinates as float32 (below 0.1 m at Sierra Leone's latitudes) and
+# enrollment as a 32-bit nullable integer. GPS_Status is already int8.
+EXTRACTED_DTYPES = {
+    "District": "category",
+    "Chiefdom": "category",
+    "Latitude": "float32",
+    "Longitude": "float32",
+    "GPS_Status": "int8",
+    "PHU": "category",
+    "Community": "category",
+    "Enrollment": "Int32",
+}
+
+def _build_qr_pattern(fields):
+    """Build one pattern that captures every QR field in a single pass
+
+    Each field is an optional lookahead from the start of the text, so fields
+    may appear in any order and missing fields simply yield NaN.
+    """
+    parts = []
+    for i, (label, _, _) in enumerate(fields):
+        parts.append(rf"(?:(?=[\s\S]*?{re.escape(label)}:\s*(?P<f{i}>[^\n]+)))?")
+    return re.compile("^" + "".join(parts))
+
+QR_PATTERN = _build_qr_pattern(QR_FIELDS)
+
+def extract_qr_fields(qr_series):
+    """Extract all QR fields from a column of QR texts into typed columns"""
+    valid = qr_series.notna()
+    qr_text = qr_series[valid].astype(str)
+    
+    # One regex pass over the whole column
+    raw = qr_text.str.extract(QR_PATTERN).reindex(qr_series.index)
+    
+    fields = pd.DataFrame(index=qr_series.index)
+    for i, (_, column, kind) in enumerate(QR_FIELDS):
+        values = raw[f"f{i}"].str.strip()
+        if kind == "int":
+            # Only whole numbers are counts; anything else (e.g. 157.5) is missing
+            numbers = pd.to_numeric(values, errors="coerce")
+            fields[column] = numbers.where((numbers % 1 == 0) & (numbers.abs() < 2**63)).astype("Int64")
+        else:
+            fields[column] = values
+    
+    return fields
+
+def find_qr_column(df):
+    """Name of the QR payload column in a submissions export"""
+    for column in QR_COLUMNS:
+        if column in df.columns:
+            return column
+    raise KeyError(f"No QR code column found (expected one of {QR_COLUMNS})")
+
+def compact_submissions(extracted_df):
+    """Cast an extracted frame to EXTRACTED_DTYPES (e.g. again after concatenating parts)
+
+    Enrollment values outside the Int32 range become missing rather than
+    wrapping around.
+    """
+    if "Enrollment" in extracted_df.columns:
+        limits = np.iinfo(EXTRACTED_DTYPES["Enrollment"].lower())
+        enrollment = extracted_df["Enrollment"]
+        in_range = enrollment.between(limits.min, limits.max).fillna(False).astype(bool)
+        extracted_df = extracted_df.assign(Enrollment=enrollment.where(in_range))
+    return extracted_df.astype({c: dtype for c, dtype in EXTRACTED_DTYPES.items() if c in extracted_df.columns})
+
+def extract_gps_data_from_excel(df):
+    """Extract GPS data from the Excel file
+
+    Only SOURCE_COLUMNS of df are used; the result has the compact
+    EXTRACTED_DTYPES layout and keeps no raw GPS text (GPS_Status records
+    how each location parsed).
+    """
+    qr_column = find_qr_column(df)
+    fields = extract_qr_fields(df[qr_column])
+    
+    # Map chiefdom names to match shapefile, once per distinct name
+    fields["Chiefdom"] = resolve_chiefdom_names(fields["Chiefdom"])
+    
+    # Get GPS Location for rows that carry a QR payload
+    if "GPS Location" in df.columns:
+        gps_locations = df["GPS Location"].where(df[qr_column].notna())
+    else:
+        gps_locations = pd.Series(None, index=df.index, dtype=object)
+    
+    # Parse coordinates once here so plotting receives numeric columns
+    coords = parse_gps_column(gps_locations)
+    
+    # Create a new DataFrame with extracted values
+    extracted_df = pd.DataFrame({
+        "District": fields["District"],
+        "Chiefdom": fields["Chiefdom"],
+        "Latitude": coords["Latitude"],
+        "Longitude": coords["Longitude"],
+        "GPS_Status": coords["GPS_Status"],
+        "PHU": fields["PHU"],
+        "Community": fields["Community"],
+        "School": fields["School"],
+        "Enrollment": fields["Enrollment"],
+    }).reset_index(drop=True)
+    
+    return compact_submissions(extracted_df)
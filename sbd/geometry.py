@@ -0,0 +1,110 @@
+"""Cached chiefdom geometry with pre-simplified levels for plotting
+
+The shapefile is read and simplified once; the result (district
+membership, full-resolution bounds and WKB geometry at every level) is
+stored as Parquet next to the ingestion cache and loaded from there on
+later runs.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from sbd.ingest import file_fingerprint, read_cached_frame, write_cached_frame
+
+SHAPEFILE = "Chiefdom2021.shp"
+
+# Bump whenever the cached layout or the simplification levels change
+GEOMETRY_VERSION = 1
+
+# Simplification tolerance (degrees) -> geometry column, finest first
+SIMPLIFIED_COLUMNS = {
+    0.0001: "geometry_0001",
+    0.0003: "geometry_0003",
+    0.001: "geometry_001",
+    0.003: "geometry_003",
+}
+
+BOUNDS_COLUMNS = ["minx", "miny", "maxx", "maxy"]
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def shapefile_key(shapefile):
+    """Cache key covering the geometry (.shp) and attribute (.dbf) files"""
+    dbf = shapefile[:-4] + ".dbf"
+    return f"chiefdoms-{file_fingerprint(shapefile)}-{file_fingerprint(dbf)}-g{GEOMETRY_VERSION}"
+
+def build_geometry_table(shapefile=SHAPEFILE):
+    """Read the shapefile and simplify every chiefdom at each tolerance level"""
+    import geopandas as gpd
+    import shapely
+
+    gdf = gpd.read_file(shapefile)
+    geometries = gdf.geometry.values
+
+    table = pd.DataFrame({
+        "FIRST_DNAM": gdf["FIRST_DNAM"],
+        "FIRST_CHIE": gdf["FIRST_CHIE"],
+    })
+    table[BOUNDS_COLUMNS] = shapely.bounds(geometries)
+    table["geometry"] = shapely.to_wkb(geometries)
+    for tolerance, column in SIMPLIFIED_COLUMNS.items():
+        table[column] = shapely.to_wkb(shapely.simplify(geometries, tolerance))
+    return table
+
+def load_chiefdoms(shapefile=SHAPEFILE):
+    """Load chiefdom polygons with full-resolution and simplified geometry columns
+
+    The active geometry is full resolution (used for spatial joins); the
+    simplified levels are extra geometry columns picked by plot_geometry.
+    The returned frame is shared and must be treated as read-only.
+    """
+    import geopandas as gpd
+    import shapely
+
+    key = shapefile_key(shapefile)
+
+    with _lock:
+        if key in _loaded:
+            return _loaded[key]
+
+        table = read_cached_frame(key)
+        if table is None:
+            table = build_geometry_table(shapefile)
+            write_cached_frame(key, table)
+
+        gdf = gpd.GeoDataFrame(
+            table[["FIRST_DNAM", "FIRST_CHIE"] + BOUNDS_COLUMNS],
+            geometry=gpd.GeoSeries(shapely.from_wkb(table["geometry"].to_numpy()), index=table.index),
+        )
+        for column in SIMPLIFIED_COLUMNS.values():
+            gdf[column] = gpd.GeoSeries(shapely.from_wkb(table[column].to_numpy()), index=table.index)
+
+        _loaded.clear()
+        _loaded[key] = gdf
+        return gdf
+
+def geometry_bounds(gdf):
+    """Total bounds of a chiefdom selection, from precomputed columns when present"""
+    if all(column in gdf.columns for column in BOUNDS_COLUMNS):
+        return np.array([
+            gdf["minx"].min(), gdf["miny"].min(), gdf["maxx"].max(), gdf["maxy"].max(),
+        ])
+    return gdf.total_bounds
+
+def tolerance_for_dpi(bounds, dpi, axes_inches):
+    """Coarsest cached tolerance that stays below one output pixel"""
+    extent = max(bounds[2] - bounds[0], bounds[3] - bounds[1])
+    pixel_size = extent / (axes_inches * dpi)
+    usable = [tolerance for tolerance in SIMPLIFIED_COLUMNS if tolerance <= pixel_size]
+    return max(usable) if usable else 0
+
+def plot_geometry(gdf, dpi, axes_inches):
+    """Return gdf with the simplification level that matches the output resolution"""
+    tolerance = tolerance_for_dpi(geometry_bounds(gdf), dpi, axes_inches)
+    column = SIMPLIFIED_COLUMNS.get(tolerance)
+    if column is None or column not in gdf.columns:
+        return gdf
+    return gdf.set_geometry(column)
@@ -0,0 +1,112 @@
+"""GPS coordinate parsing for single values and whole columns"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# Per-row parse status codes
+GPS_OK = 0
+GPS_MISSING = 1
+GPS_INVALID = 2
+GPS_OUT_OF_BOUNDS = 3
+
+# Plausible extent of Sierra Leone, used to reject bad fixes
+LAT_RANGE = (6.0, 11.0)
+LON_RANGE = (-14.0, -10.0)
+
+_NUMBER = r"-?\d+\.?\d*"
+
+
+def parse_gps_coordinates(gps_str):
+    """Enhanced GPS coordinate parsing that handles multiple formats"""
+    if pd.isna(gps_str):
+        return None, None
+
+    gps_str = str(gps_str).strip()
+    lat, lon = None, None
+
+    # Format 1: "8.6103181,-12.2029534"
+    if ',' in gps_str and not ' ' in gps_str:
+        try:
+            parts = gps_str.split(',')
+            if len(parts) == 2:
+                lat = float(parts[0].strip())
+                lon = float(parts[1].strip())
+        except ValueError:
+            pass
+
+    # Format 2: "8.6103181 -12.2029534" (space separated)
+    elif ' ' in gps_str and ',' not in gps_str:
+        try:
+            parts = gps_str.split()
+            if len(parts) == 2:
+                lat = float(parts[0].strip())
+                lon = float(parts[1].strip())
+        except ValueError:
+            pass
+
+    # Format 3: Other formats with parentheses, etc.
+    else:
+        # Extract numbers using regex
+        numbers = re.findall(_NUMBER, gps_str)
+        if len(numbers) >= 2:
+            try:
+                lat = float(numbers[0])
+                lon = float(numbers[1])
+            except ValueError:
+                pass
+
+    return lat, lon
+
+def parse_gps_column(gps_series):
+    """Parse a whole column of GPS strings into numeric coordinates
+
+    Handles the same three formats as parse_gps_coordinates with vectorised
+    string operations. Returns a DataFrame aligned with the input with
+    float64 Latitude/Longitude columns and an int8 GPS_Status code
+    (GPS_OK, GPS_MISSING, GPS_INVALID or GPS_OUT_OF_BOUNDS).
+    """
+    missing = gps_series.isna().to_numpy()
+    text = gps_series.astype(object).where(~missing, "").astype(str).str.strip()
+
+    has_comma = text.str.contains(",", regex=False)
+    has_space = text.str.contains(" ", regex=False)
+
+    # Each row uses exactly one of the three formats
+    patterns = [
+        (has_comma & ~has_space, r"^([^,]*),([^,]*)$"),  # "lat,lon"
+        (has_space & ~has_comma, r"^(\S+)\s+(\S+)$"),    # "lat lon"
+        # Anything else: first two numbers; the lookahead/backreference pair makes
+        # the first number atomic so "8.5" is not split into "8." and "5"
+        (~(has_comma ^ has_space), rf"(?=(?P<first>{_NUMBER}))(?P=first)[\s\S]*?({_NUMBER})"),
+    ]
+
+    lat = np.full(len(text), np.nan)
+    lon = np.full(len(text), np.nan)
+    for mask, pattern in patterns:
+        mask = mask.to_numpy() & ~missing
+        if not mask.any():
+            continue
+        parts = text[mask].str.extract(pattern)
+        lat[mask] = pd.to_numeric(parts.iloc[:, 0].str.strip(), errors="coerce").to_numpy(dtype=float)
+        lon[mask] = pd.to_numeric(parts.iloc[:, 1].str.strip(), errors="coerce").to_numpy(dtype=float)
+
+    parsed = ~(np.isnan(lat) | np.isnan(lon))
+    in_bounds = (
+        (lat >= LAT_RANGE[0]) & (lat <= LAT_RANGE[1]) &
+        (lon >= LON_RANGE[0]) & (lon <= LON_RANGE[1])
+    )
+    status = np.select(
+        [missing, ~parsed, ~in_bounds],
+        [GPS_MISSING, GPS_INVALID, GPS_OUT_OF_BOUNDS],
+        default=GPS_OK,
+    ).astype(np.int8)
+
+    # Coordinates are only reported for rows that parsed completely
+    lat[~parsed] = np.nan
+    lon[~parsed] = np.nan
+
+    return pd.DataFrame(
+        {"Latitude": lat, "Longitude": lon, "GPS_Status": status},
+        index=gps_series.index,
+    )
@@ -0,0 +1,195 @@
+"""Cached loading of SBD submission workbooks
+
+Parsed and extracted frames are keyed on the workbook's content hash and
+modification time. A bounded in-process cache serves repeated Streamlit
+reruns, and a Parquet copy on disk survives process restarts.
+
+Workbooks are read with the calamine engine (python-calamine, about ten
+times faster than openpyxl on these exports) when it is installed, and
+openpyxl otherwise; only the columns a caller needs are materialized.
+Archived exports can be converted to Parquet once, after which the
+archive is read instead of the sheet.
+
+A workbook is parsed under a lock of its own cache key, so loading one
+workbook never makes callers of another wait.
+"""
+import hashlib
+import importlib.util
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+from sbd.extract import SOURCE_COLUMNS, extract_gps_data_from_excel
+from sbd.shared import KeyLocks
+
+# Bump whenever the extracted frame changes shape so stale disk copies are ignored
+EXTRACT_VERSION = 5
+
+CACHE_DIR = Path(os.environ.get("SBD_CACHE_DIR", ".sbd_cache"))
+MAX_MEMORY_ENTRIES = 8
+
+# Excel engines by preference, with the module each one needs
+EXCEL_ENGINES = {
+    "calamine": "python_calamine",
+    "openpyxl": "openpyxl",
+}
+
+# Set SBD_EXCEL_ENGINE to force one engine (e.g. to compare them)
+ENGINE_OVERRIDE = os.environ.get("SBD_EXCEL_ENGINE")
+
+ARCHIVE_DIR = Path(os.environ.get("SBD_ARCHIVE_DIR", CACHE_DIR / "workbooks"))
+
+_memory_cache = OrderedDict()
+_stat_index = {}
+_lock = threading.Lock()
+_build_locks = KeyLocks()
+
+
+def file_fingerprint(path):
+    """Return a fingerprint built from the file's content hash and mtime"""
+    path = Path(path)
+    stat = path.stat()
+    stat_key = (stat.st_mtime_ns, stat.st_size)
+
+    # Only re-hash the file when its stat signature has changed
+    cached = _stat_index.get(str(path.resolve()))
+    if cached and cached[0] == stat_key:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+
+    fingerprint = f"{digest.hexdigest()[:24]}-{stat.st_mtime_ns}"
+    _stat_index[str(path.resolve())] = (stat_key, fingerprint)
+    return fingerprint
+
+def _remember(key, extracted_df):
+    """Store a frame in the in-process cache, evicting the least recently used"""
+    _memory_cache[key] = extracted_df
+    _memory_cache.move_to_end(key)
+    while len(_memory_cache) > MAX_MEMORY_ENTRIES:
+        _memory_cache.popitem(last=False)
+
+def read_cached_frame(key):
+    """Load a previously cached frame from the on-disk Parquet cache"""
+    parquet_path = CACHE_DIR / f"{key}.parquet"
+    if not parquet_path.exists():
+        return None
+    try:
+        return pd.read_parquet(parquet_path)
+    except Exception:
+        # A corrupt or unreadable copy is simply rebuilt
+        return None
+
+def write_cached_frame(key, frame):
+    """Persist a frame as Parquet in the cache directory, ignoring failures"""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        parquet_path = CACHE_DIR / f"{key}.parquet"
+        tmp_path = parquet_path.with_suffix(f".{os.getpid()}.tmp")
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, parquet_path)
+    except (ImportError, OSError, ValueError):
+        # Disk caching is an optimisation only (e.g. pyarrow missing or read-only FS)
+        pass
+
+def available_engines():
+    """Installed Excel engines, most preferred first"""
+    return [engine for engine, module in EXCEL_ENGINES.items() if importlib.util.find_spec(module) is not None]
+
+def excel_engine(preferred=None):
+    """Engine to read workbooks with: preferred (or SBD_EXCEL_ENGINE) if installed, else the best installed one"""
+    available = available_engines()
+    preferred = preferred or ENGINE_OVERRIDE
+    if preferred in available:
+        return preferred
+    if not available:
+        raise ImportError(f"Reading .xlsx files needs one of: {', '.join(EXCEL_ENGINES.values())}")
+    return available[0]
+
+def archive_path(path, archive_dir=ARCHIVE_DIR):
+    """Parquet archive of a workbook, named after its content so an edited workbook gets a new one"""
+    content = file_fingerprint(path).split("-")[0]
+    return Path(archive_dir) / f"{Path(path).stem}-{content}.parquet"
+
+def convert_workbook(path, archive_dir=ARCHIVE_DIR, engine=None):
+    """Convert a workbook (every column) to its Parquet archive; returns the archive path
+
+    Columns holding mixed cell types (e.g. text and dates) are stored as
+    text, which is how ingestion compares them anyway. An existing archive
+    of the same content is kept.
+    """
+    target = archive_path(path, archive_dir)
+    if target.exists():
+        return target
+
+    frame = pd.read_excel(path, engine=excel_engine(engine))
+    for column in frame.columns[frame.dtypes == object]:
+        frame[column] = frame[column].astype(str).where(frame[column].notna())
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_suffix(f".{os.getpid()}.tmp")
+    frame.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, target)
+    return target
+
+def read_workbook(path, columns=None, engine=None, archive_dir=ARCHIVE_DIR):
+    """Read a workbook, keeping only the named columns (all when None)
+
+    Names the workbook lacks are ignored. A converted workbook is read from
+    its Parquet archive; otherwise the sheet is parsed with
+    excel_engine(engine).
+    """
+    archived = archive_path(path, archive_dir)
+    if archived.exists():
+        if columns is None:
+            return pd.read_parquet(archived)
+        import pyarrow.parquet as pq
+
+        present = [column for column in pq.read_schema(archived).names if column in columns]
+        return pd.read_parquet(archived, columns=present)
+
+    usecols = None if columns is None else (lambda column: column in columns)
+    return pd.read_excel(path, engine=excel_engine(engine), usecols=usecols)
+
+def load_submissions(path):
+    """Load and extract a submission workbook, skipping parsing when it is unchanged
+
+    The returned frame is shared between callers and must be treated as read-only.
+    """
+    key = f"{file_fingerprint(path)}-v{EXTRACT_VERSION}"
+
+    with _lock:
+        if key in _memory_cache:
+            _memory_cache.move_to_end(key)
+            return _memory_cache[key]
+
+    with _build_locks(key):
+        # Another caller may have loaded it while this one waited
+        with _lock:
+            extracted_df = _memory_cache.get(key)
+        if extracted_df is not None:
+            return extracted_df
+
+        extracted_df = read_cached_frame(key)
+        if extracted_df is None:
+            # Only the columns extraction needs; the raw frame is released right after
+            df_original = read_workbook(path, SOURCE_COLUMNS)
+            extracted_df = extract_gps_data_from_excel(df_original)
+            del df_original
+            write_cached_frame(key, extracted_df)
+
+        with _lock:
+            _remember(key, extracted_df)
+        return extracted_df
+
+def clear_cache():
+    """Drop all in-process cache entries (disk copies are left in place)"""
+    with _lock:
+        _memory_cache.clear()
+        _stat_index.clear()
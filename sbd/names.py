@@ -0,0 +1,151 @@
+"""Chiefdom name resolution from QR-code spellings to shapefile FIRST_CHIE names
+
+The resolution index is built once per process. Raw names are normalised
+(case, whitespace, punctuation and parentheticals) and each distinct raw
+name in a column is resolved only once.
+"""
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+def create_chiefdom_mapping():
+    """Create mapping between GPS data chiefdom names and shapefile FIRST_CHIE names"""
+    chiefdom_mapping = {
+        # BO District mappings
+        "Bo City": "BO TOWN",
+        "Badjia": "BADJIA",
+        "Bargbo": "BAGBO",
+        "Bagbwe": "BAGBWE(BAGBE)",
+        "Baoma": "BOAMA",
+        "Bongor": "BONGOR",
+        "Bumpeh": "BUMPE NGAO",
+        "Gbo": "GBO",
+        "Jaiama": "JAIAMA",
+        "Kakua": "KAKUA",
+        "Komboya": "KOMBOYA",
+        "Lugbu": "LUGBU",
+        "Niawa Lenga": "NIAWA LENGA",
+        "Selenga": "SELENGA",
+        "Tinkoko": "TIKONKO",
+        "Valunia": "VALUNIA",
+        "Wonde": "WONDE",
+        
+        # BOMBALI District mappings
+        "Biriwa": "BIRIWA",
+        "Bombali Sebora": "BOMBALI SEBORA",
+        "Bombali Serry": "BOMBALI SIARI",
+        "Gbanti (Bombali)": "GBANTI",
+        "Gbanti": "GBANTI",
+        "Gbendembu": "GBENDEMBU",
+        "Kamaranka": "KAMARANKA",
+        "Magbaimba Ndohahun": "MAGBAIMBA NDORWAHUN",
+        "Makarie": "MAKARI",
+        "Mara": "MARA",
+        "Ngowahun": "N'GOWAHUN",
+        "Paki Masabong": "PAKI MASABONG",
+        "Safroko Limba": "SAFROKO LIMBA",
+        "Makeni City": "MAKENI CITY",
+    }
+    return chiefdom_mapping
+
+def normalize_name(name):
+    """Normalise a chiefdom name for lookup: upper case, no parentheticals or punctuation"""
+    name = str(name).upper()
+    name = re.sub(r"\([^)]*\)", " ", name)
+    name = re.sub(r"[^A-Z0-9]+", " ", name)
+    return " ".join(name.split())
+
+def build_name_index(mapping):
+    """Build a normalised-name -> shapefile-name index from a raw mapping"""
+    index = {}
+    for key, value in mapping.items():
+        index.setdefault(normalize_name(key), value)
+    # Shapefile names resolve to themselves
+    for value in mapping.values():
+        index.setdefault(normalize_name(value), value)
+    return index
+
+@lru_cache(maxsize=1)
+def get_name_index():
+    """Return the default resolution index, built once per process"""
+    return build_name_index(create_chiefdom_mapping())
+
+def resolve_chiefdom(chiefdom_name, index):
+    """Resolve a single raw chiefdom name against a prebuilt index"""
+    if pd.isna(chiefdom_name):
+        return None
+    
+    chiefdom_name = str(chiefdom_name).strip()
+    normalized = normalize_name(chiefdom_name)
+    
+    # Exact match on the normalised form
+    if normalized in index:
+        return index[normalized]
+    
+    # Partial match (contains)
+    if normalized:
+        for key, value in index.items():
+            if key in normalized or normalized in key:
+                return value
+    
+    # Return original if no mapping found
+    return chiefdom_name
+
+def map_chiefdom_name(chiefdom_name, mapping=None):
+    """Map chiefdom name from GPS data to shapefile name"""
+    index = get_name_index() if mapping is None else build_name_index(mapping)
+    return resolve_chiefdom(chiefdom_name, index)
+
+def resolve_chiefdom_names(names, index=None):
+    """Resolve a column of raw chiefdom names, returning a categorical Series
+
+    Each distinct raw name is resolved once and the result is broadcast back
+    to every row through the factorised codes.
+    """
+    if index is None:
+        index = get_name_index()
+    
+    codes, uniques = pd.factorize(names)
+    resolved = np.array([resolve_chiefdom(name, index) for name in uniques] + [None], dtype=object)
+    
+    # Missing values have code -1, which picks the trailing None
+    return pd.Series(resolved[codes], index=names.index, dtype="category", name=names.name)
+
+def unresolved_chiefdom_report(chiefdoms, index=None):
+    """List chiefdom names that are not shapefile names, with a fuzzy suggestion
+
+    Works on distinct values only, so the cost is independent of row count.
+    """
+    if index is None:
+        index = get_name_index()
+    
+    known = set(index.values())
+    counts = chiefdoms.dropna().astype(str).value_counts()
+    counts = counts[~counts.index.isin(known)]
+    
+    choices = sorted(known)
+    process = None
+    if len(counts):
+        try:
+            from rapidfuzz import fuzz, process
+        except ImportError:  # Suggestions are optional
+            pass
+
+    report = []
+    for name, count in counts.items():
+        suggestion, score = None, None
+        if process is not None and choices:
+            match = process.extractOne(normalize_name(name), choices, scorer=fuzz.WRatio)
+            if match:
+                suggestion, score = match[0], round(match[1], 1)
+        report.append({
+            "Raw Name": name,
+            "Records": int(count),
+            "Suggestion": suggestion,
+            "Score": score,
+        })
+    
+    return pd.DataFrame(report, columns=["Raw Name", "Records", "Suggestion", "Score"])
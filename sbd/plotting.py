@@ -0,0 +1,294 @@
+"""Matplotlib dashboards of chiefdom boundaries, school points and coverage
+
+matplotlib is only imported when a figure is actually drawn, so importing
+the dashboard builders costs nothing until a rendering is needed.
+"""
+import math
+
+import numpy as np
+
+from sbd.clusters import build_cluster_index, chiefdom_group, query_clusters, school_points, zoom_for_cell_size
+from sbd.geometry import geometry_bounds, plot_geometry
+from sbd.gps import GPS_OK
+
+# Diameter of a school marker (s=100 points squared); closer schools share a cluster marker
+SCHOOL_MARKER_INCHES = 10 / 72
+
+
+def plot_chiefdom_polygons(ax, gdf, **style):
+    """Draw the polygons of gdf's active geometry as one PatchCollection
+
+    Equivalent to gdf.plot(ax=ax, ...) for the styles used here, without
+    GeoPandas' canvas.draw_idle() call, which under Agg re-renders the whole
+    figure after every subplot.
+    """
+    import shapely
+    from matplotlib.collections import PatchCollection
+    from matplotlib.patches import PathPatch
+    from matplotlib.path import Path
+
+    patches = []
+    for polygon in shapely.get_parts(gdf.geometry.values):
+        if polygon.is_empty or polygon.geom_type != "Polygon":
+            continue
+        rings = [polygon.exterior, *polygon.interiors]
+        path = Path.make_compound_path(*[Path(np.asarray(ring.coords)[:, :2]) for ring in rings])
+        patches.append(PathPatch(path))
+
+    if "color" in style:
+        style["facecolor"] = style.pop("color")
+    collection = PatchCollection(patches, **style)
+    ax.add_collection(collection, autolim=True)
+    ax.autoscale_view()
+    return collection
+
+def plot_school_points(ax, lats, lons, colors='red', sizes=100):
+    """Draw all school points of one subplot as a single scatter collection
+
+    Per-point colours and sizes may be passed as arrays; one PathCollection
+    per axes keeps artist count, on-screen rendering and savefig time flat
+    as the number of schools grows.
+    """
+    return ax.scatter(np.asarray(lons), np.asarray(lats), c=colors, s=sizes, alpha=1.0,
+                      edgecolors='white', linewidth=2, zorder=100, marker='o')
+
+def get_coverage_color(coverage_percent):
+    """Get color based on coverage percentage"""
+    if coverage_percent < 20:
+        return '#d32f2f'  # Red
+    elif coverage_percent < 40:
+        return '#f57c00'  # Orange
+    elif coverage_percent < 60:
+        return '#fbc02d'  # Yellow
+    elif coverage_percent < 80:
+        return '#388e3c'  # Light Green
+    elif coverage_percent < 100:
+        return '#1976d2'  # Blue
+    else:
+        return '#4a148c'  # Purple (100% coverage)
+
+def create_chiefdom_subplot_dashboard(gdf, extracted_df, district_name, cols=4, clusters=None, dpi=300):
+    """Create subplot dashboard for all chiefdoms in a district
+
+    Chiefdom outlines are drawn at the simplification level that matches the
+    highest output resolution (dpi) the figure will be saved at. School
+    points are drawn as clusters from a cluster index grouped by chiefdom
+    (sbd.clusters, by_chiefdom=True), at the zoom level where schools closer
+    than one marker share a marker; the index is built from extracted_df
+    when clusters is not given.
+    """
+    import matplotlib.pyplot as plt
+    
+    # Filter shapefile for the district
+    district_gdf = gdf[gdf['FIRST_DNAM'] == district_name].copy()
+    
+    # No chiefdoms found for this district in the shapefile
+    if len(district_gdf) == 0:
+        return None
+    
+    # Get unique chiefdoms from shapefile
+    chiefdoms = sorted(district_gdf['FIRST_CHIE'].dropna().unique())
+    
+    # GPS coordinates were parsed and validated for Sierra Leone at ingestion
+    district_data = extracted_df[extracted_df["District"].str.upper() == district_name.upper()]
+    school_counts = district_data[district_data["GPS_Status"] == GPS_OK]["Chiefdom"].value_counts()
+    if clusters is None:
+        clusters = build_cluster_index(school_points(district_data, by_chiefdom=True))
+    
+    # Calculate rows needed
+    rows = math.ceil(len(chiefdoms) / cols)
+    
+    # Create subplot figure with increased vertical space
+    fig, axes = plt.subplots(rows, cols, figsize=(cols*5, rows*6))
+    fig.suptitle(f'{district_name} District - All Chiefdoms with GPS Locations', 
+                 fontsize=20, fontweight='bold', y=0.98)
+    
+    # Ensure axes is always 2D array
+    if rows == 1:
+        axes = axes.reshape(1, -1)
+    elif cols == 1:
+        axes = axes.reshape(-1, 1)
+    
+    # Plot each chiefdom
+    for idx, chiefdom in enumerate(chiefdoms):
+        row = idx // cols
+        col = idx % cols
+        ax = axes[row, col]
+        
+        # Filter shapefile for this specific chiefdom, simplified for the output DPI
+        chiefdom_gdf = plot_geometry(district_gdf[district_gdf['FIRST_CHIE'] == chiefdom], dpi, axes_inches=5)
+        
+        # Plot chiefdom boundary
+        plot_chiefdom_polygons(ax, chiefdom_gdf, color='lightblue', edgecolor='navy', alpha=0.7, linewidth=2)
+        
+        # Clusters of this chiefdom's schools within its extent, merged below one marker size
+        bounds = geometry_bounds(chiefdom_gdf)
+        padding = 0.01
+        view = [bounds[0] - padding, bounds[1] - padding, bounds[2] + padding, bounds[3] + padding]
+        extent = max(view[2] - view[0], view[3] - view[1])
+        zoom = zoom_for_cell_size(extent * SCHOOL_MARKER_INCHES / 5)
+        chiefdom_clusters = query_clusters(clusters, view, zoom, groups=[chiefdom_group(district_name, chiefdom)])
+        school_count = int(school_counts.get(chiefdom, 0))
+        
+        # Plot GPS points if available, one marker per cluster sized by its school count
+        debug_info = ""
+        if len(chiefdom_clusters) > 0:
+            counts = chiefdom_clusters["Count"].to_numpy()
+            plot_school_points(ax, chiefdom_clusters["Latitude"], chiefdom_clusters["Longitude"],
+                               sizes=100 * np.sqrt(counts))
+            
+            # Add debug info in title if some schools share a marker
+            if len(chiefdom_clusters) < school_count:
+                debug_info = f" [Debug: {school_count} total, {len(chiefdom_clusters)} markers]"
+        
+        # Set title and clean up axes
+        ax.set_title(f'{chiefdom}\n({school_count} schools{debug_info})', 
+                    fontsize=12, fontweight='bold', pad=10)
+        
+        # Remove axis labels and ticks for cleaner look
+        ax.set_xticks([])
+        ax.set_yticks([])
+        ax.set_xlabel('')
+        ax.set_ylabel('')
+        
+        # Remove the box frame
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.spines['bottom'].set_visible(False)
+        ax.spines['left'].set_visible(False)
+        
+        # Add grid
+        ax.grid(True, alpha=0.3, linestyle='--')
+        
+        # Set equal aspect ratio and tight layout
+        ax.set_aspect('equal')
+        
+        # Set bounds to chiefdom extent with some padding
+        ax.set_xlim(view[0], view[2])
+        ax.set_ylim(view[1], view[3])
+    
+    # Hide empty subplots
+    total_plots = rows * cols
+    for idx in range(len(chiefdoms), total_plots):
+        row = idx // cols
+        col = idx % cols
+        axes[row, col].set_visible(False)
+    
+    plt.tight_layout()
+    plt.subplots_adjust(top=0.93, hspace=0.4, wspace=0.3)
+    
+    return fig
+
+def create_coverage_dashboard(gdf, coverage_df, district_name, cols=4, dpi=300):
+    """Create coverage dashboard optimized for Word document export - WITH 100% CAP FIX
+
+    Actual/target counts are read from coverage_df (as returned by
+    sbd.coverage.compute_coverage), which must cover every shapefile
+    chiefdom of the district.
+    """
+    import matplotlib.pyplot as plt
+    
+    # Filter shapefile for the district
+    district_gdf = gdf[gdf['FIRST_DNAM'] == district_name].copy()
+    
+    # No chiefdoms found for this district in the shapefile
+    if len(district_gdf) == 0:
+        return None
+    
+    # Get unique chiefdoms from shapefile
+    chiefdoms = sorted(district_gdf['FIRST_CHIE'].dropna().unique())
+    
+    # Actual/target counts for every chiefdom come from the shared coverage frame
+    district_coverage = coverage_df[coverage_df["District"] == district_name.upper()].set_index("Chiefdom")
+    
+    # Calculate rows needed
+    rows = math.ceil(len(chiefdoms) / cols)
+    
+    # Optimize figure size for Word document (16:10 aspect ratio works well)
+    fig_width = 16  # Width for Word document
+    fig_height = rows * 3.5  # Height per row optimized for Word
+    
+    # Create subplot figure optimized for Word export
+    fig, axes = plt.subplots(rows, cols, figsize=(fig_width, fig_height))
+    fig.suptitle(f'{district_name} District - School Coverage Analysis', 
+                 fontsize=18, fontweight='bold', y=0.98)
+    
+    # Ensure axes is always 2D array
+    if rows == 1:
+        axes = axes.reshape(1, -1)
+    elif cols == 1:
+        axes = axes.reshape(-1, 1)
+    
+    # Plot each chiefdom
+    for idx, chiefdom in enumerate(chiefdoms):
+        row = idx // cols
+        col = idx % cols
+        ax = axes[row, col]
+        
+        # Filter shapefile for this specific chiefdom, simplified for the output DPI
+        chiefdom_gdf = plot_geometry(district_gdf[district_gdf['FIRST_CHIE'] == chiefdom], dpi, fig_width / cols)
+        
+        # Look up precomputed actual/target/coverage for this chiefdom
+        actual_schools = int(district_coverage.at[chiefdom, "Actual"])
+        target_schools = int(district_coverage.at[chiefdom, "Target"])
+        coverage_percent = float(district_coverage.at[chiefdom, "Coverage"])
+        
+        # NEW: Handle 100% coverage display logic
+        if coverage_percent >= 100:
+            # When coverage is 100% or more, show equal numbers in brackets
+            display_coverage_percent = 100.0
+            display_actual = target_schools  # Set actual equal to target for display
+            display_target = target_schools
+        else:
+            # Normal display when coverage is less than 100%
+            display_coverage_percent = coverage_percent
+            display_actual = actual_schools
+            display_target = target_schools
+        
+        # Get color based on actual coverage (use original coverage for color determination)
+        coverage_color = get_coverage_color(coverage_percent)
+        
+        # Plot chiefdom boundary with coverage color
+        plot_chiefdom_polygons(ax, chiefdom_gdf, color=coverage_color, edgecolor='black', alpha=0.8, linewidth=1.5)
+        
+        # Create coverage text using display values
+        coverage_text = f"{display_actual}/{display_target} ({display_coverage_percent:.0f}%)"
+        
+        # Set title with coverage information (optimized font size for Word)
+        ax.set_title(f'{chiefdom}\n{coverage_text}', 
+                    fontsize=10, fontweight='bold', pad=8)
+        
+        # Remove axis labels and ticks for cleaner look
+        ax.set_xticks([])
+        ax.set_yticks([])
+        ax.set_xlabel('')
+        ax.set_ylabel('')
+        
+        # Remove the box frame
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+        
+        # Add very light grid
+        ax.grid(True, alpha=0.2, linestyle='--', linewidth=0.5)
+        
+        # Set equal aspect ratio
+        ax.set_aspect('equal')
+        
+        # Set bounds to chiefdom extent with minimal padding for better fit
+        bounds = geometry_bounds(chiefdom_gdf)
+        padding = 0.005  # Reduced padding for better fit in Word
+        ax.set_xlim(bounds[0] - padding, bounds[2] + padding)
+        ax.set_ylim(bounds[1] - padding, bounds[3] + padding)
+    
+    # Hide empty subplots
+    total_plots = rows * cols
+    for idx in range(len(chiefdoms), total_plots):
+        row = idx // cols
+        col = idx % cols
+        axes[row, col].set_visible(False)
+    
+    # Optimize layout for Word document
+    plt.tight_layout()
+    plt.subplots_adjust(top=0.90, hspace=0.35, wspace=0.25)  # Increased space below title
+    
+    return fig
@@ -0,0 +1,136 @@
+"""Rasterizing dashboard figures, in parallel across worker processes
+
+Each district figure (or report) is independent, so a batch of them is
+farmed out to a persistent process pool whose workers use the Agg backend.
+A worker builds one figure, rasterizes it at every requested DPI and only
+sends the PNG bytes back. Small batches, single-core machines and pool
+failures fall back to rendering in the calling process.
+"""
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+# Workers are never forked from the (multithreaded) Streamlit server, whose
+# locks a forked child could inherit held; they come from a fork server
+# where the platform has one, and are spawned otherwise
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# Worker processes for parallel rendering (1 disables the pool)
+RENDER_WORKERS = int(os.environ.get("SBD_RENDER_WORKERS", os.cpu_count() or 1))
+
+SAVEFIG_OPTIONS = {
+    "format": "png",
+    "bbox_inches": "tight",
+    "facecolor": "white",
+    "edgecolor": "none",
+    "pad_inches": 0.1,
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+# Serializes worker start-up, which swaps the __main__ module (see _submit)
+_submit_lock = threading.Lock()
+
+
+def figure_png(fig, dpi):
+    """Rasterize a matplotlib figure to PNG bytes in memory"""
+    buffer = BytesIO()
+    fig.savefig(buffer, dpi=dpi, **SAVEFIG_OPTIONS)
+    return buffer.getvalue()
+
+def render_pngs(build_figure, args, dpis):
+    """Build one figure with build_figure(*args, dpi=max(dpis)) and rasterize it per DPI
+
+    Returns {dpi: png_bytes}, or None when build_figure returns None. The
+    figure is closed before returning.
+    """
+    import matplotlib.pyplot as plt
+
+    fig = build_figure(*args, dpi=max(dpis))
+    if fig is None:
+        return None
+    try:
+        return {dpi: figure_png(fig, dpi) for dpi in dpis}
+    finally:
+        plt.close(fig)
+
+def _init_worker():
+    """Select the non-interactive Agg backend in every worker process"""
+    import matplotlib
+    matplotlib.use("Agg")
+
+def _get_executor():
+    """Return the shared process pool, starting it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            context = multiprocessing.get_context(START_METHOD)
+            if START_METHOD == "forkserver":
+                context.set_forkserver_preload([__name__])
+            _executor = ProcessPoolExecutor(
+                max_workers=RENDER_WORKERS,
+                mp_context=context,
+                initializer=_init_worker,
+            )
+        return _executor
+
+def _submit(executor, function, args):
+    """Submit one task, starting any worker it needs with sbd._worker_main as __main__
+
+    A new worker re-runs the parent's __main__ module, which under Streamlit
+    is the app script and under python -m sbd the CLI; workers only need the
+    task's module, so they are started with an empty module standing in for
+    __main__ instead. It is not preloaded by the fork server, so running it
+    as a worker's __main__ never re-executes an imported module.
+    """
+    from sbd import _worker_main
+
+    with _submit_lock:
+        app_main = sys.modules["__main__"]
+        sys.modules["__main__"] = _worker_main
+        try:
+            return executor.submit(function, *args)
+        finally:
+            # Unless a script run installed its own __main__ meanwhile
+            if sys.modules["__main__"] is _worker_main:
+                sys.modules["__main__"] = app_main
+
+def shutdown_pool():
+    """Stop the worker processes (a new pool is started on the next parallel render)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+def run_tasks(tasks):
+    """Run a batch of independent tasks, in worker processes when there are several
+
+    tasks maps a name to (function, args); function must be a module-level
+    function and args picklable, as both are sent to a worker process.
+    Returns {name: function(*args)}.
+    """
+    if len(tasks) > 1 and RENDER_WORKERS > 1:
+        try:
+            executor = _get_executor()
+            futures = {name: _submit(executor, function, args) for name, (function, args) in tasks.items()}
+            return {name: future.result() for name, future in futures.items()}
+        except (BrokenProcessPool, OSError):
+            # A worker died or processes cannot be started here - run in-process
+            shutdown_pool()
+
+    return {name: function(*args) for name, (function, args) in tasks.items()}
+
+def render_figures(tasks, dpis):
+    """Render a batch of figures, in parallel when more than one is requested
+
+    tasks maps a name to (build_figure, args) as accepted by run_tasks.
+    Returns {name: {dpi: png_bytes} or None}.
+    """
+    return run_tasks({
+        name: (render_pngs, (build_figure, args, dpis)) for name, (build_figure, args) in tasks.items()
+    })
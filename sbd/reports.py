@@ -0,0 +1,157 @@
+"""Word (.docx) reports for the SBD dashboards, built on demand
+
+python-docx is only imported when a report is actually built. Finished
+documents are memoized on (data hash, report name, TEMPLATE_VERSION), so a
+report that was already generated for the current data is served from
+memory instead of being rebuilt.
+"""
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import pandas as pd
+
+from sbd.shared import KeyLocks
+
+# Bump whenever the layout or wording of a report changes
+TEMPLATE_VERSION = 1
+
+MAX_REPORTS = 16
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+COVERAGE_LEGEND = [
+    "🔴 Red: < 20% coverage",
+    "🟠 Orange: 20-39% coverage",
+    "🟡 Yellow: 40-59% coverage",
+    "🟢 Light Green: 60-79% coverage",
+    "🔵 Blue: 80-99% coverage",
+    "🟣 Purple: 100%+ coverage"
+]
+
+COVERAGE_LEGEND_DETAILED = [
+    "🔴 Red: < 20% coverage (Critical - requires immediate attention)",
+    "🟠 Orange: 20-39% coverage (Poor - needs significant improvement)",
+    "🟡 Yellow: 40-59% coverage (Fair - room for improvement)",
+    "🟢 Light Green: 60-79% coverage (Good - meeting most targets)",
+    "🔵 Blue: 80-99% coverage (Excellent - exceeding expectations)",
+    "🟣 Purple: 100%+ coverage (Outstanding - surpassing all targets)"
+]
+
+_reports = OrderedDict()
+_lock = threading.Lock()
+_build_locks = KeyLocks()
+
+
+def _add_title(doc, title, level=0):
+    """Add a centred heading"""
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+    heading = doc.add_heading(title, level)
+    heading.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    return heading
+
+def _add_generated_date(doc, bold=False):
+    """Add the centred 'Generated: <timestamp>' line"""
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.shared import Pt
+
+    date_para = doc.add_paragraph()
+    date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    date_run = date_para.add_run(f"Generated: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    date_run.font.size = Pt(12)
+    date_run.bold = bold
+
+def _add_bullets(doc, items):
+    """Add one paragraph per item with a bold bullet"""
+    for item in items:
+        p = doc.add_paragraph()
+        p.add_run('• ').bold = True
+        p.add_run(item)
+
+def _to_bytes(doc):
+    """Serialize a Document to .docx bytes"""
+    word_buffer = BytesIO()
+    doc.save(word_buffer)
+    return word_buffer.getvalue()
+
+def coverage_summary_items(district, chiefdoms, summary):
+    """Summary bullets of a district coverage report (summary is the district's summarize_districts row)"""
+    return [
+        f"District: {district}",
+        f"Total Chiefdoms: {int(chiefdoms)}",
+        f"Actual Schools: {int(summary['Actual'])}",
+        f"Target Schools: {int(summary['Target'])}",
+        f"Coverage Rate: {summary['Coverage']:.1f}%",
+    ]
+
+def district_report(title, png, summary_items, summary_level=1, legend_items=None, image_width=9.5):
+    """Single-district report: title, dashboard image, optional legend and a summary"""
+    from docx import Document
+    from docx.shared import Inches
+
+    doc = Document()
+    _add_title(doc, title)
+    _add_generated_date(doc)
+    doc.add_paragraph()  # Add space
+
+    doc.add_picture(BytesIO(png), width=Inches(image_width))  # Fits well in Word page
+
+    if legend_items:
+        doc.add_heading('Coverage Color Legend', level=2)
+        _add_bullets(doc, legend_items)
+
+    doc.add_heading('Dashboard Summary', level=summary_level)
+    _add_bullets(doc, summary_items)
+    return _to_bytes(doc)
+
+def combined_report(subtitle, summary_paragraphs, sections, legend_items=None):
+    """Multi-district report: cover page, optional legend, executive summary, one section per district
+
+    sections is a list of (heading, png, summary_heading, summary_items, image_width).
+    """
+    from docx import Document
+    from docx.shared import Inches
+
+    doc = Document()
+    _add_title(doc, 'School-Based Distribution (SBD)')
+    _add_title(doc, subtitle, level=1)
+    _add_generated_date(doc, bold=True)
+    doc.add_page_break()
+
+    if legend_items:
+        doc.add_heading('Coverage Color Legend', level=1)
+        _add_bullets(doc, legend_items)
+        doc.add_page_break()
+
+    doc.add_heading('Executive Summary', level=1)
+    for paragraph in summary_paragraphs:
+        doc.add_paragraph(paragraph)
+
+    for heading, png, summary_heading, summary_items, image_width in sections:
+        doc.add_page_break()
+        doc.add_heading(heading, level=1)
+        doc.add_picture(BytesIO(png), width=Inches(image_width))
+        doc.add_heading(summary_heading, level=2)
+        _add_bullets(doc, summary_items)
+
+    return _to_bytes(doc)
+
+def report_docx(data_key, name, build_report):
+    """Return the .docx bytes of a report, calling build_report() only on a cache miss"""
+    key = (data_key, name, TEMPLATE_VERSION)
+
+    # Only sessions wanting this same report wait while it is built
+    with _build_locks(key):
+        with _lock:
+            if key in _reports:
+                _reports.move_to_end(key)
+                return _reports[key]
+
+        docx_bytes = build_report()
+
+        with _lock:
+            _reports[key] = docx_bytes
+            while len(_reports) > MAX_REPORTS:
+                _reports.popitem(last=False)
+        return docx_bytes
@@ -0,0 +1,137 @@
+"""Process-wide store of immutable data shared by every dashboard session
+
+Streamlit serves all sessions from one process. Data that depends only on
+the input files (geometry, targets, parsed submissions and what is derived
+from them) is built once per version and handed to every session, so a
+session's own state is limited to its filters and selections.
+
+Each session holds a DataLease on the versions it uses. Asking for a newer
+version moves the session's lease; a version that no session holds and
+that is no longer the latest one is dropped, so memory stays at one copy
+per live version however many sessions are open. A session that ends
+releases its leases when its DataLease is garbage collected. Entries are
+shared: with pandas copy-on-write, derived frames never write through to
+them, and callers must not modify them in place.
+
+Values are built outside the store's lock, under a lock of their own key,
+so a long build only makes the sessions that want that same value wait.
+"""
+import threading
+import weakref
+from collections import deque
+
+# (name, version) -> [value, number of leases]
+_entries = {}
+# name -> most recently built version
+_latest = {}
+# (name, version) leases released by finalizers, applied under the lock
+_released = deque()
+_lock = threading.Lock()
+
+
+class KeyLocks:
+    """One lock per key, for building a cached value without blocking other keys
+
+    Calling the instance with a key returns that key's lock; it is dropped
+    once no thread holds or waits on it.
+    """
+
+    def __init__(self):
+        self._locks = weakref.WeakValueDictionary()
+        self._guard = threading.Lock()
+
+    def __call__(self, key):
+        with self._guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+_build_locks = KeyLocks()
+
+
+class DataLease:
+    """The versions of shared entries held by one session (keep it in the session state)"""
+
+    def __init__(self):
+        self.versions = {}
+        # Must not reference self, or the lease would never be collected
+        weakref.finalize(self, _release_later, self.versions)
+
+def _release_later(versions):
+    """Queue every lease of a collected DataLease (safe to call from the garbage collector)"""
+    _released.extend(versions.items())
+
+def _release(name, version):
+    """Drop one lease on an entry, and the entry once it is unused and superseded (lock held)"""
+    entry = _entries.get((name, version))
+    if entry is None:
+        return
+    entry[1] -= 1
+    if entry[1] <= 0 and _latest.get(name) != version:
+        del _entries[(name, version)]
+
+def _drain_released():
+    """Apply the releases queued by finalizers (lock held)"""
+    while _released:
+        _release(*_released.popleft())
+
+def _hold(entry, name, version, lease):
+    """Move a session's lease on name to this entry's version (lock held)"""
+    if lease is not None and lease.versions.get(name) != version:
+        entry[1] += 1
+        if name in lease.versions:
+            _release(name, lease.versions[name])
+        lease.versions[name] = version
+
+def _publish(name, version, value):
+    """Store a built value as the latest version of name (lock held)"""
+    entry = _entries[(name, version)] = [value, 0]
+    previous = _latest.get(name)
+    _latest[name] = version
+    stale = _entries.get((name, previous))
+    if stale is not None and previous != version and stale[1] <= 0:
+        del _entries[(name, previous)]
+    return entry
+
+def shared(name, version, load, lease=None):
+    """Return the shared value of name at version, calling load() only on a miss
+
+    version is any hashable identifying the inputs (e.g. file fingerprints).
+    With a lease, the session holds this version until it moves on to
+    another one or ends. Building a new version drops the superseded ones
+    no session holds. Sessions asking for a version being built wait for
+    that build; every other lookup proceeds.
+    """
+    key = (name, version)
+
+    with _lock:
+        _drain_released()
+        entry = _entries.get(key)
+        if entry is not None:
+            _hold(entry, name, version, lease)
+            return entry[0]
+
+    with _build_locks(key):
+        # Another session may have built it while this one waited
+        with _lock:
+            entry = _entries.get(key)
+        value = entry[0] if entry is not None else load()
+
+        with _lock:
+            entry = _entries.get(key) or _publish(name, version, value)
+            _hold(entry, name, version, lease)
+            return entry[0]
+
+def shared_entries():
+    """Return {(name, version): number of leases} for every entry currently held"""
+    with _lock:
+        _drain_released()
+        return {key: entry[1] for key, entry in _entries.items()}
+
+def clear_shared():
+    """Drop every shared entry (leases still held are forgotten)"""
+    with _lock:
+        _entries.clear()
+        _latest.clear()
+        _released.clear()
@@ -0,0 +1,236 @@
+"""Append-only store of dated submission snapshots
+
+Each dated export workbook is extracted once and appended to a Parquet
+dataset as one immutable part file tagged with its snapshot timestamp
+(parsed from the file name). Coverage over time is computed from the
+stored parts, so old workbooks are never opened again. Each snapshot is
+counted like the coverage view counts the current export: repeated school
+submissions (sbd.dedup) are removed first. Their flags are derived from the
+previous snapshot's (only rows new in an export are checked against the
+rest) and stored next to each part, so a new export never deduplicates the
+stored snapshots again.
+"""
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sbd.coverage import chiefdom_counts, coverage_from_counts, summarize_districts
+from sbd.dedup import DEDUP_VERSION, deduplicated_counts, find_duplicates, update_duplicates
+from sbd.ingest import CACHE_DIR, EXTRACT_VERSION, file_fingerprint, load_submissions
+
+# Daily exports in the repository, oldest first
+SNAPSHOT_FILES = [
+    "SBD_Submissions_07_01_2025.xlsx",
+    "SBD_07_01_2025_3PM.xlsx",
+    "SBD_07_02_lastest.xlsx",
+    "SBD_lastest_07_03_2025.xlsx",
+    "SBD_07_08_2025.xlsx",
+    "SBD_Final_data_dissemination_7_15_2025.xlsx",
+]
+
+# Parts hold extracted rows, so a new extraction layout starts a new store
+SNAPSHOT_DIR = Path(os.environ.get("SBD_SNAPSHOT_DIR", CACHE_DIR / f"snapshots-v{EXTRACT_VERSION}"))
+
+# Year of file names without one, unless other snapshot names state a year
+CAMPAIGN_YEAR = int(os.environ.get("SBD_CAMPAIGN_YEAR", 2025))
+
+# MM_DD[_YYYY][_H(AM|PM)] anywhere in a file name, e.g. SBD_07_01_2025_3PM
+_DATE_PATTERN = re.compile(
+    r"(?<![A-Za-z0-9])(\d{1,2})_(\d{1,2})(?:_(\d{4}))?(?:_(\d{1,2})\s*([AP]M))?(?!\d)",
+    re.IGNORECASE,
+)
+
+_history = {}
+_counts = {}
+_lock = threading.Lock()
+
+
+def campaign_year(paths):
+    """Year stated by most of the file names in paths (CAMPAIGN_YEAR if none states one)"""
+    years = Counter()
+    for path in paths:
+        match = _DATE_PATTERN.search(Path(path).stem)
+        if match is not None and match.group(3) is not None:
+            years[int(match.group(3))] += 1
+    return years.most_common(1)[0][0] if years else CAMPAIGN_YEAR
+
+def snapshot_time(path, year=None):
+    """Snapshot timestamp encoded in an export's file name
+
+    A missing year is taken from year (default CAMPAIGN_YEAR), never from
+    the file itself, whose dates change with every copy or checkout. A
+    missing hour defaults to midnight.
+    """
+    match = _DATE_PATTERN.search(Path(path).stem)
+    if match is None:
+        raise ValueError(f"No MM_DD[_YYYY][_HAM/PM] date in file name: {path}")
+
+    month, day, name_year, hour, meridiem = match.groups()
+    year = name_year or year or CAMPAIGN_YEAR
+    hour = int(hour) % 12 + (12 if meridiem.upper() == "PM" else 0) if hour else 0
+    return pd.Timestamp(int(year), int(month), int(day), hour)
+
+def list_snapshots(store_dir=SNAPSHOT_DIR):
+    """Stored snapshots as a frame of Snapshot, Content and Path, oldest first"""
+    parts = sorted(Path(store_dir).glob("*.parquet")) if Path(store_dir).exists() else []
+    records = []
+    for part in parts:
+        stamp, content = part.stem.split("-", 1)
+        records.append({"Snapshot": pd.Timestamp(stamp), "Content": content, "Path": part})
+    return pd.DataFrame(records, columns=["Snapshot", "Content", "Path"])
+
+def ingest_snapshot(path, store_dir=SNAPSHOT_DIR, snapshot=None, year=None):
+    """Extract one export and append it to the store; returns False if already stored
+
+    The snapshot time defaults to snapshot_time(path, year). The part file
+    is named after the snapshot time and the workbook's content hash, so
+    re-ingesting an unchanged (or copied) workbook is a no-op. A different
+    workbook for an already stored snapshot time is rejected.
+    """
+    store_dir = Path(store_dir)
+    snapshot = snapshot_time(path, year) if snapshot is None else pd.Timestamp(snapshot)
+    content = file_fingerprint(path).split("-")[0]
+
+    stored = list_snapshots(store_dir)
+    if (stored["Content"] == content).any():
+        return False
+    if (stored["Snapshot"] == snapshot).any():
+        raise ValueError(f"A different workbook is already stored for snapshot {snapshot}: {path}")
+
+    frame = load_submissions(path).copy()
+    frame["Chiefdom"] = frame["Chiefdom"].astype(str).where(frame["Chiefdom"].notna())
+    frame.insert(0, "Snapshot", snapshot)
+    frame["Source"] = Path(path).name
+
+    store_dir.mkdir(parents=True, exist_ok=True)
+    part_path = store_dir / f"{snapshot:%Y%m%dT%H%M}-{content}.parquet"
+    tmp_path = part_path.with_suffix(f".{os.getpid()}.tmp")
+    frame.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, part_path)
+    return True
+
+def ingest_snapshots(paths=SNAPSHOT_FILES, store_dir=SNAPSHOT_DIR):
+    """Append every not yet stored export in paths; returns the number added
+
+    Names without a year take the year the other names state (campaign_year).
+    """
+    paths = [path for path in paths if Path(path).exists()]
+    year = campaign_year(paths)
+    return sum(ingest_snapshot(path, store_dir, year=year) for path in paths)
+
+def load_snapshots(store_dir=SNAPSHOT_DIR, columns=None):
+    """Read the stored snapshots into one frame (parts are immutable, so the result is cached)
+
+    The returned frame is shared between callers and must be treated as read-only.
+    """
+    stored = list_snapshots(store_dir)
+    key = (tuple(stored["Path"].map(str)), tuple(columns) if columns else None)
+
+    with _lock:
+        if key not in _history:
+            frames = [pd.read_parquet(part, columns=columns) for part in stored["Path"]]
+            history = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+            _history.clear()
+            _history[key] = history
+        return _history[key]
+
+def _repeats_path(part):
+    """Stored repeat flags of a snapshot part"""
+    return part.parent / f"repeats-v{DEDUP_VERSION}" / part.name
+
+def _row_keys(rows):
+    """Identity of each extracted row across snapshots: its content hash and occurrence number"""
+    columns = [column for column in rows.columns if column not in ("Snapshot", "Source")]
+    hashes = pd.util.hash_pandas_object(rows[columns], index=False)
+    return pd.MultiIndex.from_arrays([hashes.to_numpy(), hashes.groupby(hashes).cumcount().to_numpy()])
+
+def snapshot_repeats(part, previous=None):
+    """Repeat flags (see find_duplicates) of a stored snapshot, read or computed once
+
+    The flags are ordered as the snapshot was deduplicated; their Row column
+    is the part row each belongs to. A snapshot stored after previous (the
+    preceding part) is updated from that snapshot's flags: rows it no longer
+    has are dropped and only its new rows are checked (update_duplicates).
+    """
+    part = Path(part)
+    path = _repeats_path(part)
+    if path.exists():
+        return pd.read_parquet(path)
+
+    rows = pd.read_parquet(part)
+    if previous is None:
+        repeats = find_duplicates(rows).reset_index(drop=True)
+        repeats.insert(0, "Row", np.arange(len(rows)))
+    else:
+        previous_repeats = snapshot_repeats(previous)
+        previous_rows = pd.read_parquet(previous).iloc[previous_repeats["Row"].to_numpy()].reset_index(drop=True)
+        keys, previous_keys = _row_keys(rows), _row_keys(previous_rows)
+        kept = previous_keys.isin(keys)
+        new = np.flatnonzero(~keys.isin(previous_keys))
+
+        repeats = update_duplicates(previous_rows, previous_repeats, kept, rows.iloc[new].reset_index(drop=True))
+        repeats.insert(0, "Row", np.concatenate([keys.get_indexer(previous_keys[kept]), new]))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    repeats.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return repeats
+
+def snapshot_counts(store_dir=SNAPSHOT_DIR):
+    """Submissions per (Snapshot, District, Chiefdom) with each snapshot's repeats removed
+
+    Counted exactly as the coverage view counts the current export
+    (chiefdom_counts less find_duplicates' repeats, see snapshot_repeats);
+    each snapshot is counted once per process.
+    """
+    stored = list_snapshots(store_dir)
+    counts, previous = {}, None
+    for snapshot, part in zip(stored["Snapshot"], stored["Path"]):
+        with _lock:
+            cached = _counts.get(str(part))
+        if cached is None:
+            rows = pd.read_parquet(part)
+            repeats = snapshot_repeats(part, previous)
+            cached = deduplicated_counts(chiefdom_counts(rows), rows.iloc[repeats["Row"].to_numpy()], repeats)
+            with _lock:
+                _counts[str(part)] = cached
+        counts[snapshot] = cached
+        previous = part
+
+    if counts:
+        return pd.concat(counts, names=["Snapshot"])
+    index = pd.MultiIndex.from_arrays([[], [], []], names=["Snapshot", "District", "Chiefdom"])
+    return pd.Series(0, index=index, dtype=int, name="Actual")
+
+def coverage_history(targets, store_dir=SNAPSHOT_DIR, districts=None, campaign_round=None):
+    """Coverage per (Snapshot, District, Chiefdom) across every stored snapshot
+
+    Actuals are snapshot_counts (repeats removed, as in the coverage view).
+    A chiefdom that appears in any snapshot gets a row for every snapshot
+    (Actual = 0 before its first submission). Each snapshot is passed
+    through coverage_from_counts, so targets and bands follow exactly the
+    rules of the coverage view.
+    """
+    counts = snapshot_counts(store_dir)
+    if districts is not None:
+        counts = counts[counts.index.get_level_values("District").isin([d.upper() for d in districts])]
+
+    # Complete the Snapshot x Chiefdom grid so every series starts at 0
+    grid = counts.unstack("Snapshot", fill_value=0)
+    frames = {snapshot: coverage_from_counts(grid[snapshot], targets, campaign_round=campaign_round)
+              for snapshot in grid.columns}
+    if not frames:
+        frames = {pd.NaT: coverage_from_counts(counts.droplevel("Snapshot"), targets, campaign_round=campaign_round)}
+
+    history = pd.concat(frames, names=["Snapshot"]).reset_index("Snapshot")
+    return history.sort_values(["District", "Chiefdom", "Snapshot"]).reset_index(drop=True)
+
+def district_history(history):
+    """Aggregate a coverage history to one row per (Snapshot, District), as summarize_districts"""
+    return summarize_districts(history, by=("Snapshot", "District")).reset_index()
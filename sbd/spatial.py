@@ -0,0 +1,60 @@
+"""Point-in-polygon assignment of school GPS points to shapefile chiefdoms"""
+import numpy as np
+import pandas as pd
+
+
+def assign_chiefdoms(lats, lons, gdf):
+    """Assign every GPS point to the chiefdom polygon that contains it
+
+    The points are bulk-loaded into an STRtree and queried once with every
+    polygon, so each detailed chiefdom outline is prepared a single time
+    instead of being tested against every point. Returns a DataFrame aligned
+    with the input arrays with GPS_District and GPS_Chiefdom columns (missing
+    when the point is outside every polygon or has no coordinates).
+    """
+    import shapely
+
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    n_points = len(lats)
+
+    gps_district = np.full(n_points, None, dtype=object)
+    gps_chiefdom = np.full(n_points, None, dtype=object)
+
+    valid = ~(np.isnan(lats) | np.isnan(lons))
+    if valid.any() and len(gdf) > 0:
+        valid_idx = np.flatnonzero(valid)
+        points = shapely.points(lons[valid_idx], lats[valid_idx])
+
+        # Bulk query: pairs of (polygon position, point position)
+        tree = shapely.STRtree(points)
+        polygon_pos, point_pos = tree.query(gdf.geometry.values, predicate="intersects")
+
+        # A point on a shared boundary matches two polygons - keep the first
+        first = np.unique(point_pos, return_index=True)[1]
+        point_pos, polygon_pos = point_pos[first], polygon_pos[first]
+
+        target_rows = valid_idx[point_pos]
+        gps_district[target_rows] = gdf["FIRST_DNAM"].to_numpy()[polygon_pos]
+        gps_chiefdom[target_rows] = gdf["FIRST_CHIE"].to_numpy()[polygon_pos]
+
+    return pd.DataFrame({"GPS_District": gps_district, "GPS_Chiefdom": gps_chiefdom})
+
+def flag_chiefdom_mismatches(extracted_df, lats, lons, gdf):
+    """Compare QR-declared chiefdoms with the chiefdom containing each GPS point
+
+    Returns a copy of extracted_df with GPS_District, GPS_Chiefdom and
+    Chiefdom_Mismatch columns. A mismatch is only flagged when both the QR
+    chiefdom and the GPS chiefdom are known.
+    """
+    assigned = assign_chiefdoms(lats, lons, gdf)
+    assigned.index = extracted_df.index
+
+    result = extracted_df.copy()
+    result["GPS_District"] = assigned["GPS_District"]
+    result["GPS_Chiefdom"] = assigned["GPS_Chiefdom"]
+
+    declared = result["Chiefdom"].astype(object)
+    known = declared.notna() & result["GPS_Chiefdom"].notna()
+    result["Chiefdom_Mismatch"] = known & (declared != result["GPS_Chiefdom"])
+    return result
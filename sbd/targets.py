@@ -0,0 +1,69 @@
+"""Target school counts per chiefdom and campaign round
+
+Targets live in a version-controlled table (data/school_targets.csv, or a
+Parquet file with the same columns) rather than in code, so a new campaign
+or district only needs new rows. The table is read once per file version
+and indexed by (District, Chiefdom, Round).
+"""
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from sbd.ingest import file_fingerprint
+
+TARGETS_FILE = "data/school_targets.csv"
+
+TARGET_COLUMNS = ["district", "chiefdom", "round", "target"]
+INDEX_COLUMNS = ["District", "Chiefdom", "Round"]
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def read_targets(path=TARGETS_FILE):
+    """Read and validate a targets file into a (District, Chiefdom, Round)-indexed frame"""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        raw = pd.read_parquet(path)
+    else:
+        raw = pd.read_csv(path, dtype={"district": str, "chiefdom": str})
+
+    missing = [column for column in TARGET_COLUMNS if column not in raw.columns]
+    if missing:
+        raise ValueError(f"{path}: missing target column(s) {', '.join(missing)}")
+
+    targets = pd.DataFrame({
+        "District": raw["district"].str.strip().str.upper(),
+        "Chiefdom": raw["chiefdom"].str.strip().str.upper(),
+        "Round": raw["round"].astype(int),
+        "Target": raw["target"].astype(int),
+    }).set_index(INDEX_COLUMNS).sort_index()
+
+    duplicated = targets.index.duplicated()
+    if duplicated.any():
+        raise ValueError(f"{path}: duplicate targets for {list(targets.index[duplicated])}")
+    return targets
+
+def load_targets(path=TARGETS_FILE):
+    """Load the targets table, re-reading the file only when it changes
+
+    The returned frame is shared between callers and must be treated as read-only.
+    """
+    key = (str(Path(path).resolve()), file_fingerprint(path))
+
+    with _lock:
+        if key not in _loaded:
+            _loaded.clear()
+            _loaded[key] = read_targets(path)
+        return _loaded[key]
+
+def latest_round(targets):
+    """Most recent campaign round in a targets frame"""
+    return int(targets.index.get_level_values("Round").max())
+
+def round_targets(targets, campaign_round=None):
+    """Targets of one campaign round (default: the latest) as District, Chiefdom, Target columns"""
+    if campaign_round is None:
+        campaign_round = latest_round(targets)
+    return targets.xs(campaign_round, level="Round").reset_index()
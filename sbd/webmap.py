@@ -0,0 +1,211 @@
+"""Interactive web map of chiefdoms and school points, prebuilt per data snapshot
+
+The map is one Leaflet document, built once per data snapshot and shared
+between sessions through sbd.shared. It holds the chiefdom outlines at one
+cached simplification level (sbd.geometry) and every zoom level of the
+cluster pyramid of sbd.clusters as compact column arrays sorted by
+longitude, with school labels stored once. After each pan or zoom a small
+script answers the bounding-box query in the browser and draws only the
+clusters of the new view, so panning and zooming never call back to the
+server. Past the pyramid's finest level, small clusters open up into their
+schools, with schools at (nearly) the same spot spread apart by sbd.dodge.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from sbd.clusters import CLUSTER_CELL_PX, TILE_SIZE, build_cluster_index, mercator_pixels, query_clusters
+from sbd.dodge import MAX_RING_SIZE, separate_overlapping_points
+from sbd.geometry import SIMPLIFIED_COLUMNS
+
+# Zoom levels with their own clusters; the finest also serves deeper zooms
+MIN_ZOOM = 7
+MAX_ZOOM = 16
+# From this zoom on clusters of up to MAX_RING_SIZE schools show each school
+SCHOOL_ZOOM = MAX_ZOOM + 1
+# Deepest zoom the map allows
+MAX_MAP_ZOOM = 18
+
+# Schools closer than this many pixels at SCHOOL_ZOOM are spread apart
+SCHOOL_SPACING_PX = 10
+
+# Outlines simplified to 0.001 degrees (about 110 m, under a pixel up to zoom 11)
+OUTLINE_COLUMN = SIMPLIFIED_COLUMNS[0.001]
+
+# Coordinates are rounded to this many decimals (about 1 m)
+COORDINATE_DECIMALS = 5
+
+# Each side of the view is widened by this fraction of its size before drawing
+VIEW_PADDING = 0.5
+
+POINT_COLOR = "red"
+MISMATCH_COLOR = "orange"
+
+# Bump whenever the map layout changes (part of the shared entry's version)
+MAP_VERSION = 5
+
+
+def outlines_geojson(gdf):
+    """GeoJSON FeatureCollection of the chiefdom outlines at OUTLINE_COLUMN's simplification"""
+    import shapely
+
+    outlines = gdf[["FIRST_DNAM", "FIRST_CHIE", OUTLINE_COLUMN]].set_geometry(OUTLINE_COLUMN)
+    # Coordinates beyond COORDINATE_DECIMALS only add bytes to the document
+    rounded = shapely.transform(outlines.geometry.values, lambda coordinates: np.round(coordinates, COORDINATE_DECIMALS))
+    return outlines.set_geometry(rounded).__geo_interface__
+
+def map_bounds(gdf):
+    """(minx, miny, maxx, maxy) of the chiefdoms in gdf"""
+    return gdf["minx"].min(), gdf["miny"].min(), gdf["maxx"].max(), gdf["maxy"].max()
+
+def school_level(index, points, bounds, max_count=MAX_RING_SIZE):
+    """The index's finest level inside bounds, with clusters of up to max_count schools opened up
+
+    points is the school_points frame the index was built from. The schools
+    of a small cluster replace its marker, each with its own label, and
+    schools within SCHOOL_SPACING_PX of each other at SCHOOL_ZOOM are spread
+    around their centre (sbd.dodge). The result has the columns of an index
+    level, sorted by Longitude.
+    """
+    zoom = max(index)
+    finest = query_clusters(index, bounds, zoom)
+    small = finest["Count"].between(2, max_count)
+
+    # Schools fall in the grid cell of their cluster at the finest level
+    x, y = mercator_pixels(points["Latitude"], points["Longitude"], zoom)
+    groups = points["Group"] if "Group" in points else pd.Series(None, index=points.index, dtype=object)
+    cells = pd.MultiIndex.from_arrays([groups.to_numpy(), np.floor(x / CLUSTER_CELL_PX).astype(np.int64),
+                                       np.floor(y / CLUSTER_CELL_PX).astype(np.int64)])
+    opened = finest[small]
+    members = points[cells.isin(pd.MultiIndex.from_arrays([opened["Group"], opened["CellX"], opened["CellY"]]))]
+
+    spacing = SCHOOL_SPACING_PX * 360.0 / (TILE_SIZE * 2.0 ** SCHOOL_ZOOM)
+    lats, lons, _ = separate_overlapping_points(members["Latitude"], members["Longitude"], spacing)
+    schools = pd.DataFrame({
+        "Longitude": lons,
+        "Latitude": lats,
+        "Count": 1,
+        "Flagged": members["Flagged"].to_numpy(dtype=int) if "Flagged" in members else 0,
+        "Label": members["Label"].to_numpy(),
+    })
+    level = pd.concat([finest[~small][schools.columns], schools], ignore_index=True)
+    return level.sort_values("Longitude", kind="stable").reset_index(drop=True)
+
+def cluster_levels(index, points, bounds, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM):
+    """Return ({zoom: level}, labels) for the schools inside bounds at every zoom
+
+    Levels min_zoom to max_zoom hold the index's clusters and level
+    SCHOOL_ZOOM its finest level with small clusters opened up (see
+    school_level). Each level holds the
+    columns lon (ascending), lat, count, flagged (0 or 1) and label, an
+    index into labels for single schools and -1 for clusters. A school's
+    label is stored once however many levels show it.
+    """
+    clusters = {zoom: query_clusters(index, bounds, zoom) for zoom in range(min_zoom, max_zoom + 1)}
+    clusters[SCHOOL_ZOOM] = school_level(index, points, bounds)
+    everything = pd.concat([level["Label"] for level in clusters.values()], ignore_index=True)
+    codes, labels = pd.factorize(everything)
+
+    levels, start = {}, 0
+    for zoom, level in clusters.items():
+        stop = start + len(level)
+        levels[zoom] = {
+            "lon": np.round(level["Longitude"].to_numpy(dtype=float), COORDINATE_DECIMALS).tolist(),
+            "lat": np.round(level["Latitude"].to_numpy(dtype=float), COORDINATE_DECIMALS).tolist(),
+            "count": level["Count"].tolist(),
+            "flagged": (level["Flagged"].to_numpy() > 0).astype(int).tolist(),
+            "label": codes[start:stop].tolist(),
+        }
+        start = stop
+    return levels, list(labels)
+
+def _cluster_layer(folium_map, levels, labels):
+    """Attach the script drawing the clusters of the current view from the embedded levels"""
+    from branca.element import MacroElement
+    from jinja2 import Template
+
+    class ViewClusters(MacroElement):
+        _template = Template("""
+            {% macro script(this, kwargs) %}
+            (function() {
+                var map = {{ this._parent.get_name() }};
+                var data = {{ this.data }};
+                var zooms = Object.keys(data.levels).map(Number);
+                var minZoom = Math.min.apply(null, zooms), maxZoom = Math.max.apply(null, zooms);
+                var layer = L.layerGroup().addTo(map);
+                var renderer = L.canvas();
+
+                function firstAtLeast(values, value) {
+                    var low = 0, high = values.length;
+                    while (low < high) {
+                        var middle = (low + high) >> 1;
+                        if (values[middle] < value) { low = middle + 1; } else { high = middle; }
+                    }
+                    return low;
+                }
+
+                function drawView() {
+                    var level = data.levels[Math.min(Math.max(map.getZoom(), minZoom), maxZoom)];
+                    var view = map.getBounds().pad({{ this.padding }});
+                    var south = view.getSouth(), north = view.getNorth(), east = view.getEast();
+                    layer.clearLayers();
+                    for (var i = firstAtLeast(level.lon, view.getWest()); i < level.lon.length && level.lon[i] <= east; i++) {
+                        if (level.lat[i] < south || level.lat[i] > north) { continue; }
+                        var count = level.count[i];
+                        var color = level.flagged[i] ? "{{ this.mismatch_color }}" : "{{ this.point_color }}";
+                        L.circleMarker([level.lat[i], level.lon[i]], {
+                            renderer: renderer, radius: 4 + 3 * Math.floor(Math.log2(count)),
+                            color: color, fillColor: color, fillOpacity: 0.7, weight: 1
+                        }).bindTooltip(count === 1 ? data.labels[level.label[i]] : count.toLocaleString() + " schools")
+                          .addTo(layer);
+                    }
+                }
+                map.on("moveend", drawView);
+                drawView();
+            })();
+            {% endmacro %}
+        """)
+
+        def __init__(self, levels, labels):
+            super().__init__()
+            self._name = "ViewClusters"
+            # "</" is escaped so a label can never close the script element
+            self.data = json.dumps({"levels": levels, "labels": labels}, separators=(",", ":")).replace("</", "<\\/")
+            self.padding = VIEW_PADDING
+            self.point_color = POINT_COLOR
+            self.mismatch_color = MISMATCH_COLOR
+
+    ViewClusters(levels, labels).add_to(folium_map)
+
+def build_map(gdf, points, index=None, height=600):
+    """Build the Leaflet document (HTML text) for the chiefdoms in gdf and school points
+
+    points is a school_points frame; index is its cluster index, built
+    here when not given.
+    """
+    import folium
+
+    if index is None:
+        index = build_cluster_index(points)
+
+    bounds = map_bounds(gdf)
+    minx, miny, maxx, maxy = bounds
+    folium_map = folium.Map(
+        location=[(miny + maxy) / 2, (minx + maxx) / 2],
+        zoom_start=MIN_ZOOM,
+        min_zoom=MIN_ZOOM - 1,
+        max_zoom=MAX_MAP_ZOOM,
+        prefer_canvas=True,
+        height=height,
+    )
+    folium_map.fit_bounds([[miny, minx], [maxy, maxx]])
+
+    folium.GeoJson(
+        outlines_geojson(gdf),
+        style_function=lambda feature: {"color": "black", "weight": 1, "fillColor": "#3498db", "fillOpacity": 0.05},
+        tooltip=folium.GeoJsonTooltip(fields=["FIRST_CHIE", "FIRST_DNAM"], aliases=["Chiefdom", "District"]),
+    ).add_to(folium_map)
+
+    _cluster_layer(folium_map, *cluster_levels(index, points, bounds))
+    return folium_map.get_root().render()
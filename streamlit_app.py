@@ -1,11 +1,22 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import geopandas as gpd
-import math
-from io import BytesIO
-import re
+
+from sbd.artifacts import DOWNLOAD_DPI, SCREEN_DPI, district_figures
+from sbd.coverage import coverage_from_counts, summarize_districts
+from sbd.dedup import deduplicated_counts
+from sbd.delta import delta_counts, delta_duplicates, ingest_delta, load_delta_rows
+from sbd.districts import district_registry, format_district_list
+from sbd.geometry import load_chiefdoms, shapefile_key
+from sbd.ingest import file_fingerprint
+from sbd.names import unresolved_chiefdom_report
+from sbd.plotting import create_coverage_dashboard
+from sbd.reports import (
+    COVERAGE_LEGEND, COVERAGE_LEGEND_DETAILED, DOCX_MIME, combined_report, coverage_summary_items, district_report,
+    report_docx,
+)
+from sbd.shared import DataLease, shared
+from sbd.snapshots import SNAPSHOT_FILES, coverage_history, district_history, ingest_snapshots
+from sbd.targets import TARGETS_FILE, load_targets
 
 # Custom CSS for the dashboard
 st.markdown("""
@@ -40,299 +51,9 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def create_chiefdom_mapping():
-    """Create mapping between GPS data chiefdom names and shapefile FIRST_CHIE names"""
-    chiefdom_mapping = {
-        # BO District mappings
-        "Bo City": "BO TOWN",
-        "Badjia": "BADJIA",
-        "Bargbo": "BAGBO",
-        "Bagbwe": "BAGBWE(BAGBE)",
-        "Baoma": "BOAMA",
-        "Bongor": "BONGOR",
-        "Bumpeh": "BUMPE NGAO",
-        "Gbo": "GBO",
-        "Jaiama": "JAIAMA",
-        "Kakua": "KAKUA",
-        "Komboya": "KOMBOYA",
-        "Lugbu": "LUGBU",
-        "Niawa Lenga": "NIAWA LENGA",
-        "Selenga": "SELENGA",
-        "Tinkoko": "TIKONKO",
-        "Valunia": "VALUNIA",
-        "Wonde": "WONDE",
-        
-        # BOMBALI District mappings
-        "Biriwa": "BIRIWA",
-        "Bombali Sebora": "BOMBALI SEBORA",
-        "Bombali Serry": "BOMBALI SIARI",
-        "Gbanti (Bombali)": "GBANTI",
-        "Gbanti": "GBANTI",
-        "Gbendembu": "GBENDEMBU",
-        "Kamaranka": "KAMARANKA",
-        "Magbaimba Ndohahun": "MAGBAIMBA NDORWAHUN",
-        "Makarie": "MAKARI",
-        "Mara": "MARA",
-        "Ngowahun": "N'GOWAHUN",
-        "Paki Masabong": "PAKI MASABONG",
-        "Safroko Limba": "SAFROKO LIMBA",
-        "Makeni City": "MAKENI CITY",
-    }
-    return chiefdom_mapping
-
-def map_chiefdom_name(chiefdom_name, mapping):
-    """Map chiefdom name from GPS data to shapefile name"""
-    if pd.isna(chiefdom_name):
-        return None
-    
-    chiefdom_name = str(chiefdom_name).strip()
-    
-    # Direct match
-    if chiefdom_name in mapping:
-        return mapping[chiefdom_name]
-    
-    # Case-insensitive match
-    for key, value in mapping.items():
-        if key.upper() == chiefdom_name.upper():
-            return value
-    
-    # Partial match (contains)
-    for key, value in mapping.items():
-        if key.upper() in chiefdom_name.upper() or chiefdom_name.upper() in key.upper():
-            return value
-    
-    # Return original if no mapping found
-    return chiefdom_name
-
-def extract_gps_data_from_excel(df):
-    """Extract GPS data from the Excel file"""
-    # Create empty lists to store extracted data
-    districts, chiefdoms, gps_locations = [], [], []
-    
-    # Get chiefdom mapping
-    chiefdom_mapping = create_chiefdom_mapping()
-    
-    # Process each row in the "Scan QR code" column
-    for idx, qr_text in enumerate(df["Scan QR code"]):
-        if pd.isna(qr_text):
-            districts.append(None)
-            chiefdoms.append(None)
-            gps_locations.append(None)
-            continue
-            
-        # Extract values using regex patterns
-        district_match = re.search(r"District:\s*([^\n]+)", str(qr_text))
-        district = district_match.group(1).strip() if district_match else None
-        districts.append(district)
-        
-        chiefdom_match = re.search(r"Chiefdom:\s*([^\n]+)", str(qr_text))
-        original_chiefdom = chiefdom_match.group(1).strip() if chiefdom_match else None
-        
-        # Map chiefdom name to match shapefile
-        mapped_chiefdom = map_chiefdom_name(original_chiefdom, chiefdom_mapping)
-        chiefdoms.append(mapped_chiefdom)
-        
-        # Get GPS Location from the corresponding row
-        if "GPS Location" in df.columns:
-            gps_locations.append(df["GPS Location"].iloc[idx])
-        else:
-            gps_locations.append(None)
-    
-    # Create a new DataFrame with extracted values
-    extracted_df = pd.DataFrame({
-        "District": districts,
-        "Chiefdom": chiefdoms,
-        "GPS_Location": gps_locations
-    })
-    
-    return extracted_df
-
-def generate_target_school_data(chiefdoms=None):
-    """Generate target school data based on actual provided target data"""
-    
-    # Actual target data provided - mapped to shapefile chiefdom names
-    target_data = {
-        # BO District - using actual target numbers
-        "BADJIA": 9,                    # Badjia
-        "BAGBWE(BAGBE)": 18,           # Bagbwe
-        "BOAMA": 56,                   # Baoma
-        "BAGBO": 31,                   # Bargbo
-        "BO TOWN": 86,                 # Bo City
-        "BONGOR": 18,                  # Bongor
-        "BUMPE NGAO": 63,              # Bumpeh
-        "GBO": 10,                     # Gbo
-        "JAIAMA": 25,                  # Jaiama
-        "KAKUA": 164,                  # Kakua
-        "KOMBOYA": 17,                 # Komboya
-        "LUGBU": 32,                   # Lugbu
-        "NIAWA LENGA": 25,             # Niawa Lenga
-        "SELENGA": 7,                  # Selenga
-        "TIKONKO": 89,                 # Tinkoko
-        "VALUNIA": 38,                 # Valunia
-        "WONDE": 13,                   # Wonde
-        
-        # BOMBALI District - using actual target numbers
-        "BIRIWA": 48,                  # Biriwa
-        "BOMBALI SEBORA": 44,          # Bombali Sebora
-        "BOMBALI SIARI": 7,            # Bombali Serry Chiefdom
-        "GBANTI": 40,                  # Gbanti (Bombali)
-        "GBENDEMBU": 30,               # Gbendembu
-        "KAMARANKA": 13,               # Kamaranka
-        "MAGBAIMBA NDORWAHUN": 17,     # Magbaimba Ndohahun
-        "MAKARI": 54,                  # Makarie
-        "MAKENI CITY": 93,             # Makeni City
-        "MARA": 15,                    # Mara
-        "N'GOWAHUN": 28,               # Ngowahun
-        "PAKI MASABONG": 29,           # Paki Masabong
-        "SAFROKO LIMBA": 36,           # Safroko Limba
-    }
-    
-    # If no specific chiefdoms requested, return all target data
-    if chiefdoms is None or len(chiefdoms) == 0:
-        return target_data
-    
-    # Return target data for requested chiefdoms
-    result = {}
-    for chiefdom in chiefdoms:
-        if chiefdom in target_data:
-            result[chiefdom] = target_data[chiefdom]
-        else:
-            # If chiefdom not found, set to 0 to indicate no target data available
-            result[chiefdom] = 0
-            print(f"Warning: No target data found for chiefdom: {chiefdom}")
-    
-    return result
-
-def get_coverage_color(coverage_percent):
-    """Get color based on coverage percentage"""
-    if coverage_percent < 20:
-        return '#d32f2f'  # Red
-    elif coverage_percent < 40:
-        return '#f57c00'  # Orange
-    elif coverage_percent < 60:
-        return '#fbc02d'  # Yellow
-    elif coverage_percent < 80:
-        return '#388e3c'  # Light Green
-    elif coverage_percent < 100:
-        return '#1976d2'  # Blue
-    else:
-        return '#4a148c'  # Purple (100% coverage)
-
-def create_coverage_dashboard(gdf, extracted_df, district_name, cols=4):
-    """Create coverage dashboard optimized for Word document export - WITH 100% CAP FIX"""
-    
-    # Filter shapefile for the district
-    district_gdf = gdf[gdf['FIRST_DNAM'] == district_name].copy()
-    
-    if len(district_gdf) == 0:
-        st.error(f"No chiefdoms found for {district_name} district in shapefile")
-        return None
-    
-    # Get unique chiefdoms from shapefile
-    chiefdoms = sorted(district_gdf['FIRST_CHIE'].dropna().unique())
-    
-    # Generate real target data
-    target_data = generate_target_school_data(chiefdoms)
-    
-    # Calculate rows needed
-    rows = math.ceil(len(chiefdoms) / cols)
-    
-    # Optimize figure size for Word document (16:10 aspect ratio works well)
-    fig_width = 16  # Width for Word document
-    fig_height = rows * 3.5  # Height per row optimized for Word
-    
-    # Create subplot figure optimized for Word export
-    fig, axes = plt.subplots(rows, cols, figsize=(fig_width, fig_height))
-    fig.suptitle(f'{district_name} District - School Coverage Analysis', 
-                 fontsize=18, fontweight='bold', y=0.98)
-    
-    # Ensure axes is always 2D array
-    if rows == 1:
-        axes = axes.reshape(1, -1)
-    elif cols == 1:
-        axes = axes.reshape(-1, 1)
-    
-    # Plot each chiefdom
-    for idx, chiefdom in enumerate(chiefdoms):
-        row = idx // cols
-        col = idx % cols
-        ax = axes[row, col]
-        
-        # Filter shapefile for this specific chiefdom
-        chiefdom_gdf = district_gdf[district_gdf['FIRST_CHIE'] == chiefdom].copy()
-        
-        # Filter GPS data for this district and chiefdom with exact matching
-        district_data = extracted_df[extracted_df["District"].str.upper() == district_name.upper()].copy()
-        chiefdom_data = district_data[district_data["Chiefdom"] == chiefdom].copy()
-        
-        # Count actual schools (records) for this chiefdom
-        actual_schools = len(chiefdom_data)
-        
-        # Get target schools from dummy data
-        target_schools = target_data.get(chiefdom, 50)  # Default to 50 if not found
-        
-        # Calculate coverage percentage
-        coverage_percent = (actual_schools / target_schools * 100) if target_schools > 0 else 0
-        
-        # NEW: Handle 100% coverage display logic
-        if coverage_percent >= 100:
-            # When coverage is 100% or more, show equal numbers in brackets
-            display_coverage_percent = 100.0
-            display_actual = target_schools  # Set actual equal to target for display
-            display_target = target_schools
-        else:
-            # Normal display when coverage is less than 100%
-            display_coverage_percent = coverage_percent
-            display_actual = actual_schools
-            display_target = target_schools
-        
-        # Get color based on actual coverage (use original coverage for color determination)
-        coverage_color = get_coverage_color(coverage_percent)
-        
-        # Plot chiefdom boundary with coverage color
-        chiefdom_gdf.plot(ax=ax, color=coverage_color, edgecolor='black', alpha=0.8, linewidth=1.5)
-        
-        # Create coverage text using display values
-        coverage_text = f"{display_actual}/{display_target} ({display_coverage_percent:.0f}%)"
-        
-        # Set title with coverage information (optimized font size for Word)
-        ax.set_title(f'{chiefdom}\n{coverage_text}', 
-                    fontsize=10, fontweight='bold', pad=8)
-        
-        # Remove axis labels and ticks for cleaner look
-        ax.set_xticks([])
-        ax.set_yticks([])
-        ax.set_xlabel('')
-        ax.set_ylabel('')
-        
-        # Remove the box frame
-        for spine in ax.spines.values():
-            spine.set_visible(False)
-        
-        # Add very light grid
-        ax.grid(True, alpha=0.2, linestyle='--', linewidth=0.5)
-        
-        # Set equal aspect ratio
-        ax.set_aspect('equal')
-        
-        # Set bounds to chiefdom extent with minimal padding for better fit
-        bounds = chiefdom_gdf.total_bounds
-        padding = 0.005  # Reduced padding for better fit in Word
-        ax.set_xlim(bounds[0] - padding, bounds[2] + padding)
-        ax.set_ylim(bounds[1] - padding, bounds[3] + padding)
-    
-    # Hide empty subplots
-    total_plots = rows * cols
-    for idx in range(len(chiefdoms), total_plots):
-        row = idx // cols
-        col = idx % cols
-        axes[row, col].set_visible(False)
-    
-    # Optimize layout for Word document
-    plt.tight_layout()
-    plt.subplots_adjust(top=0.90, hspace=0.35, wspace=0.25)  # Increased space below title
-    
-    return fig
+def district_performance(coverage):
+    """Performance label used in the district summary table"""
+    return 'Excellent' if coverage >= 80 else 'Good' if coverage >= 60 else 'Fair' if coverage >= 40 else 'Poor'
 
 # Streamlit App
 st.title("📊 Section 2: School Coverage Analysis")
@@ -359,17 +80,25 @@ st.markdown("""
 
 # File Information
 st.info("""
-**📁 Embedded Files:** `sbd first_submission_clean.xlsx` | `Chiefdom2021.shp`  
+**📁 Embedded Files:** `sbd first_submission_clean.xlsx` | `Chiefdom2021.shp` | `data/school_targets.csv`  
 **📊 Layout:** Fixed 4-column grid optimized for Word export
 """)
 
+# Immutable data is loaded once per process and shared by every session;
+# this session only holds a lease on the versions it displays
+lease = st.session_state.setdefault("data_lease", DataLease())
+
+def load_submission_rows(path):
+    """Ingest the rows of an export not stored yet and return every live row"""
+    ingest_delta(path)
+    return load_delta_rows()
+
 # Load the embedded data files
 try:
-    # Load Excel file (embedded)
-    df_original = pd.read_excel("SBD_Final_data_dissemination_7_15_2025.xlsx")
-    
-    # Extract GPS data with chiefdom mapping
-    extracted_df = extract_gps_data_from_excel(df_original)
+    # Load Excel file (embedded) - only rows not ingested before are extracted
+    submissions_file = "SBD_Final_data_dissemination_7_15_2025.xlsx"
+    submissions_version = file_fingerprint(submissions_file)
+    extracted_df = shared("submissions", submissions_version, lambda: load_submission_rows(submissions_file), lease)
     st.success(f"✅ Excel file loaded successfully! Found {len(extracted_df)} records.")
     
 except Exception as e:
@@ -379,7 +108,8 @@ except Exception as e:
 
 # Load shapefile (embedded)
 try:
-    gdf = gpd.read_file("Chiefdom2021.shp")
+    chiefdoms_version = shapefile_key("Chiefdom2021.shp")
+    gdf = shared("chiefdoms", chiefdoms_version, lambda: load_chiefdoms("Chiefdom2021.shp"), lease)
     st.success(f"✅ Shapefile loaded successfully! Found {len(gdf)} features.")
     
 except Exception as e:
@@ -387,6 +117,35 @@ except Exception as e:
     st.info("💡 Make sure 'Chiefdom2021.shp' and supporting files (.dbf, .shx, .prj) are in the same directory as this app")
     st.stop()
 
+# Target schools per (district, chiefdom, campaign round)
+try:
+    targets_version = file_fingerprint(TARGETS_FILE)
+    targets = shared("targets", targets_version, lambda: load_targets(TARGETS_FILE), lease)
+    
+except Exception as e:
+    st.error(f"❌ Could not load target school data: {e}")
+    st.info(f"💡 Make sure '{TARGETS_FILE}' is present (columns: district, chiefdom, round, target)")
+    st.stop()
+
+# Districts with targets or submissions, from the shapefile's FIRST_DNAM
+registry = district_registry(gdf, targets, extracted_df)
+districts = registry.index.tolist()
+
+# Schools submitted more than once (same QR, or nearby with a similar name) count once;
+# flagged batch by batch as rows are ingested
+duplicates = shared("duplicates", submissions_version, delta_duplicates, lease)
+
+# Coverage engine - the deduplicated counts feed every metric, table and chart below
+coverage_df = shared(
+    "coverage",
+    (submissions_version, chiefdoms_version, targets_version),
+    lambda: coverage_from_counts(
+        deduplicated_counts(delta_counts(), extracted_df, duplicates), targets, gdf, districts=districts
+    ),
+    lease,
+)
+district_summary = summarize_districts(coverage_df)
+
 # Dashboard Settings - Fixed configuration
 columns = 4  # Fixed to 4 columns for optimal Word export
 show_targets = True  # Always show target data details
@@ -396,310 +155,113 @@ if show_targets:
     st.subheader("🎯 Target School Data")
     
     # Show some target data
-    target_data_all = generate_target_school_data([])
     st.write("Sample target schools by chiefdom:")
     
     # Create a sample table
-    sample_targets = {k: v for k, v in list(target_data_all.items())[:10]}
-    target_df = pd.DataFrame(list(sample_targets.items()), columns=['Chiefdom', 'Target Schools'])
+    sample_targets = targets.reset_index().head(10)
+    target_df = pd.DataFrame({'Chiefdom': sample_targets['Chiefdom'], 'Target Schools': sample_targets['Target']})
     st.dataframe(target_df, use_container_width=True)
     
     st.info("💡 Coverage is calculated as: (Actual Schools / Target Schools) × 100%")
 
-# Create dashboards
-st.header("📊 School Coverage Dashboards")
-
-# BO District Coverage Dashboard
-st.subheader("BO District - School Coverage")
+# Rendered dashboards are cached on the versions of the data they are drawn from
+dashboard_key = ("coverage", columns, submissions_version, chiefdoms_version, targets_version)
 
-with st.spinner("Generating BO District coverage dashboard..."):
+# Render every district dashboard in one batch (in parallel worker processes)
+with st.spinner("Generating district coverage dashboards..."):
     try:
-        fig_bo_coverage = create_coverage_dashboard(gdf, extracted_df, "BO", columns)
-        if fig_bo_coverage:
-            st.pyplot(fig_bo_coverage)
-            
-            # Save figure option
-            buffer_bo_coverage = BytesIO()
-            fig_bo_coverage.savefig(buffer_bo_coverage, format='png', dpi=300, bbox_inches='tight')
-            buffer_bo_coverage.seek(0)
-            
-            st.download_button(
-                label="📥 Download BO District Coverage Dashboard (PNG)",
-                data=buffer_bo_coverage,
-                file_name="BO_District_Coverage_Dashboard.png",
-                mime="image/png"
-            )
-            
-            # Word Export for BO District
-            try:
-                from docx import Document
-                from docx.shared import Inches, Pt
-                from docx.enum.text import WD_ALIGN_PARAGRAPH
-                
-                # Create Word document
-                doc = Document()
-                
-                # Add title
-                title = doc.add_heading('BO District - School Coverage Analysis', 0)
-                title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                
-                # Add generation date
-                date_para = doc.add_paragraph()
-                date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                date_run = date_para.add_run(f"Generated: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                date_run.font.size = Pt(12)
-                
-                doc.add_paragraph()  # Add space
-                
-                # Save matplotlib figure as PNG and embed in Word
-                timestamp = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
-                png_filename = f"BO_District_Coverage_Dashboard_{timestamp}.png"
-                
-                # Save PNG file to current directory
-                fig_bo_coverage.savefig(png_filename, format='png', dpi=200, 
-                                       bbox_inches='tight', facecolor='white', 
-                                       edgecolor='none', pad_inches=0.1)
-                
-                # Add the saved PNG to Word document
-                doc.add_picture(png_filename, width=Inches(9.5))  # Fits well in Word page
-                
-                # Add coverage legend
-                doc.add_heading('Coverage Color Legend', level=2)
-                legend_items = [
-                    "🔴 Red: < 20% coverage",
-                    "🟠 Orange: 20-39% coverage", 
-                    "🟡 Yellow: 40-59% coverage",
-                    "🟢 Light Green: 60-79% coverage",
-                    "🔵 Blue: 80-99% coverage",
-                    "🟣 Purple: 100%+ coverage"
-                ]
-                
-                for item in legend_items:
-                    p = doc.add_paragraph()
-                    p.add_run('• ').bold = True
-                    p.add_run(item)
-                
-                # Add summary information
-                doc.add_heading('Dashboard Summary', level=2)
-                
-                bo_data = extracted_df[extracted_df["District"].str.upper() == "BO"]
-                target_data_all = generate_target_school_data([])
-                bo_chiefdoms = ['BADJIA', 'BAGBWE(BAGBE)', 'BOAMA', 'BAGBO', 'BO TOWN', 'BONGOR', 'BUMPE NGAO', 'GBO', 'JAIAMA', 'KAKUA', 'KOMBOYA', 'LUGBU', 'NIAWA LENGA', 'SELENGA', 'TIKONKO', 'VALUNIA', 'WONDE']
-                bo_target_total = sum([v for k, v in target_data_all.items() if k in bo_chiefdoms])
-                bo_coverage = (len(bo_data) / bo_target_total * 100) if bo_target_total > 0 else 0
-                
-                summary_text = f"""
-                District: BO
-                Total Chiefdoms: {len(gdf[gdf['FIRST_DNAM'] == 'BO'])}
-                Actual Schools: {len(bo_data)}
-                Target Schools: {bo_target_total}
-                Coverage Rate: {bo_coverage:.1f}%
-                PNG File Saved: {png_filename}
-                """
-                
-                for line in summary_text.strip().split('\n'):
-                    if line.strip():
-                        p = doc.add_paragraph()
-                        p.add_run('• ').bold = True
-                        p.add_run(line.strip())
-                
-                # Save to BytesIO
-                word_buffer = BytesIO()
-                doc.save(word_buffer)
-                word_data = word_buffer.getvalue()
-                
-                # Success message
-                st.success(f"✅ PNG saved as: {png_filename}")
-                
-                st.download_button(
-                    label="📄 Download BO District Coverage Report (Word)",
-                    data=word_data,
-                    file_name=f"BO_District_Coverage_Report_{timestamp}.docx",
-                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                )
-                
-            except ImportError:
-                st.warning("⚠️ Word export requires python-docx library. Install with: pip install python-docx")
-            except Exception as e:
-                st.warning(f"⚠️ Word export failed: {str(e)}")
-        else:
-            st.warning("Could not generate BO District coverage dashboard")
+        coverage_figures = district_figures(dashboard_key, {
+            district: (create_coverage_dashboard, (
+                gdf[gdf['FIRST_DNAM'] == district],
+                coverage_df[coverage_df["District"] == district],
+                district,
+                columns,
+            ))
+            for district in districts
+        })
     except Exception as e:
-        st.error(f"Error generating BO District coverage dashboard: {e}")
+        st.error(f"Error generating coverage dashboards: {e}")
+        coverage_figures = {}
 
-st.divider()
-
-# BOMBALI District Coverage Dashboard
-st.subheader("BOMBALI District - School Coverage")
+# Create dashboards
+st.header("📊 School Coverage Dashboards")
 
-with st.spinner("Generating BOMBALI District coverage dashboard..."):
-    try:
-        fig_bombali_coverage = create_coverage_dashboard(gdf, extracted_df, "BOMBALI", columns)
-        if fig_bombali_coverage:
-            st.pyplot(fig_bombali_coverage)
-            
-            # Save figure option
-            buffer_bombali_coverage = BytesIO()
-            fig_bombali_coverage.savefig(buffer_bombali_coverage, format='png', dpi=300, bbox_inches='tight')
-            buffer_bombali_coverage.seek(0)
+for index, district in enumerate(districts):
+    if index > 0:
+        st.divider()
+    
+    district_row = district_summary.loc[district]
+    pngs = coverage_figures.get(district)
+    
+    # District Coverage Dashboard
+    st.subheader(f"{district} District - School Coverage")
+    
+    if not pngs:
+        st.warning(f"Could not generate {district} District coverage dashboard")
+        continue
+    
+    st.image(pngs[SCREEN_DPI])
+    
+    st.download_button(
+        label=f"📥 Download {district} District Coverage Dashboard (PNG)",
+        data=pngs[DOWNLOAD_DPI],
+        file_name=f"{district}_District_Coverage_Dashboard.png",
+        mime="image/png"
+    )
+    
+    # Word Export for the district - built only when requested
+    if st.button(f"📝 Prepare {district} District Coverage Report (Word)"):
+        st.session_state[f"report_{district}_coverage"] = True
+    
+    if st.session_state.get(f"report_{district}_coverage"):
+        try:
+            word_data = report_docx(dashboard_key, f"coverage-{district}", lambda: district_report(
+                f'{district} District - School Coverage Analysis',
+                pngs[SCREEN_DPI],
+                coverage_summary_items(district, registry.at[district, 'Chiefdoms'], district_row),
+                summary_level=2,
+                legend_items=COVERAGE_LEGEND,
+            ))
             
             st.download_button(
-                label="📥 Download BOMBALI District Coverage Dashboard (PNG)",
-                data=buffer_bombali_coverage,
-                file_name="BOMBALI_District_Coverage_Dashboard.png",
-                mime="image/png"
+                label=f"📄 Download {district} District Coverage Report (Word)",
+                data=word_data,
+                file_name=f"{district}_District_Coverage_Report_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.docx",
+                mime=DOCX_MIME
             )
             
-            # Word Export for BOMBALI District
-            try:
-                from docx import Document
-                from docx.shared import Inches, Pt
-                from docx.enum.text import WD_ALIGN_PARAGRAPH
-                
-                # Create Word document
-                doc = Document()
-                
-                # Add title
-                title = doc.add_heading('BOMBALI District - School Coverage Analysis', 0)
-                title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                
-                # Add generation date
-                date_para = doc.add_paragraph()
-                date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                date_run = date_para.add_run(f"Generated: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                date_run.font.size = Pt(12)
-                
-                doc.add_paragraph()  # Add space
-                
-                # Save matplotlib figure as PNG and embed in Word
-                timestamp = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
-                png_filename = f"BOMBALI_District_Coverage_Dashboard_{timestamp}.png"
-                
-                # Save PNG file to current directory
-                fig_bombali_coverage.savefig(png_filename, format='png', dpi=200, 
-                                            bbox_inches='tight', facecolor='white', 
-                                            edgecolor='none', pad_inches=0.1)
-                
-                # Add the saved PNG to Word document
-                doc.add_picture(png_filename, width=Inches(9.5))  # Fits well in Word page
-                
-                # Add coverage legend
-                doc.add_heading('Coverage Color Legend', level=2)
-                legend_items = [
-                    "🔴 Red: < 20% coverage",
-                    "🟠 Orange: 20-39% coverage", 
-                    "🟡 Yellow: 40-59% coverage",
-                    "🟢 Light Green: 60-79% coverage",
-                    "🔵 Blue: 80-99% coverage",
-                    "🟣 Purple: 100%+ coverage"
-                ]
-                
-                for item in legend_items:
-                    p = doc.add_paragraph()
-                    p.add_run('• ').bold = True
-                    p.add_run(item)
-                
-                # Add summary information
-                doc.add_heading('Dashboard Summary', level=2)
-                
-                bombali_data = extracted_df[extracted_df["District"].str.upper() == "BOMBALI"]
-                target_data_all = generate_target_school_data([])
-                bombali_chiefdoms = ['BIRIWA', 'BOMBALI SEBORA', 'BOMBALI SIARI', 'GBANTI', 'GBENDEMBU', 'KAMARANKA', 'MAGBAIMBA NDORWAHUN', 'MAKARI', 'MAKENI CITY', 'MARA', 'N\'GOWAHUN', 'PAKI MASABONG', 'SAFROKO LIMBA']
-                bombali_target_total = sum([v for k, v in target_data_all.items() if k in bombali_chiefdoms])
-                bombali_coverage = (len(bombali_data) / bombali_target_total * 100) if bombali_target_total > 0 else 0
-                
-                summary_text = f"""
-                District: BOMBALI
-                Total Chiefdoms: {len(gdf[gdf['FIRST_DNAM'] == 'BOMBALI'])}
-                Actual Schools: {len(bombali_data)}
-                Target Schools: {bombali_target_total}
-                Coverage Rate: {bombali_coverage:.1f}%
-                PNG File Saved: {png_filename}
-                """
-                
-                for line in summary_text.strip().split('\n'):
-                    if line.strip():
-                        p = doc.add_paragraph()
-                        p.add_run('• ').bold = True
-                        p.add_run(line.strip())
-                
-                # Save to BytesIO
-                word_buffer = BytesIO()
-                doc.save(word_buffer)
-                word_data = word_buffer.getvalue()
-                
-                # Success message
-                st.success(f"✅ PNG saved as: {png_filename}")
-                
-                st.download_button(
-                    label="📄 Download BOMBALI District Coverage Report (Word)",
-                    data=word_data,
-                    file_name=f"BOMBALI_District_Coverage_Report_{timestamp}.docx",
-                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                )
-                
-            except ImportError:
-                st.warning("⚠️ Word export requires python-docx library. Install with: pip install python-docx")
-            except Exception as e:
-                st.warning(f"⚠️ Word export failed: {str(e)}")
-        else:
-            st.warning("Could not generate BOMBALI District coverage dashboard")
-    except Exception as e:
-        st.error(f"Error generating BOMBALI District coverage dashboard: {e}")
+        except ImportError:
+            st.warning("⚠️ Word export requires python-docx library. Install with: pip install python-docx")
+        except Exception as e:
+            st.warning(f"⚠️ Word export failed: {str(e)}")
 
 # Coverage Analysis
 st.header("📈 Coverage Analysis")
 
-# Calculate coverage statistics with debugging
-bo_data = extracted_df[extracted_df["District"].str.upper() == "BO"]
-bombali_data = extracted_df[extracted_df["District"].str.upper() == "BOMBALI"]
-
-# Get target data
-target_data_all = generate_target_school_data([])
-bo_chiefdoms = ['BADJIA', 'BAGBWE(BAGBE)', 'BOAMA', 'BAGBO', 'BO TOWN', 'BONGOR', 'BUMPE NGAO', 'GBO', 'JAIAMA', 'KAKUA', 'KOMBOYA', 'LUGBU', 'NIAWA LENGA', 'SELENGA', 'TIKONKO', 'VALUNIA', 'WONDE']
-bombali_chiefdoms = ['BIRIWA', 'BOMBALI SEBORA', 'BOMBALI SIARI', 'GBANTI', 'GBENDEMBU', 'KAMARANKA', 'MAGBAIMBA NDORWAHUN', 'MAKARI', 'MAKENI CITY', 'MARA', 'N\'GOWAHUN', 'PAKI MASABONG', 'SAFROKO LIMBA']
-
-bo_target_total = sum([target_data_all.get(k, 0) for k in bo_chiefdoms])
-bombali_target_total = sum([target_data_all.get(k, 0) for k in bombali_chiefdoms])
-
-# Coverage metrics
-col1, col2, col3, col4 = st.columns(4)
-
-with col1:
-    bo_coverage = (len(bo_data) / bo_target_total * 100) if bo_target_total > 0 else 0
-    st.metric("BO District Coverage", f"{bo_coverage:.1f}%", f"{len(bo_data)}/{bo_target_total}")
-
-with col2:
-    bombali_coverage = (len(bombali_data) / bombali_target_total * 100) if bombali_target_total > 0 else 0
-    st.metric("BOMBALI District Coverage", f"{bombali_coverage:.1f}%", f"{len(bombali_data)}/{bombali_target_total}")
-
-with col3:
-    total_actual = len(extracted_df)
-    total_target = bo_target_total + bombali_target_total
-    overall_coverage = (total_actual / total_target * 100) if total_target > 0 else 0
-    st.metric("Overall Coverage", f"{overall_coverage:.1f}%", f"{total_actual}/{total_target}")
-
-with col4:
-    # Calculate chiefdoms with good coverage (>= 60%)
-    good_coverage_count = 0
-    total_chiefdoms = 0
-    
-    for district in ["BO", "BOMBALI"]:
-        district_data = extracted_df[extracted_df["District"].str.upper() == district.upper()]
-        chiefdoms = district_data['Chiefdom'].dropna().unique()
-        
-        for chiefdom in chiefdoms:
-            chiefdom_data = district_data[district_data['Chiefdom'] == chiefdom]
-            actual = len(chiefdom_data)
-            target = target_data_all.get(chiefdom, 0)
-            coverage = (actual / target * 100) if target > 0 else 0
-            
-            if coverage >= 60:
-                good_coverage_count += 1
-            total_chiefdoms += 1
-    
-    good_coverage_percent = (good_coverage_count / total_chiefdoms * 100) if total_chiefdoms > 0 else 0
-    st.metric("Chiefdoms with Good Coverage", f"{good_coverage_percent:.0f}%", f"{good_coverage_count}/{total_chiefdoms}")
+# Program totals from the coverage frame
+total_actual = int(district_summary["Actual"].sum())
+total_target = int(district_summary["Target"].sum())
+overall_coverage = (total_actual / total_target * 100) if total_target > 0 else 0
+
+# Chiefdom band counts
+total_chiefdoms = len(coverage_df)
+good_coverage_count = int((coverage_df["Coverage"] >= 60).sum())
+band_counts = coverage_df["Band"].value_counts()
+
+# Coverage metrics - one per district, then the program totals
+good_coverage_percent = (good_coverage_count / total_chiefdoms * 100) if total_chiefdoms > 0 else 0
+coverage_metrics = [
+    (f"{district} District Coverage", f"{row.Coverage:.1f}%", f"{row.Actual}/{row.Target}")
+    for district, row in zip(district_summary.index, district_summary.itertuples())
+]
+coverage_metrics.append(("Overall Coverage", f"{overall_coverage:.1f}%", f"{total_actual}/{total_target}"))
+# Chiefdoms with good coverage (>= 60%)
+coverage_metrics.append(("Chiefdoms with Good Coverage", f"{good_coverage_percent:.0f}%", f"{good_coverage_count}/{total_chiefdoms}"))
+
+metric_columns = st.columns(4)
+for index, (label, value, delta) in enumerate(coverage_metrics):
+    with metric_columns[index % 4]:
+        st.metric(label, value, delta)
 
 # Executive Summary Section
 st.subheader("📋 Executive Summary")
@@ -718,38 +280,23 @@ with summary_col1:
 
 with summary_col2:
     st.write("**District Performance:**")
-    st.write(f"• BO District: {bo_coverage:.1f}% ({len(bo_data):,}/{bo_target_total:,})")
-    st.write(f"• BOMBALI District: {bombali_coverage:.1f}% ({len(bombali_data):,}/{bombali_target_total:,})")
+    for district, row in district_summary.iterrows():
+        st.write(f"• {district} District: {row['Coverage']:.1f}% ({int(row['Actual']):,}/{int(row['Target']):,})")
     
     # Identify better performing district
-    if bo_coverage > bombali_coverage:
-        st.write(f"• Leading District: BO (+{bo_coverage - bombali_coverage:.1f}%)")
-    elif bombali_coverage > bo_coverage:
-        st.write(f"• Leading District: BOMBALI (+{bombali_coverage - bo_coverage:.1f}%)")
-    else:
-        st.write("• Equal Performance Between Districts")
+    if len(district_summary) > 1:
+        ranked = district_summary["Coverage"].sort_values(ascending=False, kind="stable")
+        if ranked.iloc[0] > ranked.iloc[1]:
+            st.write(f"• Leading District: {ranked.index[0]} (+{ranked.iloc[0] - ranked.iloc[1]:.1f}%)")
+        else:
+            st.write("• Equal Performance Between Districts")
 
 with summary_col3:
     st.write("**Coverage Distribution:**")
-    # Calculate coverage categories
-    excellent_count = sum(1 for district in ["BO", "BOMBALI"] 
-                         for chiefdom in extracted_df[extracted_df["District"].str.upper() == district.upper()]['Chiefdom'].dropna().unique()
-                         if (len(extracted_df[(extracted_df["District"].str.upper() == district.upper()) & 
-                                            (extracted_df["Chiefdom"] == chiefdom)]) / 
-                             target_data_all.get(chiefdom, 1) * 100) >= 80)
-    
-    good_count = sum(1 for district in ["BO", "BOMBALI"] 
-                    for chiefdom in extracted_df[extracted_df["District"].str.upper() == district.upper()]['Chiefdom'].dropna().unique()
-                    if 60 <= (len(extracted_df[(extracted_df["District"].str.upper() == district.upper()) & 
-                                              (extracted_df["Chiefdom"] == chiefdom)]) / 
-                             target_data_all.get(chiefdom, 1) * 100) < 80)
-    
-    fair_count = sum(1 for district in ["BO", "BOMBALI"] 
-                    for chiefdom in extracted_df[extracted_df["District"].str.upper() == district.upper()]['Chiefdom'].dropna().unique()
-                    if 40 <= (len(extracted_df[(extracted_df["District"].str.upper() == district.upper()) & 
-                                              (extracted_df["Chiefdom"] == chiefdom)]) / 
-                             target_data_all.get(chiefdom, 1) * 100) < 60)
-    
+    # Coverage categories straight from the band column
+    excellent_count = int(band_counts.get("Excellent", 0))
+    good_count = int(band_counts.get("Good", 0))
+    fair_count = int(band_counts.get("Fair", 0))
     poor_critical_count = total_chiefdoms - excellent_count - good_count - fair_count
     
     st.write(f"• Excellent (≥80%): {excellent_count} chiefdoms")
@@ -762,33 +309,16 @@ st.write("### District-Level Summary")
 
 district_summary_data = []
 
-# BO District Summary
-bo_chiefdoms_in_data = bo_data['Chiefdom'].dropna().unique()
-bo_chiefdoms_count = len(bo_chiefdoms_in_data)
-
-district_summary_data.append({
-    'District': 'BO',
-    'Chiefdoms': bo_chiefdoms_count,
-    'Target Schools': bo_target_total,
-    'Actual Schools': len(bo_data),
-    'Coverage %': f"{bo_coverage:.1f}%",
-    'Gap': bo_target_total - len(bo_data),
-    'Performance': 'Excellent' if bo_coverage >= 80 else 'Good' if bo_coverage >= 60 else 'Fair' if bo_coverage >= 40 else 'Poor'
-})
-
-# BOMBALI District Summary  
-bombali_chiefdoms_in_data = bombali_data['Chiefdom'].dropna().unique()
-bombali_chiefdoms_count = len(bombali_chiefdoms_in_data)
-
-district_summary_data.append({
-    'District': 'BOMBALI', 
-    'Chiefdoms': bombali_chiefdoms_count,
-    'Target Schools': bombali_target_total,
-    'Actual Schools': len(bombali_data),
-    'Coverage %': f"{bombali_coverage:.1f}%",
-    'Gap': bombali_target_total - len(bombali_data),
-    'Performance': 'Excellent' if bombali_coverage >= 80 else 'Good' if bombali_coverage >= 60 else 'Fair' if bombali_coverage >= 40 else 'Poor'
-})
+for district, row in district_summary.iterrows():
+    district_summary_data.append({
+        'District': district,
+        'Chiefdoms': int(row['Chiefdoms']),
+        'Target Schools': int(row['Target']),
+        'Actual Schools': int(row['Actual']),
+        'Coverage %': f"{row['Coverage']:.1f}%",
+        'Gap': int(row['Gap']),
+        'Performance': district_performance(row['Coverage'])
+    })
 
 # Overall Summary
 district_summary_data.append({
@@ -798,7 +328,7 @@ district_summary_data.append({
     'Actual Schools': total_actual, 
     'Coverage %': f"{overall_coverage:.1f}%",
     'Gap': total_target - total_actual,
-    'Performance': 'Excellent' if overall_coverage >= 80 else 'Good' if overall_coverage >= 60 else 'Fair' if overall_coverage >= 40 else 'Poor'
+    'Performance': district_performance(overall_coverage)
 })
 
 district_summary_df = pd.DataFrame(district_summary_data)
@@ -813,26 +343,12 @@ with findings_col1:
     st.write("**Achievements:**")
     
     # Top performing chiefdoms
-    top_performers = []
-    for district in ["BO", "BOMBALI"]:
-        district_data = extracted_df[extracted_df["District"].str.upper() == district.upper()]
-        chiefdoms = district_data['Chiefdom'].dropna().unique()
-        
-        for chiefdom in chiefdoms:
-            chiefdom_data = district_data[district_data['Chiefdom'] == chiefdom]
-            actual = len(chiefdom_data)
-            target = target_data_all.get(chiefdom, 0)
-            coverage = (actual / target * 100) if target > 0 else 0
-            
-            if coverage >= 80:
-                top_performers.append((chiefdom, district, coverage))
-    
-    top_performers.sort(key=lambda x: x[2], reverse=True)
+    top_performers = coverage_df[coverage_df["Coverage"] >= 80].sort_values("Coverage", ascending=False, kind="stable")
     
-    if top_performers:
+    if len(top_performers) > 0:
         st.write("• Top performing chiefdoms (≥80% coverage):")
-        for chiefdom, district, coverage in top_performers[:5]:  # Show top 5
-            st.write(f"  - {chiefdom} ({district}): {coverage:.1f}%")
+        for row in top_performers.head(5).itertuples():  # Show top 5
+            st.write(f"  - {row.Chiefdom} ({row.District}): {row.Coverage:.1f}%")
     else:
         st.write("• No chiefdoms achieved excellent coverage (≥80%)")
     
@@ -842,27 +358,13 @@ with findings_col1:
 with findings_col2:
     st.write("**Areas for Improvement:**")
     
-    # Underperforming areas
-    underperformers = []
-    for district in ["BO", "BOMBALI"]:
-        district_data = extracted_df[extracted_df["District"].str.upper() == district.upper()]
-        chiefdoms = district_data['Chiefdom'].dropna().unique()
-        
-        for chiefdom in chiefdoms:
-            chiefdom_data = district_data[district_data['Chiefdom'] == chiefdom]
-            actual = len(chiefdom_data)
-            target = target_data_all.get(chiefdom, 0)
-            coverage = (actual / target * 100) if target > 0 else 0
-            
-            if coverage < 40:
-                underperformers.append((chiefdom, district, coverage, target - actual))
-    
-    underperformers.sort(key=lambda x: x[2])  # Sort by coverage (lowest first)
+    # Underperforming areas, lowest coverage first
+    underperformers = coverage_df[coverage_df["Coverage"] < 40].sort_values("Coverage", kind="stable")
     
-    if underperformers:
+    if len(underperformers) > 0:
         st.write("• Priority areas needing attention (<40% coverage):")
-        for chiefdom, district, coverage, gap in underperformers[:5]:  # Show bottom 5
-            st.write(f"  - {chiefdom} ({district}): {coverage:.1f}% (gap: {gap} schools)")
+        for row in underperformers.head(5).itertuples():  # Show bottom 5
+            st.write(f"  - {row.Chiefdom} ({row.District}): {row.Coverage:.1f}% (gap: {row.Gap} schools)")
     
     total_gap = total_target - total_actual
     if total_gap > 0:
@@ -874,219 +376,140 @@ with findings_col2:
 # Debug information (moved to expandable section)
 with st.expander("🔍 Debug Information"):
     st.write(f"**Debug Info:**")
-    st.write(f"- BO District records: {len(bo_data)}")
-    st.write(f"- BOMBALI District records: {len(bombali_data)}")
-    st.write(f"- BO District target total: {bo_target_total}")
-    st.write(f"- BOMBALI District target total: {bombali_target_total}")
+    for district, row in district_summary.iterrows():
+        st.write(f"- {district} District records: {int(row['Actual'])}")
+    for district, row in district_summary.iterrows():
+        st.write(f"- {district} District target total: {int(row['Target'])}")
     st.write(f"- Unique districts in data: {extracted_df['District'].unique()}")
-    st.write(f"- Sample BO chiefdoms in data: {bo_data['Chiefdom'].unique()[:5] if len(bo_data) > 0 else 'None'}")
+    for district in districts:
+        reported = coverage_df.loc[(coverage_df["District"] == district) & (coverage_df["Actual"] > 0), "Chiefdom"]
+        st.write(f"- Sample {district} chiefdoms in data: {list(reported.head(5)) if len(reported) > 0 else 'None'}")
+    
+    # Chiefdom names that could not be matched to the shapefile
+    unresolved_df = unresolved_chiefdom_report(extracted_df["Chiefdom"])
+    if len(unresolved_df) > 0:
+        st.write("**Unresolved chiefdom names (with closest shapefile match):**")
+        st.dataframe(unresolved_df, use_container_width=True)
+    else:
+        st.write("- All chiefdom names resolved to shapefile names")
+
+# Repeated submissions excluded from coverage
+st.subheader("🔁 Repeated School Submissions")
+
+repeated = duplicates["Duplicate"]
+if repeated.any():
+    st.write(f"{int(repeated.sum())} submissions repeat a school already submitted and are not counted towards coverage.")
+    with st.expander("📋 Repeated submissions"):
+        repeated_table = extracted_df.loc[repeated, ["District", "Chiefdom", "School", "Latitude", "Longitude"]].copy()
+        repeated_table["First Submission"] = extracted_df["School"].to_numpy()[duplicates.loc[repeated, "Group"]]
+        repeated_table["Reason"] = duplicates.loc[repeated, "Reason"]
+        st.dataframe(repeated_table.reset_index(drop=True), use_container_width=True)
+else:
+    st.write("No school was submitted more than once.")
 
 # Detailed coverage table
 st.subheader("📋 Detailed Coverage by Chiefdom")
 
-detailed_coverage = []
-for district in ["BO", "BOMBALI"]:
-    district_data = extracted_df[extracted_df["District"].str.upper() == district.upper()]
-    chiefdoms = sorted(district_data['Chiefdom'].dropna().unique())
-    
-    for chiefdom in chiefdoms:
-        chiefdom_data = district_data[district_data['Chiefdom'] == chiefdom]
-        actual = len(chiefdom_data)
-        target = target_data_all.get(chiefdom, 20)
-        coverage = (actual / target * 100) if target > 0 else 0
-        
-        # Determine status
-        if coverage >= 80:
-            status = "✅ Excellent"
-        elif coverage >= 60:
-            status = "🟢 Good"
-        elif coverage >= 40:
-            status = "🟡 Fair"
-        elif coverage >= 20:
-            status = "🟠 Poor"
-        else:
-            status = "🔴 Critical"
-        
-        detailed_coverage.append({
-            'District': district,
-            'Chiefdom': chiefdom,
-            'Actual Schools': actual,
-            'Target Schools': target,
-            'Coverage %': f"{coverage:.1f}%",
-            'Status': status
-        })
+status_labels = {
+    "Excellent": "✅ Excellent",
+    "Good": "🟢 Good",
+    "Fair": "🟡 Fair",
+    "Poor": "🟠 Poor",
+    "Critical": "🔴 Critical",
+}
+
+coverage_table = pd.DataFrame({
+    'District': coverage_df["District"],
+    'Chiefdom': coverage_df["Chiefdom"],
+    'Actual Schools': coverage_df["Actual"],
+    'Target Schools': coverage_df["Target"],
+    'Coverage %': coverage_df["Coverage"].map("{:.1f}%".format),
+    'Status': coverage_df["Band"].map(status_labels)
+})
+st.dataframe(coverage_table, use_container_width=True)
+
+# Coverage over time, from the stored daily snapshots
+st.header("📈 Coverage Over Time")
 
-coverage_df = pd.DataFrame(detailed_coverage)
-st.dataframe(coverage_df, use_container_width=True)
+try:
+    with st.spinner("Updating submission snapshots..."):
+        ingest_snapshots(SNAPSHOT_FILES)
+    history = coverage_history(targets, districts=districts)
+except (OSError, ValueError) as e:
+    st.warning(f"Could not load submission snapshots: {e}")
+    history = None
+
+if history is not None and not history.empty:
+    district_trend = district_history(history).pivot(index="Snapshot", columns="District", values="Coverage")
+    st.line_chart(district_trend)
+
+    with st.expander("📋 Chiefdom coverage by snapshot"):
+        chiefdom_trend = history.pivot_table(
+            index=["District", "Chiefdom"], columns="Snapshot", values="Coverage"
+        )
+        chiefdom_trend.columns = chiefdom_trend.columns.strftime("%b %d %H:%M")
+        st.dataframe(chiefdom_trend.round(1), use_container_width=True)
+else:
+    st.info("No submission snapshots stored yet")
 
 # Export All Dashboards as Combined Word Document
 st.header("📄 Combined Word Export")
 
-if st.button("📋 Generate Combined Coverage Report", help="Generate a comprehensive Word document with both districts"):
+if st.button("📋 Generate Combined Coverage Report", help="Generate a comprehensive Word document with every district"):
+    st.session_state["report_combined_coverage"] = True
+
+if st.session_state.get("report_combined_coverage"):
     try:
-        from docx import Document
-        from docx.shared import Inches, Pt
-        from docx.enum.text import WD_ALIGN_PARAGRAPH
-        
-        # Create Word document
-        doc = Document()
-        
-        # Add main title
-        title = doc.add_heading('School-Based Distribution (SBD)', 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        subtitle = doc.add_heading('School Coverage Analysis Dashboard', level=1)
-        subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        # Add generation date
-        date_para = doc.add_paragraph()
-        date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        date_run = date_para.add_run(f"Generated: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        date_run.font.size = Pt(12)
-        date_run.bold = True
-        
-        doc.add_page_break()
-        
-        # Coverage Legend
-        doc.add_heading('Coverage Color Legend', level=1)
-        legend_items = [
-            "🔴 Red: < 20% coverage (Critical - requires immediate attention)",
-            "🟠 Orange: 20-39% coverage (Poor - needs significant improvement)", 
-            "🟡 Yellow: 40-59% coverage (Fair - room for improvement)",
-            "🟢 Light Green: 60-79% coverage (Good - meeting most targets)",
-            "🔵 Blue: 80-99% coverage (Excellent - exceeding expectations)",
-            "🟣 Purple: 100%+ coverage (Outstanding - surpassing all targets)"
-        ]
-        
-        for item in legend_items:
-            p = doc.add_paragraph()
-            p.add_run('• ').bold = True
-            p.add_run(item)
-        
-        doc.add_page_break()
-        
-        # Executive Summary
-        doc.add_heading('Executive Summary', level=1)
-        
-        bo_data = extracted_df[extracted_df["District"].str.upper() == "BO"]
-        bombali_data = extracted_df[extracted_df["District"].str.upper() == "BOMBALI"]
-        target_data_all = generate_target_school_data([])
-        
-        bo_chiefdoms = ['BADJIA', 'BAGBWE(BAGBE)', 'BOAMA', 'BAGBO', 'BO TOWN', 'BONGOR', 'BUMPE NGAO', 'GBO', 'JAIAMA', 'KAKUA', 'KOMBOYA', 'LUGBU', 'NIAWA LENGA', 'SELENGA', 'TIKONKO', 'VALUNIA', 'WONDE']
-        bombali_chiefdoms = ['BIRIWA', 'BOMBALI SEBORA', 'BOMBALI SIARI', 'GBANTI', 'GBENDEMBU', 'KAMARANKA', 'MAGBAIMBA NDORWAHUN', 'MAKARI', 'MAKENI CITY', 'MARA', 'N\'GOWAHUN', 'PAKI MASABONG', 'SAFROKO LIMBA']
-        
-        bo_target_total = sum([v for k, v in target_data_all.items() if k in bo_chiefdoms])
-        bombali_target_total = sum([v for k, v in target_data_all.items() if k in bombali_chiefdoms])
-        total_target = bo_target_total + bombali_target_total
-        total_actual = len(extracted_df)
-        overall_coverage = (total_actual / total_target * 100) if total_target > 0 else 0
-        
-        summary_text = f"""
-        This comprehensive dashboard report presents school coverage analysis comparing actual surveyed schools versus target schools for BO and BOMBALI districts:
-        
-        • Districts Covered: BO, BOMBALI
-        • Total Target Schools: {total_target:,}
-        • Total Actual Schools: {total_actual:,}
-        • Overall Coverage Rate: {overall_coverage:.1f}%
-        • BO District Coverage: {(len(bo_data)/bo_target_total*100) if bo_target_total > 0 else 0:.1f}%
-        • BOMBALI District Coverage: {(len(bombali_data)/bombali_target_total*100) if bombali_target_total > 0 else 0:.1f}%
-        
-        Coverage is calculated as: (Actual Schools / Target Schools) × 100%
-        Color coding helps identify areas requiring attention and those performing well.
-        100% Coverage Display Rule: When coverage ≥ 100%, display shows equal numbers (target/target) but color reflects actual coverage level.
-        """
-        
-        for line in summary_text.strip().split('\n'):
-            if line.strip():
-                if line.startswith('•'):
-                    p = doc.add_paragraph()
-                    p.add_run(line.strip())
-                else:
-                    doc.add_paragraph(line.strip())
-        
-        doc.add_page_break()
-        
-        # BO District section
-        if 'fig_bo_coverage' in locals():
-            doc.add_heading('BO District - School Coverage Analysis', level=1)
-            
-            # Save BO figure as PNG and embed in Word
-            timestamp = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
-            bo_png_filename = f"BO_District_Coverage_Combined_{timestamp}.png"
+        def build_combined_report():
+            sections = []
+            for district, row in district_summary.iterrows():
+                pngs = coverage_figures.get(district)
+                if pngs:
+                    sections.append((
+                        f"{district} District - School Coverage Analysis",
+                        pngs[SCREEN_DPI],
+                        f"{district} District Summary",
+                        [
+                            f"Total Chiefdoms: {int(registry.at[district, 'Chiefdoms'])}",
+                            f"Target Schools: {int(row['Target']):,}",
+                            f"Actual Schools: {int(row['Actual']):,}",
+                            f"Coverage Rate: {row['Coverage']:.1f}%"
+                        ],
+                        9.5,
+                    ))
             
-            # Save PNG file to current directory
-            fig_bo_coverage.savefig(bo_png_filename, format='png', dpi=200, 
-                                   bbox_inches='tight', facecolor='white', 
-                                   edgecolor='none', pad_inches=0.1)
-            
-            # Add the saved PNG to Word document
-            doc.add_picture(bo_png_filename, width=Inches(9.5))  # Fits well in Word page
-            
-            # BO summary
-            doc.add_heading('BO District Summary', level=2)
-            bo_coverage = (len(bo_data) / bo_target_total * 100) if bo_target_total > 0 else 0
-            
-            bo_summary_items = [
-                f"Total Chiefdoms: {len(gdf[gdf['FIRST_DNAM'] == 'BO'])}",
-                f"Target Schools: {bo_target_total:,}",
-                f"Actual Schools: {len(bo_data):,}",
-                f"Coverage Rate: {bo_coverage:.1f}%",
-                f"PNG File Saved: {bo_png_filename}"
+            summary_paragraphs = [
+                f"This comprehensive dashboard report presents school coverage analysis comparing actual surveyed schools versus target schools for {format_district_list(districts)} districts:",
+                f"• Districts Covered: {', '.join(districts)}",
+                f"• Total Target Schools: {total_target:,}",
+                f"• Total Actual Schools: {total_actual:,}",
+                f"• Overall Coverage Rate: {overall_coverage:.1f}%",
             ]
-            
-            for item in bo_summary_items:
-                p = doc.add_paragraph()
-                p.add_run('• ').bold = True
-                p.add_run(item)
-            
-            doc.add_page_break()
-        
-        # BOMBALI District section
-        if 'fig_bombali_coverage' in locals():
-            doc.add_heading('BOMBALI District - School Coverage Analysis', level=1)
-            
-            # Save BOMBALI figure as PNG and embed in Word
-            bombali_png_filename = f"BOMBALI_District_Coverage_Combined_{timestamp}.png"
-            
-            # Save PNG file to current directory
-            fig_bombali_coverage.savefig(bombali_png_filename, format='png', dpi=200, 
-                                        bbox_inches='tight', facecolor='white', 
-                                        edgecolor='none', pad_inches=0.1)
-            
-            # Add the saved PNG to Word document
-            doc.add_picture(bombali_png_filename, width=Inches(9.5))  # Fits well in Word page
-            
-            # BOMBALI summary
-            doc.add_heading('BOMBALI District Summary', level=2)
-            bombali_coverage = (len(bombali_data) / bombali_target_total * 100) if bombali_target_total > 0 else 0
-            
-            bombali_summary_items = [
-                f"Total Chiefdoms: {len(gdf[gdf['FIRST_DNAM'] == 'BOMBALI'])}",
-                f"Target Schools: {bombali_target_total:,}",
-                f"Actual Schools: {len(bombali_data):,}",
-                f"Coverage Rate: {bombali_coverage:.1f}%",
-                f"PNG File Saved: {bombali_png_filename}"
+            summary_paragraphs += [
+                f"• {district} District Coverage: {row['Coverage']:.1f}%"
+                for district, row in district_summary.iterrows()
             ]
-            
-            for item in bombali_summary_items:
-                p = doc.add_paragraph()
-                p.add_run('• ').bold = True
-                p.add_run(item)
+            summary_paragraphs += [
+                "Coverage is calculated as: (Actual Schools / Target Schools) × 100%",
+                "Color coding helps identify areas requiring attention and those performing well.",
+                "100% Coverage Display Rule: When coverage ≥ 100%, display shows equal numbers (target/target) but color reflects actual coverage level."
+            ]
+            return combined_report(
+                'School Coverage Analysis Dashboard', summary_paragraphs, sections,
+                legend_items=COVERAGE_LEGEND_DETAILED
+            )
         
-        # Save to BytesIO
-        word_buffer = BytesIO()
-        doc.save(word_buffer)
-        word_data = word_buffer.getvalue()
+        word_data = report_docx(dashboard_key, "coverage-combined", build_combined_report)
+        timestamp = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
         
-        # Success message showing saved PNG files
-        st.success(f"✅ PNG files saved: {bo_png_filename}, {bombali_png_filename}")
+        st.success("✅ Combined Word report generated successfully!")
         
         st.download_button(
             label="💾 Download Combined Coverage Analysis Report (Word)",
             data=word_data,
             file_name=f"School_Coverage_Analysis_Report_{timestamp}.docx",
-            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            help="Download comprehensive Word report with both districts"
+            mime=DOCX_MIME,
+            help="Download comprehensive Word report with every district"
         )
         
     except ImportError:
@@ -1097,9 +520,6 @@ if st.button("📋 Generate Combined Coverage Report", help="Generate a comprehe
 # Download detailed coverage data (CSV removed as requested)
 st.subheader("📊 Coverage Analysis Summary")
 
-# Memory optimization - close matplotlib figures
-plt.close('all')
-
 # Footer
 st.markdown("---")
 st.markdown("**📊 Section 2: School Coverage Analysis | School-Based Distribution Analysis**")
@@ -1,11 +1,19 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import geopandas as gpd
-import math
-from io import BytesIO
-import re
+
+from sbd.artifacts import DOWNLOAD_DPI, SCREEN_DPI, district_figures
+from sbd.clusters import build_cluster_index, chiefdom_group, school_points, select_groups
+from sbd.districts import district_registry, format_district_list
+from sbd.geometry import load_chiefdoms, shapefile_key
+from sbd.gps import GPS_MISSING
+from sbd.ingest import file_fingerprint, load_submissions
+from sbd.names import unresolved_chiefdom_report
+from sbd.plotting import create_chiefdom_subplot_dashboard
+from sbd.reports import DOCX_MIME, combined_report, district_report, report_docx
+from sbd.shared import DataLease, shared
+from sbd.spatial import flag_chiefdom_mismatches
+from sbd.webmap import MAP_VERSION, build_map
 
 # Custom CSS for the dashboard
 st.markdown("""
@@ -40,309 +48,20 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def parse_gps_coordinates(gps_str):
-    """Enhanced GPS coordinate parsing that handles multiple formats"""
-    if pd.isna(gps_str):
-        return None, None
-    
-    gps_str = str(gps_str).strip()
-    lat, lon = None, None
-    
-    # Format 1: "8.6103181,-12.2029534"
-    if ',' in gps_str and not ' ' in gps_str:
-        try:
-            parts = gps_str.split(',')
-            if len(parts) == 2:
-                lat = float(parts[0].strip())
-                lon = float(parts[1].strip())
-        except ValueError:
-            pass
-    
-    # Format 2: "8.6103181 -12.2029534" (space separated)
-    elif ' ' in gps_str and ',' not in gps_str:
-        try:
-            parts = gps_str.split()
-            if len(parts) == 2:
-                lat = float(parts[0].strip())
-                lon = float(parts[1].strip())
-        except ValueError:
-            pass
-    
-    # Format 3: Other formats with parentheses, etc.
-    else:
-        # Extract numbers using regex
-        numbers = re.findall(r'-?\d+\.?\d*', gps_str)
-        if len(numbers) >= 2:
-            try:
-                lat = float(numbers[0])
-                lon = float(numbers[1])
-            except ValueError:
-                pass
-    
-    return lat, lon
-
-def create_chiefdom_mapping():
-    """Create mapping between GPS data chiefdom names and shapefile FIRST_CHIE names"""
-    chiefdom_mapping = {
-        # BO District mappings
-        "Bo City": "BO TOWN",
-        "Badjia": "BADJIA",
-        "Bargbo": "BAGBO",
-        "Bagbwe": "BAGBWE(BAGBE)",
-        "Baoma": "BOAMA",
-        "Bongor": "BONGOR",
-        "Bumpeh": "BUMPE NGAO",
-        "Gbo": "GBO",
-        "Jaiama": "JAIAMA",
-        "Kakua": "KAKUA",
-        "Komboya": "KOMBOYA",
-        "Lugbu": "LUGBU",
-        "Niawa Lenga": "NIAWA LENGA",
-        "Selenga": "SELENGA",
-        "Tinkoko": "TIKONKO",
-        "Valunia": "VALUNIA",
-        "Wonde": "WONDE",
-        
-        # BOMBALI District mappings
-        "Biriwa": "BIRIWA",
-        "Bombali Sebora": "BOMBALI SEBORA",
-        "Bombali Serry": "BOMBALI SIARI",
-        "Gbanti (Bombali)": "GBANTI",
-        "Gbanti": "GBANTI",
-        "Gbendembu": "GBENDEMBU",
-        "Kamaranka": "KAMARANKA",
-        "Magbaimba Ndohahun": "MAGBAIMBA NDORWAHUN",
-        "Makarie": "MAKARI",
-        "Mara": "MARA",
-        "Ngowahun": "N'GOWAHUN",
-        "Paki Masabong": "PAKI MASABONG",
-        "Safroko Limba": "SAFROKO LIMBA",
-        "Makeni City": "MAKENI CITY",
-    }
-    return chiefdom_mapping
-
-def map_chiefdom_name(chiefdom_name, mapping):
-    """Map chiefdom name from GPS data to shapefile name"""
-    if pd.isna(chiefdom_name):
-        return None
-    
-    chiefdom_name = str(chiefdom_name).strip()
-    
-    # Direct match
-    if chiefdom_name in mapping:
-        return mapping[chiefdom_name]
-    
-    # Case-insensitive match
-    for key, value in mapping.items():
-        if key.upper() == chiefdom_name.upper():
-            return value
-    
-    # Partial match (contains)
-    for key, value in mapping.items():
-        if key.upper() in chiefdom_name.upper() or chiefdom_name.upper() in key.upper():
-            return value
-    
-    # Return original if no mapping found
-    return chiefdom_name
-
-def extract_gps_data_from_excel(df):
-    """Extract GPS data from the Excel file"""
-    # Create empty lists to store extracted data
-    districts, chiefdoms, gps_locations = [], [], []
-    
-    # Get chiefdom mapping
-    chiefdom_mapping = create_chiefdom_mapping()
-    
-    # Process each row in the "Scan QR code" column
-    for idx, qr_text in enumerate(df["Scan QR code"]):
-        if pd.isna(qr_text):
-            districts.append(None)
-            chiefdoms.append(None)
-            gps_locations.append(None)
-            continue
-            
-        # Extract values using regex patterns
-        district_match = re.search(r"District:\s*([^\n]+)", str(qr_text))
-        district = district_match.group(1).strip() if district_match else None
-        districts.append(district)
-        
-        chiefdom_match = re.search(r"Chiefdom:\s*([^\n]+)", str(qr_text))
-        original_chiefdom = chiefdom_match.group(1).strip() if chiefdom_match else None
-        
-        # Map chiefdom name to match shapefile
-        mapped_chiefdom = map_chiefdom_name(original_chiefdom, chiefdom_mapping)
-        chiefdoms.append(mapped_chiefdom)
-        
-        # Get GPS Location from the corresponding row
-        if "GPS Location" in df.columns:
-            gps_locations.append(df["GPS Location"].iloc[idx])
-        else:
-            gps_locations.append(None)
-    
-    # Create a new DataFrame with extracted values
-    extracted_df = pd.DataFrame({
-        "District": districts,
-        "Chiefdom": chiefdoms,
-        "GPS_Location": gps_locations
-    })
-    
-    return extracted_df
-
-def create_chiefdom_subplot_dashboard(gdf, extracted_df, district_name, cols=4):
-    """Create subplot dashboard for all chiefdoms in a district"""
-    
-    # Filter shapefile for the district
-    district_gdf = gdf[gdf['FIRST_DNAM'] == district_name].copy()
-    
-    if len(district_gdf) == 0:
-        st.error(f"No chiefdoms found for {district_name} district in shapefile")
-        return None
-    
-    # Get unique chiefdoms from shapefile
-    chiefdoms = sorted(district_gdf['FIRST_CHIE'].dropna().unique())
-    
-    # Calculate rows needed
-    rows = math.ceil(len(chiefdoms) / cols)
-    
-    # Create subplot figure with increased vertical space
-    fig, axes = plt.subplots(rows, cols, figsize=(cols*5, rows*6))
-    fig.suptitle(f'{district_name} District - All Chiefdoms with GPS Locations', 
-                 fontsize=20, fontweight='bold', y=0.98)
-    
-    # Ensure axes is always 2D array
-    if rows == 1:
-        axes = axes.reshape(1, -1)
-    elif cols == 1:
-        axes = axes.reshape(-1, 1)
-    
-    # Plot each chiefdom
-    for idx, chiefdom in enumerate(chiefdoms):
-        row = idx // cols
-        col = idx % cols
-        ax = axes[row, col]
-        
-        # Filter shapefile for this specific chiefdom
-        chiefdom_gdf = district_gdf[district_gdf['FIRST_CHIE'] == chiefdom].copy()
-        
-        # Plot chiefdom boundary
-        chiefdom_gdf.plot(ax=ax, color='lightblue', edgecolor='navy', alpha=0.7, linewidth=2)
-        
-        # Filter GPS data for this district and chiefdom with exact matching
-        district_data = extracted_df[extracted_df["District"].str.upper() == district_name.upper()].copy()
-        chiefdom_data = district_data[district_data["Chiefdom"] == chiefdom].copy()
-        
-        # Extract and plot GPS coordinates for this chiefdom
-        coords_extracted = []
-        if len(chiefdom_data) > 0 and not chiefdom_data["GPS_Location"].isna().all():
-            gps_data = chiefdom_data["GPS_Location"].dropna()
-            
-            for gps_val in gps_data:
-                if pd.notna(gps_val):
-                    lat, lon = parse_gps_coordinates(gps_val)
-                    
-                    # Validate coordinates for Sierra Leone
-                    if lat is not None and lon is not None:
-                        if 6.0 <= lat <= 11.0 and -14.0 <= lon <= -10.0:
-                            coords_extracted.append([lat, lon, str(gps_val)])
-        
-        # Handle overlapping coordinates by adding small offsets
-        def separate_overlapping_points(coords, min_distance=0.001):
-            """Separate overlapping GPS points by adding small offsets"""
-            if len(coords) <= 1:
-                return coords
-            
-            separated_coords = []
-            for i, (lat, lon, gps_str) in enumerate(coords):
-                adjusted_lat, adjusted_lon = lat, lon
-                
-                # Check if this point overlaps with any previous point
-                for j, (prev_lat, prev_lon, _) in enumerate(separated_coords):
-                    distance = ((adjusted_lat - prev_lat)**2 + (adjusted_lon - prev_lon)**2)**0.5
-                    if distance < min_distance:
-                        # Add small offset in a circular pattern
-                        angle = (i * 2 * 3.14159) / len(coords)
-                        offset = min_distance * 1.5
-                        adjusted_lat += offset * math.cos(angle)
-                        adjusted_lon += offset * math.sin(angle)
-                
-                separated_coords.append([adjusted_lat, adjusted_lon, gps_str])
-            
-            return separated_coords
-        
-        # Separate overlapping points
-        if coords_extracted:
-            coords_extracted = separate_overlapping_points(coords_extracted)
-        
-        # Plot GPS points if available
-        if coords_extracted:
-            lats, lons, gps_strings = zip(*coords_extracted)
-            
-            # Plot each point individually to ensure they're all visible
-            for i, (lat, lon) in enumerate(zip(lats, lons)):
-                ax.scatter(lon, lat, c='red', s=100, alpha=1.0, 
-                          edgecolors='white', linewidth=2, zorder=100, marker='o')
-            
-            # Add debug info in title if multiple points exist
-            if len(coords_extracted) > 1:
-                unique_coords = len(set([(round(lat, 6), round(lon, 6)) for lat, lon, _ in coords_extracted]))
-                if unique_coords < len(coords_extracted):
-                    debug_info = f" [Debug: {len(coords_extracted)} total, {unique_coords} unique locations]"
-                else:
-                    debug_info = ""
-            else:
-                debug_info = ""
-        
-        # Set title and clean up axes
-        ax.set_title(f'{chiefdom}\n({len(coords_extracted)} schools{debug_info if coords_extracted else ""})', 
-                    fontsize=12, fontweight='bold', pad=10)
-        
-        # Remove axis labels and ticks for cleaner look
-        ax.set_xticks([])
-        ax.set_yticks([])
-        ax.set_xlabel('')
-        ax.set_ylabel('')
-        
-        # Remove the box frame
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['bottom'].set_visible(False)
-        ax.spines['left'].set_visible(False)
-        
-        # Add grid
-        ax.grid(True, alpha=0.3, linestyle='--')
-        
-        # Set equal aspect ratio and tight layout
-        ax.set_aspect('equal')
-        
-        # Set bounds to chiefdom extent with some padding
-        bounds = chiefdom_gdf.total_bounds
-        padding = 0.01
-        ax.set_xlim(bounds[0] - padding, bounds[2] + padding)
-        ax.set_ylim(bounds[1] - padding, bounds[3] + padding)
-    
-    # Hide empty subplots
-    total_plots = rows * cols
-    for idx in range(len(chiefdoms), total_plots):
-        row = idx // cols
-        col = idx % cols
-        axes[row, col].set_visible(False)
-    
-    plt.tight_layout()
-    plt.subplots_adjust(top=0.93, hspace=0.4, wspace=0.3)
-    
-    return fig
-
 # Streamlit App
 st.title("🗺️ Section 1: GPS School Locations Dashboard")
 st.markdown("**Visual mapping of all school GPS coordinates by chiefdom**")
 
+# Immutable data is loaded once per process and shared by every session;
+# this session only holds a lease on the versions it displays
+lease = st.session_state.setdefault("data_lease", DataLease())
+
 # Load the embedded data files
 try:
-    # Load Excel file (embedded)
-    df_original = pd.read_excel("sbd first_submission_clean.xlsx")
-    
-    # Extract GPS data with chiefdom mapping
-    extracted_df = extract_gps_data_from_excel(df_original)
+    # Load Excel file (embedded) - parsed once and cached until the workbook changes
+    submissions_version = file_fingerprint("sbd first_submission_clean.xlsx")
+    extracted_df = shared("submissions", submissions_version,
+                          lambda: load_submissions("sbd first_submission_clean.xlsx"), lease)
     st.success(f"✅ Excel file loaded successfully! Found {len(extracted_df)} records.")
     
 except Exception as e:
@@ -352,7 +71,8 @@ except Exception as e:
 
 # Load shapefile (embedded)
 try:
-    gdf = gpd.read_file("Chiefdom2021.shp")
+    chiefdoms_version = shapefile_key("Chiefdom2021.shp")
+    gdf = shared("chiefdoms", chiefdoms_version, lambda: load_chiefdoms("Chiefdom2021.shp"), lease)
     st.success(f"✅ Shapefile loaded successfully! Found {len(gdf)} features.")
     
 except Exception as e:
@@ -360,6 +80,27 @@ except Exception as e:
     st.info("💡 Make sure 'Chiefdom2021.shp' and supporting files (.dbf, .shx, .prj) are in the same directory as this app")
     st.stop()
 
+# Locate every GPS point in the shapefile in one bulk spatial join
+data_version = (submissions_version, chiefdoms_version)
+location_df = shared("locations", data_version, lambda: flag_chiefdom_mismatches(
+    extracted_df, extracted_df["Latitude"], extracted_df["Longitude"], gdf
+), lease)
+
+# Districts with submissions, from the shapefile's FIRST_DNAM
+registry = district_registry(gdf, extracted_df=extracted_df)
+districts = registry.index.tolist()
+
+# Record and GPS counts for every district in one pass
+has_gps = extracted_df["GPS_Status"] != GPS_MISSING
+district_stats = pd.DataFrame({
+    "Chiefdoms": registry["Chiefdoms"],
+    "Total Records": registry["Submissions"],
+    "GPS Records": has_gps.groupby(extracted_df["District"].str.upper()).sum().reindex(registry.index, fill_value=0).astype(int),
+})
+district_stats["GPS Coverage"] = (
+    district_stats["GPS Records"] / district_stats["Total Records"].where(district_stats["Total Records"] > 0) * 100
+).fillna(0)
+
 # Dashboard Settings - Fixed configuration
 columns = 4  # Fixed to 4 columns for optimal Word export
 show_data_info = True  # Always show data overview
@@ -368,244 +109,150 @@ if show_data_info:
     # Display data information
     st.subheader("📊 Data Overview")
     
-    col1, col2, col3, col4 = st.columns(4)
+    overview_metrics = [("Total Records", len(extracted_df))]
+    overview_metrics += [(f"{district} District", int(row["Total Records"])) for district, row in district_stats.iterrows()]
+    overview_metrics.append(("GPS Records", int(has_gps.sum())))
+    
+    metric_columns = st.columns(4)
+    for index, (label, value) in enumerate(overview_metrics):
+        with metric_columns[index % 4]:
+            st.metric(label, f"{value:,}")
+    
+    # Chiefdom names that could not be matched to the shapefile
+    unresolved_df = unresolved_chiefdom_report(extracted_df["Chiefdom"])
+    if len(unresolved_df) > 0:
+        st.warning(f"⚠️ {len(unresolved_df)} chiefdom name(s) could not be matched to the shapefile")
+        st.dataframe(unresolved_df, use_container_width=True)
+    
+    # GPS point vs QR-declared chiefdom check
+    st.subheader("📍 GPS Location Check")
     
-    with col1:
-        total_records = len(extracted_df)
-        st.metric("Total Records", f"{total_records:,}")
+    mismatch_df = location_df[location_df["Chiefdom_Mismatch"]]
+    outside_count = int((location_df["GPS_Chiefdom"].isna() & location_df["Latitude"].notna()).sum())
     
-    with col2:
-        bo_records = len(extracted_df[extracted_df["District"].str.upper() == "BO"])
-        st.metric("BO District", f"{bo_records:,}")
+    check_col1, check_col2 = st.columns(2)
     
-    with col3:
-        bombali_records = len(extracted_df[extracted_df["District"].str.upper() == "BOMBALI"])
-        st.metric("BOMBALI District", f"{bombali_records:,}")
+    with check_col1:
+        st.metric("GPS Outside Declared Chiefdom", f"{len(mismatch_df):,}")
     
-    with col4:
-        total_gps = len(extracted_df[extracted_df["GPS_Location"].notna()])
-        st.metric("GPS Records", f"{total_gps:,}")
+    with check_col2:
+        st.metric("GPS Outside All Chiefdoms", f"{outside_count:,}")
+    
+    if len(mismatch_df) > 0:
+        with st.expander("Schools whose GPS point falls in a different chiefdom"):
+            st.dataframe(
+                mismatch_df[["District", "Chiefdom", "GPS_District", "GPS_Chiefdom", "School", "Latitude", "Longitude"]],
+                use_container_width=True
+            )
 
-# Create dashboards
-st.header("🗺️ GPS Location Dashboards")
+# Rendered dashboards are cached on the versions of the data they are drawn from
+dashboard_key = ("gps", columns, data_version)
 
-# BO District Dashboard
-st.subheader("BO District - All Chiefdoms")
+# School point clusters at every zoom level - built once per data snapshot
+chiefdom_clusters = shared("chiefdom_clusters", data_version, lambda: build_cluster_index(
+    school_points(extracted_df, by_chiefdom=True)
+), lease)
 
-with st.spinner("Generating BO District dashboard..."):
+# Interactive map - built once per data snapshot; panning and zooming run in the browser only
+st.subheader("🌍 Interactive Map")
+
+if st.checkbox("Show interactive map", help="Pan and zoom over every chiefdom and school point"):
     try:
-        fig_bo = create_chiefdom_subplot_dashboard(gdf, extracted_df, "BO", columns)
-        if fig_bo:
-            st.pyplot(fig_bo)
-            
-            # Save figure option
-            buffer_bo = BytesIO()
-            fig_bo.savefig(buffer_bo, format='png', dpi=300, bbox_inches='tight')
-            buffer_bo.seek(0)
-            
-            st.download_button(
-                label="📥 Download BO District Dashboard (PNG)",
-                data=buffer_bo,
-                file_name="BO_District_GPS_Dashboard.png",
-                mime="image/png"
-            )
-            
-            # Word Export for BO District
-            try:
-                from docx import Document
-                from docx.shared import Inches, Pt
-                from docx.enum.text import WD_ALIGN_PARAGRAPH
-                import tempfile
-                import os
-                
-                # Create Word document
-                doc = Document()
-                
-                # Add title
-                title = doc.add_heading('BO District - GPS School Locations Dashboard', 0)
-                title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                
-                # Add generation date
-                date_para = doc.add_paragraph()
-                date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                date_run = date_para.add_run(f"Generated: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                date_run.font.size = Pt(12)
-                
-                doc.add_paragraph()  # Add space
-                
-                # Save matplotlib figure as PNG and embed in Word
-                timestamp = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
-                png_filename = f"BO_District_GPS_Dashboard_{timestamp}.png"
-                
-                # Save PNG file to current directory
-                fig_bo.savefig(png_filename, format='png', dpi=200, 
-                              bbox_inches='tight', facecolor='white', 
-                              edgecolor='none', pad_inches=0.1)
-                
-                # Add the saved PNG to Word document
-                doc.add_picture(png_filename, width=Inches(9.5))  # Fits well in Word page
-                
-                # Add summary information
-                doc.add_heading('Dashboard Summary', level=1)
-                
-                summary_text = f"""
-                District: BO
-                Total Chiefdoms: {len(gdf[gdf['FIRST_DNAM'] == 'BO'])}
-                Total Records: {len(extracted_df[extracted_df['District'].str.upper() == 'BO'])}
-                GPS Records: {len(extracted_df[(extracted_df['District'].str.upper() == 'BO') & extracted_df['GPS_Location'].notna()])}
-                GPS Coverage: {(len(extracted_df[(extracted_df['District'].str.upper() == 'BO') & extracted_df['GPS_Location'].notna()]) / len(extracted_df[extracted_df['District'].str.upper() == 'BO']) * 100) if len(extracted_df[extracted_df['District'].str.upper() == 'BO']) > 0 else 0:.1f}%
-                PNG File Saved: {png_filename}
-                """
-                
-                for line in summary_text.strip().split('\n'):
-                    if line.strip():
-                        p = doc.add_paragraph()
-                        p.add_run('• ').bold = True
-                        p.add_run(line.strip())
-                
-                # Save to BytesIO
-                word_buffer = BytesIO()
-                doc.save(word_buffer)
-                word_data = word_buffer.getvalue()
-                
-                # Success message
-                st.success(f"✅ PNG saved as: {png_filename}")
-                
-                st.download_button(
-                    label="📄 Download BO District Dashboard (Word)",
-                    data=word_data,
-                    file_name=f"BO_District_GPS_Dashboard_{timestamp}.docx",
-                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                )
-                
-            except ImportError:
-                st.warning("⚠️ Word export requires python-docx library. Install with: pip install python-docx")
-            except Exception as e:
-                st.warning(f"⚠️ Word export failed: {str(e)}")
-        else:
-            st.warning("Could not generate BO District dashboard")
+        with st.spinner("Preparing interactive map..."):
+            map_html = shared("interactive_map", (data_version, MAP_VERSION), lambda: build_map(
+                gdf[gdf['FIRST_DNAM'].isin(districts)], school_points(location_df)
+            ), lease)
+        components.html(map_html, height=620)
+        st.caption("🔴 School (number of schools when clustered) | 🟠 Cluster with a GPS point outside its declared chiefdom")
+    except ImportError:
+        st.warning("⚠️ The interactive map requires the folium library. Install with: pip install folium")
     except Exception as e:
-        st.error(f"Error generating BO District dashboard: {e}")
+        st.warning(f"⚠️ Interactive map failed: {str(e)}")
 
-st.divider()
+# Render every district dashboard in one batch (in parallel worker processes)
+with st.spinner("Generating district dashboards..."):
+    try:
+        gps_figures = district_figures(dashboard_key, {
+            district: (create_chiefdom_subplot_dashboard, (
+                gdf[gdf['FIRST_DNAM'] == district],
+                extracted_df[extracted_df["District"].str.upper() == district],
+                district,
+                columns,
+                select_groups(chiefdom_clusters, [
+                    chiefdom_group(district, chiefdom) for chiefdom in gdf.loc[gdf['FIRST_DNAM'] == district, 'FIRST_CHIE']
+                ]),
+            ))
+            for district in districts
+        })
+    except Exception as e:
+        st.error(f"Error generating district dashboards: {e}")
+        gps_figures = {}
 
-# BOMBALI District Dashboard
-st.subheader("BOMBALI District - All Chiefdoms")
+def gps_summary_items(district):
+    """Record and GPS counts for one district, as report bullet lines"""
+    row = district_stats.loc[district]
+    return [
+        f"Total Chiefdoms: {int(row['Chiefdoms'])}",
+        f"Total Records: {int(row['Total Records']):,}",
+        f"GPS Records: {int(row['GPS Records']):,}",
+        f"GPS Coverage: {row['GPS Coverage']:.1f}%"
+    ]
 
-with st.spinner("Generating BOMBALI District dashboard..."):
-    try:
-        fig_bombali = create_chiefdom_subplot_dashboard(gdf, extracted_df, "BOMBALI", columns)
-        if fig_bombali:
-            st.pyplot(fig_bombali)
-            
-            # Save figure option
-            buffer_bombali = BytesIO()
-            fig_bombali.savefig(buffer_bombali, format='png', dpi=300, bbox_inches='tight')
-            buffer_bombali.seek(0)
+# Create dashboards
+st.header("🗺️ GPS Location Dashboards")
+
+for index, district in enumerate(districts):
+    if index > 0:
+        st.divider()
+    
+    pngs = gps_figures.get(district)
+    
+    # District Dashboard
+    st.subheader(f"{district} District - All Chiefdoms")
+    
+    if not pngs:
+        st.warning(f"Could not generate {district} District dashboard")
+        continue
+    
+    st.image(pngs[SCREEN_DPI])
+    
+    st.download_button(
+        label=f"📥 Download {district} District Dashboard (PNG)",
+        data=pngs[DOWNLOAD_DPI],
+        file_name=f"{district}_District_GPS_Dashboard.png",
+        mime="image/png"
+    )
+    
+    # Word Export for the district - built only when requested
+    if st.button(f"📝 Prepare {district} District Dashboard (Word)"):
+        st.session_state[f"report_{district}_gps"] = True
+    
+    if st.session_state.get(f"report_{district}_gps"):
+        try:
+            word_data = report_docx(dashboard_key, f"gps-{district}", lambda: district_report(
+                f'{district} District - GPS School Locations Dashboard',
+                pngs[SCREEN_DPI],
+                [f"District: {district}"] + gps_summary_items(district),
+            ))
             
             st.download_button(
-                label="📥 Download BOMBALI District Dashboard (PNG)",
-                data=buffer_bombali,
-                file_name="BOMBALI_District_GPS_Dashboard.png",
-                mime="image/png"
+                label=f"📄 Download {district} District Dashboard (Word)",
+                data=word_data,
+                file_name=f"{district}_District_GPS_Dashboard_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.docx",
+                mime=DOCX_MIME
             )
             
-            # Word Export for BOMBALI District
-            try:
-                from docx import Document
-                from docx.shared import Inches, Pt
-                from docx.enum.text import WD_ALIGN_PARAGRAPH
-                import tempfile
-                import os
-                
-                # Create Word document
-                doc = Document()
-                
-                # Add title
-                title = doc.add_heading('BOMBALI District - GPS School Locations Dashboard', 0)
-                title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                
-                # Add generation date
-                date_para = doc.add_paragraph()
-                date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                date_run = date_para.add_run(f"Generated: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                date_run.font.size = Pt(12)
-                
-                doc.add_paragraph()  # Add space
-                
-                # Save matplotlib figure to temporary file for Word export
-                with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
-                    # Save with optimized settings for Word document
-                    fig_bombali.savefig(tmp_file.name, format='png', dpi=200, 
-                                       bbox_inches='tight', facecolor='white', 
-                                       edgecolor='none', pad_inches=0.1)
-                    
-                    # Add image to Word document with optimal size for page fit
-                    doc.add_picture(tmp_file.name, width=Inches(9.5))  # Fits well in Word page
-                    
-                    # Clean up temp file
-                    os.unlink(tmp_file.name)
-                
-                # Add summary information
-                doc.add_heading('Dashboard Summary', level=1)
-                
-                summary_text = f"""
-                District: BOMBALI
-                Total Chiefdoms: {len(gdf[gdf['FIRST_DNAM'] == 'BOMBALI'])}
-                Total Records: {len(extracted_df[extracted_df['District'].str.upper() == 'BOMBALI'])}
-                GPS Records: {len(extracted_df[(extracted_df['District'].str.upper() == 'BOMBALI') & extracted_df['GPS_Location'].notna()])}
-                GPS Coverage: {(len(extracted_df[(extracted_df['District'].str.upper() == 'BOMBALI') & extracted_df['GPS_Location'].notna()]) / len(extracted_df[extracted_df['District'].str.upper() == 'BOMBALI']) * 100) if len(extracted_df[extracted_df['District'].str.upper() == 'BOMBALI']) > 0 else 0:.1f}%
-                """
-                
-                for line in summary_text.strip().split('\n'):
-                    if line.strip():
-                        p = doc.add_paragraph()
-                        p.add_run('• ').bold = True
-                        p.add_run(line.strip())
-                
-                # Save to BytesIO
-                word_buffer = BytesIO()
-                doc.save(word_buffer)
-                word_data = word_buffer.getvalue()
-                
-                st.download_button(
-                    label="📄 Download BOMBALI District Dashboard (Word)",
-                    data=word_data,
-                    file_name="BOMBALI_District_GPS_Dashboard.docx",
-                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                )
-                
-            except ImportError:
-                st.warning("⚠️ Word export requires python-docx library. Install with: pip install python-docx")
-            except Exception as e:
-                st.warning(f"⚠️ Word export failed: {str(e)}")
-        else:
-            st.warning("Could not generate BOMBALI District dashboard")
-    except Exception as e:
-        st.error(f"Error generating BOMBALI District dashboard: {e}")
+        except ImportError:
+            st.warning("⚠️ Word export requires python-docx library. Install with: pip install python-docx")
+        except Exception as e:
+            st.warning(f"⚠️ Word export failed: {str(e)}")
 
 # Summary Statistics
 st.header("📈 Summary Statistics")
 
-# Create summary for both districts
-summary_data = []
-
-for district in ["BO", "BOMBALI"]:
-    district_gdf = gdf[gdf['FIRST_DNAM'] == district]
-    district_data = extracted_df[extracted_df["District"].str.upper() == district.upper()]
-    
-    # Count GPS locations
-    gps_count = len(district_data[district_data["GPS_Location"].notna()])
-    
-    summary_data.append({
-        "District": district,
-        "Chiefdoms": len(district_gdf) if len(district_gdf) > 0 else 0,
-        "Total Records": len(district_data),
-        "GPS Records": gps_count,
-        "GPS Coverage": f"{(gps_count/len(district_data)*100) if len(district_data) > 0 else 0:.1f}%"
-    })
-
-summary_df = pd.DataFrame(summary_data)
+# Summary for every district
+summary_df = district_stats.reset_index()
+summary_df["GPS Coverage"] = summary_df["GPS Coverage"].map("{:.1f}%".format)
 st.dataframe(summary_df, use_container_width=True)
 
 # Raw data preview (optional)
@@ -617,133 +264,51 @@ if show_raw_data:
 # Export All Dashboards as Combined Word Document
 st.header("📄 Combined Word Export")
 
-if st.button("📋 Generate Combined Word Report", help="Generate a comprehensive Word document with both districts"):
+if st.button("📋 Generate Combined Word Report", help="Generate a comprehensive Word document with every district"):
+    st.session_state["report_combined_gps"] = True
+
+if st.session_state.get("report_combined_gps"):
     try:
-        from docx import Document
-        from docx.shared import Inches, Pt
-        from docx.enum.text import WD_ALIGN_PARAGRAPH
-        import tempfile
-        import os
-        
-        # Create Word document
-        doc = Document()
-        
-        # Add main title
-        title = doc.add_heading('School-Based Distribution (SBD)', 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        subtitle = doc.add_heading('GPS School Locations Dashboard', level=1)
-        subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        # Add generation date
-        date_para = doc.add_paragraph()
-        date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        date_run = date_para.add_run(f"Generated: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        date_run.font.size = Pt(12)
-        date_run.bold = True
-        
-        doc.add_page_break()
-        
-        # Executive Summary
-        doc.add_heading('Executive Summary', level=1)
-        
-        bo_records = len(extracted_df[extracted_df['District'].str.upper() == 'BO'])
-        bombali_records = len(extracted_df[extracted_df['District'].str.upper() == 'BOMBALI'])
-        total_gps = len(extracted_df[extracted_df['GPS_Location'].notna()])
-        
-        summary_text = f"""
-        This comprehensive dashboard report presents GPS school location analysis for BO and BOMBALI districts:
-        
-        • Districts Covered: BO, BOMBALI
-        • Total Records: {len(extracted_df):,}
-        • BO District Records: {bo_records:,}
-        • BOMBALI District Records: {bombali_records:,}
-        • GPS Records: {total_gps:,}
-        • Overall GPS Coverage: {(total_gps/len(extracted_df)*100) if len(extracted_df) > 0 else 0:.1f}%
-        
-        This report contains visual mapping of all school GPS coordinates by chiefdom. Each chiefdom is displayed with its administrative boundaries and red markers indicating school locations.
-        """
-        
-        for line in summary_text.strip().split('\n'):
-            if line.strip():
-                if line.startswith('•'):
-                    p = doc.add_paragraph()
-                    p.add_run(line.strip())
-                else:
-                    doc.add_paragraph(line.strip())
-        
-        doc.add_page_break()
-        
-        # BO District section
-        if 'fig_bo' in locals():
-            doc.add_heading('BO District - GPS School Locations', level=1)
+        def build_combined_report():
+            total_gps = int(has_gps.sum())
             
-            # Save BO figure to temporary file and add to document
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
-                # Save with optimized settings for Word document
-                fig_bo.savefig(tmp_file.name, format='png', dpi=200, 
-                              bbox_inches='tight', facecolor='white', 
-                              edgecolor='none', pad_inches=0.1)
-                # Add image with optimal size for Word page
-                doc.add_picture(tmp_file.name, width=Inches(9.5))
-                os.unlink(tmp_file.name)
-            
-            # BO summary
-            doc.add_heading('BO District Summary', level=2)
-            bo_gps_count = len(extracted_df[(extracted_df['District'].str.upper() == 'BO') & extracted_df['GPS_Location'].notna()])
-            
-            bo_summary_items = [
-                f"Total Chiefdoms: {len(gdf[gdf['FIRST_DNAM'] == 'BO'])}",
-                f"Total Records: {bo_records:,}",
-                f"GPS Records: {bo_gps_count:,}",
-                f"GPS Coverage: {(bo_gps_count/bo_records*100) if bo_records > 0 else 0:.1f}%"
+            summary_paragraphs = [
+                f"This comprehensive dashboard report presents GPS school location analysis for {format_district_list(districts)} districts:",
+                f"• Districts Covered: {', '.join(districts)}",
+                f"• Total Records: {len(extracted_df):,}",
             ]
-            
-            for item in bo_summary_items:
-                p = doc.add_paragraph()
-                p.add_run('• ').bold = True
-                p.add_run(item)
-            
-            doc.add_page_break()
-        
-        # BOMBALI District section
-        if 'fig_bombali' in locals():
-            doc.add_heading('BOMBALI District - GPS School Locations', level=1)
-            
-            # Save BOMBALI figure to temporary file and add to document
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
-                fig_bombali.savefig(tmp_file.name, format='png', dpi=300, bbox_inches='tight')
-                doc.add_picture(tmp_file.name, width=Inches(10))
-                os.unlink(tmp_file.name)
-            
-            # BOMBALI summary
-            doc.add_heading('BOMBALI District Summary', level=2)
-            bombali_gps_count = len(extracted_df[(extracted_df['District'].str.upper() == 'BOMBALI') & extracted_df['GPS_Location'].notna()])
-            
-            bombali_summary_items = [
-                f"Total Chiefdoms: {len(gdf[gdf['FIRST_DNAM'] == 'BOMBALI'])}",
-                f"Total Records: {bombali_records:,}",
-                f"GPS Records: {bombali_gps_count:,}",
-                f"GPS Coverage: {(bombali_gps_count/bombali_records*100) if bombali_records > 0 else 0:.1f}%"
+            summary_paragraphs += [
+                f"• {district} District Records: {int(row['Total Records']):,}"
+                for district, row in district_stats.iterrows()
+            ]
+            summary_paragraphs += [
+                f"• GPS Records: {total_gps:,}",
+                f"• Overall GPS Coverage: {(total_gps/len(extracted_df)*100) if len(extracted_df) > 0 else 0:.1f}%",
+                "This report contains visual mapping of all school GPS coordinates by chiefdom. Each chiefdom is displayed with its administrative boundaries and red markers indicating school locations."
             ]
             
-            for item in bombali_summary_items:
-                p = doc.add_paragraph()
-                p.add_run('• ').bold = True
-                p.add_run(item)
-        
-        # Save to BytesIO
-        word_buffer = BytesIO()
-        doc.save(word_buffer)
-        word_data = word_buffer.getvalue()
+            sections = []
+            for district in districts:
+                pngs = gps_figures.get(district)
+                if pngs:
+                    sections.append((
+                        f"{district} District - GPS School Locations",
+                        pngs[SCREEN_DPI],
+                        f"{district} District Summary",
+                        gps_summary_items(district),
+                        9.5,
+                    ))
+            return combined_report('GPS School Locations Dashboard', summary_paragraphs, sections)
+        
+        word_data = report_docx(dashboard_key, "gps-combined", build_combined_report)
         
         st.success("✅ Combined Word report generated successfully!")
         st.download_button(
             label="💾 Download Combined GPS Dashboard Report (Word)",
             data=word_data,
             file_name=f"GPS_School_Locations_Report_{pd.Timestamp.now().strftime('%Y%m%d_%H%M')}.docx",
-            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            help="Download comprehensive Word report with both districts"
+            mime=DOCX_MIME,
+            help="Download comprehensive Word report with every district"
         )
         
     except ImportError:
@@ -751,9 +316,6 @@ if st.button("📋 Generate Combined Word Report", help="Generate a comprehensiv
     except Exception as e:
         st.error(f"❌ Error generating combined Word document: {str(e)}")
 
-# Memory optimization - close matplotlib figures
-plt.close('all')
-
 # Footer
 st.markdown("---")
 st.markdown("**📊 Section 1: GPS School Locations | School-Based Distribution Analysis**")
@@ -0,0 +1,15 @@
+"""Shared test setup: run from the repository root, caching into a scratch directory"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Tests import sbd and read the workbooks and shapefile at the repository root
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+# Before sbd is imported, so no test reads or writes the working .sbd_cache
+os.environ.setdefault("SBD_CACHE_DIR", tempfile.mkdtemp(prefix="sbd-test-cache-"))
+os.environ.setdefault("MPLBACKEND", "Agg")
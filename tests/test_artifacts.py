@@ -0,0 +1,39 @@
+import threading
+
+from sbd import artifacts
+
+
+def fake_render(tasks, dpis):
+    return {district: {dpi: f"{district}@{dpi}".encode() for dpi in dpis} for district in tasks}
+
+def test_renders_each_district_once(monkeypatch):
+    artifacts.clear_artifacts()
+    calls = []
+    monkeypatch.setattr(artifacts, "render_figures", lambda tasks, dpis: calls.append(set(tasks)) or fake_render(tasks, dpis))
+
+    tasks = {"BO": (None, ()), "BOMBALI": (None, ())}
+    first = artifacts.district_figures("data", tasks, dpis=(100,))
+    second = artifacts.district_figures("data", tasks, dpis=(100,))
+    assert first == second == {"BO": {100: b"BO@100"}, "BOMBALI": {100: b"BOMBALI@100"}}
+    assert calls == [{"BO", "BOMBALI"}]
+
+def test_render_does_not_block_other_districts(monkeypatch):
+    artifacts.clear_artifacts()
+    rendering, release = threading.Event(), threading.Event()
+
+    def render(tasks, dpis):
+        if "SLOW" in tasks:
+            rendering.set()
+            release.wait(5)
+        return fake_render(tasks, dpis)
+
+    monkeypatch.setattr(artifacts, "render_figures", render)
+    worker = threading.Thread(target=artifacts.district_figures, args=("data", {"SLOW": (None, ())}, (100,)))
+    worker.start()
+    try:
+        assert rendering.wait(5)
+        assert artifacts.district_figures("data", {"FAST": (None, ())}, (100,)) == {"FAST": {100: b"FAST@100"}}
+        assert worker.is_alive()
+    finally:
+        release.set()
+        worker.join()
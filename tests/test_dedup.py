@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from sbd.dedup import find_duplicates, update_duplicates
+from sbd.extract import extract_gps_data_from_excel
+from sbd.ingest import load_submissions
+from sbd.snapshots import SNAPSHOT_FILES
+
+
+def submissions(*rows):
+    """Extracted frame of (QR fields, "lat,lon") rows, as ingestion builds it"""
+    qr = ["\n".join(f"{label}: {value}" for label, value in fields.items()) if fields else None for fields, _ in rows]
+    return extract_gps_data_from_excel(pd.DataFrame({"Scan QR code": qr, "GPS Location": [gps for _, gps in rows]}))
+
+def test_empty_frame():
+    duplicates = find_duplicates(submissions())
+    assert duplicates.empty
+
+def test_rows_without_district():
+    extracted_df = submissions(
+        ({"Chiefdom": "Kakua", "Name of school": "Bo Town Primary"}, "7.9600,-11.7400"),
+        ({"Chiefdom": "Kakua", "Name of school": "Bo Town Primary School"}, "7.9601,-11.7400"),
+    )
+    assert extracted_df["District"].isna().all()
+    duplicates = find_duplicates(extracted_df)
+    assert not duplicates["Duplicate"].any()
+
+def test_nearby_similar_names_in_one_chiefdom():
+    school = {"District": "Bo", "Chiefdom": "Kakua", "Name of school": "Bo Town Primary School"}
+    extracted_df = submissions(
+        (school, "7.9600,-11.7400"),
+        ({**school, "Name of school": "Bo Town Primary Schol"}, "7.9601,-11.7400"),
+        ({**school, "Name of school": "Kakua Islamic Primary"}, "7.9602,-11.7400"),
+    )
+    duplicates = find_duplicates(extracted_df)
+    assert duplicates["Duplicate"].tolist() == [False, True, False]
+    assert duplicates["Reason"].isna().tolist() == [True, False, True]
+    assert duplicates.at[1, "Reason"] == "Nearby, similar name"
+
+def test_identical_payloads_are_exact_repeats():
+    school = {"District": "Bo", "Chiefdom": "Kakua", "Name of school": "Bo Town Primary School", "Enrollment": 120}
+    duplicates = find_duplicates(submissions((school, "7.9600,-11.7400"), (school, None)))
+    assert duplicates["Duplicate"].tolist() == [False, True]
+    assert duplicates.at[1, "Reason"] == "Exact QR"
+
+def test_partial_payloads_are_not_exact_repeats():
+    # Same district and chiefdom only, about 70 km apart
+    partial = {"District": "Bo", "Chiefdom": "Kakua"}
+    duplicates = find_duplicates(submissions((partial, "7.9600,-11.7400"), (partial, "7.9600,-11.1000")))
+    assert not duplicates["Duplicate"].any()
+
+def test_missing_payloads_and_fields():
+    duplicates = find_duplicates(submissions(
+        (None, None),
+        (None, "7.9600,-11.7400"),
+        ({"Name of school": "Bo Town Primary School"}, None),
+        ({"Name of school": "Bo Town Primary School"}, None),
+    ))
+    assert duplicates["Duplicate"].tolist() == [False, False, False, True]
+
+def test_update_matches_full_recompute():
+    extracted_df = load_submissions(SNAPSHOT_FILES[-1])
+    rng = np.random.default_rng(0)
+    for stored in [0, 1, len(extracted_df) // 2, len(extracted_df) - 10, len(extracted_df)]:
+        rows = extracted_df.iloc[:stored].reset_index(drop=True)
+        batch = extracted_df.iloc[stored:].reset_index(drop=True)
+        kept = rng.random(stored) > 0.1
+
+        updated = update_duplicates(rows, find_duplicates(rows), kept, batch)
+        expected = find_duplicates(pd.concat([rows[kept], batch], ignore_index=True))
+        pd.testing.assert_frame_equal(updated, expected, check_dtype=False)
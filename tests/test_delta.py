@@ -0,0 +1,133 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from sbd import delta
+from sbd.coverage import chiefdom_counts
+from sbd.dedup import find_duplicates
+from sbd.delta import delta_counts, delta_duplicates, ingest_delta, load_delta_rows
+from sbd.extract import extract_gps_data_from_excel
+from sbd.ingest import load_submissions
+from sbd.snapshots import SNAPSHOT_FILES
+
+
+def qr(district, chiefdom, school):
+    return f"District: {district}\nChiefdom: {chiefdom}\nName of school: {school}\nEnrollment: 50"
+
+def export(path, rows):
+    """Write an export of (Submission Id, QR text, GPS Location) rows"""
+    pd.DataFrame(rows, columns=["Submission Id", "Scan QR code", "GPS Location"]).assign(
+        **{"Created At": "2025-07-01"}).to_excel(path, index=False)
+    return path
+
+def full_extract(path):
+    """Extracted rows of an export with a full recompute, keyed by Submission Id"""
+    raw = pd.read_excel(path)
+    return extract_gps_data_from_excel(raw).assign(Submission=raw["Submission Id"].astype(str))
+
+def assert_same_rows(stored, expected):
+    columns = ["Submission", "District", "Chiefdom", "Latitude", "Longitude", "School"]
+    stored = stored[columns].astype(str).sort_values("Submission").reset_index(drop=True)
+    expected = expected[columns].astype(str).sort_values("Submission").reset_index(drop=True)
+    pd.testing.assert_frame_equal(stored, expected)
+
+@pytest.fixture
+def store_dir(tmp_path):
+    yield tmp_path / "store"
+    delta._stores.clear()
+
+def test_new_and_edited_rows_match_full_recompute(tmp_path, store_dir):
+    first = export(tmp_path / "first.xlsx", [
+        (1, qr("Bo", "Kakua", "Bo Town Primary"), "7.96,-11.74"),
+        (2, qr("Bo", "Badjia", "Njagbahun Primary"), "8.17,-11.46"),
+        (3, None, None),
+    ])
+    second = export(tmp_path / "second.xlsx", [
+        (1, qr("Bo", "Kakua", "Bo Town Primary"), "7.96,-11.74"),
+        # Edited: moved to another chiefdom
+        (2, qr("Bo", "Tinkoko", "Njagbahun Primary"), "8.17,-11.46"),
+        (3, None, None),
+        (4, qr("Bombali", "Makeni City", "Makeni Primary"), "8.88,-12.04"),
+    ])
+
+    assert ingest_delta(first, store_dir) == 3
+    assert ingest_delta(second, store_dir) == 2
+    assert ingest_delta(second, store_dir) == 0
+
+    expected = full_extract(second)
+    assert delta_counts(store_dir).to_dict() == chiefdom_counts(expected).to_dict()
+    assert_same_rows(load_delta_rows(store_dir), expected)
+
+    # Reopened from the part files alone
+    delta._stores.clear()
+    assert delta_counts(store_dir).to_dict() == chiefdom_counts(expected).to_dict()
+    assert_same_rows(load_delta_rows(store_dir), expected)
+
+def test_daily_exports_match_full_recompute(store_dir):
+    for path in SNAPSHOT_FILES:
+        ingest_delta(path, store_dir)
+
+    # Each export contains every earlier submission
+    latest = load_submissions(SNAPSHOT_FILES[-1])
+    assert delta_counts(store_dir).to_dict() == chiefdom_counts(latest).to_dict()
+    assert len(load_delta_rows(store_dir)) == len(latest)
+
+def test_repeats_match_full_recompute(tmp_path, store_dir):
+    school = qr("Bo", "Kakua", "Bo Town Primary School")
+    first = export(tmp_path / "first.xlsx", [
+        (1, school, "7.9600,-11.7400"),
+        (2, qr("Bo", "Kakua", "Kakua Islamic Primary"), "7.9700,-11.7400"),
+    ])
+    second = export(tmp_path / "second.xlsx", [
+        (1, school, "7.9600,-11.7400"),
+        # Edited: now a nearby repeat of submission 1
+        (2, qr("Bo", "Kakua", "Bo Town Primary Schol"), "7.9601,-11.7400"),
+        (3, school, None),
+        (4, qr("Bo", "Kakua", "Kakua Islamic Primary"), "7.9700,-11.7400"),
+    ])
+
+    ingest_delta(first, store_dir)
+    assert not delta_duplicates(store_dir)["Duplicate"].any()
+    ingest_delta(second, store_dir)
+
+    expected = find_duplicates(load_delta_rows(store_dir))
+    pd.testing.assert_frame_equal(delta_duplicates(store_dir), expected, check_dtype=False)
+    assert delta_duplicates(store_dir)["Duplicate"].sum() == 2
+
+    # Reopened from the stored repeat flags
+    delta._stores.clear()
+    pd.testing.assert_frame_equal(delta_duplicates(store_dir), expected, check_dtype=False)
+
+def test_daily_exports_repeats_match_full_recompute(store_dir):
+    for path in SNAPSHOT_FILES:
+        ingest_delta(path, store_dir)
+
+    expected = find_duplicates(load_delta_rows(store_dir))
+    pd.testing.assert_frame_equal(delta_duplicates(store_dir), expected, check_dtype=False)
+
+def test_ingest_does_not_block_other_stores(tmp_path, monkeypatch):
+    busy_dir, idle_dir = tmp_path / "busy", tmp_path / "idle"
+    path = export(tmp_path / "export.xlsx", [("1", qr("Bo", "Badjia", "Alpha School"), "8.0 -11.5")])
+    ingest_delta(path, idle_dir)
+    building, release = threading.Event(), threading.Event()
+    read_workbook = delta.read_workbook
+
+    def slow_read(*args, **kwargs):
+        building.set()
+        release.wait(5)
+        return read_workbook(*args, **kwargs)
+
+    monkeypatch.setattr(delta, "read_workbook", slow_read)
+    worker = threading.Thread(target=ingest_delta, args=(path, busy_dir))
+    worker.start()
+    try:
+        assert building.wait(5)
+        # Served while the other store is still ingesting
+        assert delta_counts(idle_dir).sum() == 1
+        assert len(load_delta_rows(idle_dir)) == 1
+        assert worker.is_alive()
+    finally:
+        release.set()
+        worker.join()
+    assert delta_counts(busy_dir).equals(delta_counts(idle_dir))
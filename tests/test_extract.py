@@ -0,0 +1,118 @@
+"""Vectorized extraction against the original per-row implementation, on every export in the repository"""
+import glob
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sbd.extract import extract_gps_data_from_excel, find_qr_column
+from sbd.gps import GPS_OK, GPS_OUT_OF_BOUNDS
+from sbd.ingest import read_workbook
+from sbd.names import create_chiefdom_mapping
+
+
+def baseline_map_chiefdom_name(chiefdom_name, mapping):
+    """The original app's name mapping: exact, case-insensitive, then partial match"""
+    if pd.isna(chiefdom_name):
+        return None
+    chiefdom_name = str(chiefdom_name).strip()
+    if chiefdom_name in mapping:
+        return mapping[chiefdom_name]
+    for key, value in mapping.items():
+        if key.upper() == chiefdom_name.upper():
+            return value
+    for key, value in mapping.items():
+        if key.upper() in chiefdom_name.upper() or chiefdom_name.upper() in key.upper():
+            return value
+    return chiefdom_name
+
+def baseline_parse_gps(gps_str):
+    """The original app's coordinate parser"""
+    if pd.isna(gps_str):
+        return None, None
+    gps_str = str(gps_str).strip()
+    if "," in gps_str and " " not in gps_str:
+        parts = gps_str.split(",")
+    elif " " in gps_str and "," not in gps_str:
+        parts = gps_str.split()
+    else:
+        parts = re.findall(r"-?\d+\.?\d*", gps_str)[:2]
+    try:
+        return (float(parts[0]), float(parts[1])) if len(parts) == 2 else (None, None)
+    except ValueError:
+        return None, None
+
+def baseline_extract(df):
+    """The original app's row-by-row extraction (District, Chiefdom, Latitude, Longitude)"""
+    mapping = create_chiefdom_mapping()
+    rows = []
+    for idx, qr_text in enumerate(df[find_qr_column(df)]):
+        if pd.isna(qr_text):
+            rows.append((None, None, None, None))
+            continue
+        district = re.search(r"District:\s*([^\n]+)", str(qr_text))
+        chiefdom = re.search(r"Chiefdom:\s*([^\n]+)", str(qr_text))
+        gps = df["GPS Location"].iloc[idx] if "GPS Location" in df.columns else None
+        rows.append((
+            district.group(1).strip() if district else None,
+            baseline_map_chiefdom_name(chiefdom.group(1).strip() if chiefdom else None, mapping),
+            *baseline_parse_gps(gps),
+        ))
+    return pd.DataFrame(rows, columns=["District", "Chiefdom", "Latitude", "Longitude"])
+
+def submission_workbooks():
+    paths = []
+    for path in sorted(glob.glob("*.xlsx")):
+        try:
+            find_qr_column(pd.read_excel(path, nrows=0))
+        except KeyError:
+            continue
+        paths.append(path)
+    return paths
+
+@pytest.mark.parametrize("path", submission_workbooks())
+def test_matches_baseline(path):
+    raw = read_workbook(path)
+    expected = baseline_extract(raw)
+    extracted_df = extract_gps_data_from_excel(raw)
+
+    assert len(extracted_df) == len(expected)
+    for column in ["District", "Chiefdom"]:
+        pd.testing.assert_series_equal(
+            extracted_df[column].astype(object).where(extracted_df[column].notna(), None),
+            expected[column].astype(object).where(expected[column].notna(), None),
+            check_names=False,
+        )
+
+    located = extracted_df["GPS_Status"].to_numpy() == GPS_OK
+    expected_lat = expected["Latitude"].to_numpy(dtype=float)
+    expected_lon = expected["Longitude"].to_numpy(dtype=float)
+    np.testing.assert_allclose(extracted_df["Latitude"].to_numpy(dtype=float)[located], expected_lat[located], atol=1e-5)
+    np.testing.assert_allclose(extracted_df["Longitude"].to_numpy(dtype=float)[located], expected_lon[located], atol=1e-5)
+
+    # Every fix the original parsed is kept, unless it lies outside Sierra Leone
+    parsed = np.isfinite(expected_lat) & np.isfinite(expected_lon)
+    dropped = parsed & ~located
+    assert (extracted_df["GPS_Status"].to_numpy()[dropped] == GPS_OUT_OF_BOUNDS).all()
+
+def qr_export(*enrollments):
+    """Minimal export with one QR payload per enrollment text"""
+    return pd.DataFrame({
+        "Scan QR code": [f"District: BO\nChiefdom: Bumpe\nName of school: School {i}\nEnrollment: {value}"
+                         for i, value in enumerate(enrollments)],
+        "GPS Location": ["7.9 -11.7"] * len(enrollments),
+    })
+
+def test_enrollment_not_a_whole_number_is_missing():
+    extracted_df = extract_gps_data_from_excel(qr_export("157", "157.5", "1e30", "many"))
+
+    assert extracted_df["Enrollment"].iloc[0] == 157
+    assert extracted_df["Enrollment"].iloc[1:].isna().all()
+
+def test_enrollment_beyond_int32_is_missing():
+    extracted_df = extract_gps_data_from_excel(qr_export("2147483647", "3000000000", "-3000000000"))
+
+    assert extracted_df["Enrollment"].dtype == "Int32"
+    assert extracted_df["Enrollment"].iloc[0] == 2**31 - 1
+    assert extracted_df["Enrollment"].iloc[1:].isna().all()
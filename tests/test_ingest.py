@@ -0,0 +1,36 @@
+import os
+import shutil
+import threading
+
+from sbd import ingest
+from sbd.ingest import load_submissions
+
+WORKBOOK = "SBD_Submissions_07_01_2025.xlsx"
+
+
+def test_parse_does_not_block_other_workbooks(tmp_path, monkeypatch):
+    slow, fast = tmp_path / "slow.xlsx", tmp_path / "fast.xlsx"
+    for mtime, path in enumerate([slow, fast]):
+        shutil.copy(WORKBOOK, path)
+        os.utime(path, (mtime, mtime))  # Distinct cache keys
+    building, release = threading.Event(), threading.Event()
+    read_workbook = ingest.read_workbook
+
+    def slow_read(path, *args, **kwargs):
+        if path == slow:
+            building.set()
+            release.wait(5)
+        return read_workbook(path, *args, **kwargs)
+
+    monkeypatch.setattr(ingest, "read_workbook", slow_read)
+    worker = threading.Thread(target=load_submissions, args=(slow,))
+    worker.start()
+    try:
+        assert building.wait(5)
+        # Loaded while the other workbook is still being parsed
+        assert len(load_submissions(fast)) > 0
+        assert worker.is_alive()
+    finally:
+        release.set()
+        worker.join()
+    assert load_submissions(slow).equals(load_submissions(fast))
@@ -0,0 +1,27 @@
+import os
+import sys
+import types
+
+from sbd import render
+
+
+def test_workers_never_run_the_app_script(tmp_path, monkeypatch, capfd):
+    marker = tmp_path / "app_was_run"
+    app = tmp_path / "app.py"
+    app.write_text(f"open({str(marker)!r}, 'w').close()\n")
+    # Streamlit runs the app script as a __main__ module without a spec
+    app_main = types.ModuleType("__main__")
+    app_main.__file__ = str(app)
+    monkeypatch.setitem(sys.modules, "__main__", app_main)
+    monkeypatch.setattr(render, "RENDER_WORKERS", 2)
+
+    render.shutdown_pool()
+    try:
+        pids = render.run_tasks({task: (os.getpid, ()) for task in range(4)})
+    finally:
+        render.shutdown_pool()
+
+    assert os.getpid() not in pids.values()
+    assert sys.modules["__main__"] is app_main
+    assert not marker.exists()
+    assert "RuntimeWarning" not in capfd.readouterr().err
@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+from sbd.shared import DataLease, clear_shared, shared, shared_entries
+
+
+@pytest.fixture(autouse=True)
+def empty_store():
+    clear_shared()
+    yield
+    clear_shared()
+
+def test_loads_once_per_version():
+    calls = []
+    load = lambda: calls.append(1) or len(calls)
+    assert shared("data", 1, load) == 1
+    assert shared("data", 1, load) == 1
+    assert shared("data", 2, load) == 2
+    assert calls == [1, 1]
+
+def test_superseded_version_dropped_once_released():
+    first, second = DataLease(), DataLease()
+    shared("data", 1, lambda: "v1", first)
+    shared("data", 1, lambda: "v1", second)
+    shared("data", 2, lambda: "v2", first)
+    assert ("data", 1) in shared_entries()
+
+    shared("data", 2, lambda: "v2", second)
+    assert shared_entries() == {("data", 2): 2}
+
+def test_build_does_not_block_other_keys():
+    building, release = threading.Event(), threading.Event()
+
+    def slow_load():
+        building.set()
+        release.wait(5)
+        return "slow"
+
+    worker = threading.Thread(target=shared, args=("slow", 1, slow_load))
+    worker.start()
+    try:
+        assert building.wait(5)
+        # Served while the other build is still running
+        assert shared("fast", 1, lambda: "fast") == "fast"
+        assert ("slow", 1) not in shared_entries()
+    finally:
+        release.set()
+        worker.join()
+    assert shared("slow", 1, lambda: "rebuilt") == "slow"
+
+def test_concurrent_requests_for_one_version_build_once():
+    calls = []
+    started = threading.Barrier(4)
+
+    def load():
+        calls.append(1)
+        return object()
+
+    def request(results):
+        started.wait()
+        results.append(shared("data", 1, load))
+
+    results = []
+    threads = [threading.Thread(target=request, args=(results,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert len({id(value) for value in results}) == 1
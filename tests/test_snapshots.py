@@ -0,0 +1,65 @@
+import os
+
+import pandas as pd
+
+from sbd.coverage import chiefdom_counts, coverage_from_counts, summarize_districts
+from sbd.dedup import deduplicated_counts, find_duplicates
+from sbd.ingest import load_submissions
+from sbd import snapshots
+from sbd.snapshots import (
+    CAMPAIGN_YEAR, SNAPSHOT_FILES, campaign_year, coverage_history, district_history, ingest_snapshots, list_snapshots,
+    snapshot_counts, snapshot_time,
+)
+from sbd.targets import load_targets
+
+LATEST = "SBD_Final_data_dissemination_7_15_2025.xlsx"
+
+
+def test_year_comes_from_other_names_not_file_dates(tmp_path):
+    yearless = tmp_path / "SBD_07_02_lastest.xlsx"
+    yearless.touch()
+    os.utime(yearless, (0, 0))  # 1970
+
+    year = campaign_year(["SBD_07_01_2025_3PM.xlsx", yearless, "SBD_07_08_2025.xlsx"])
+    assert year == 2025
+    assert snapshot_time(yearless, year) == pd.Timestamp(2025, 7, 2)
+    assert snapshot_time("SBD_07_01_2025_3PM.xlsx") == pd.Timestamp(2025, 7, 1, 15)
+    assert snapshot_time(yearless) == pd.Timestamp(CAMPAIGN_YEAR, 7, 2)
+
+def test_latest_snapshot_matches_coverage_view(tmp_path):
+    assert ingest_snapshots([LATEST], tmp_path) == 1
+    history = coverage_history(load_targets(), tmp_path)
+
+    extracted_df = load_submissions(LATEST)
+    expected = deduplicated_counts(chiefdom_counts(extracted_df), extracted_df, find_duplicates(extracted_df))
+    actual = history.set_index(["District", "Chiefdom"])["Actual"]
+    assert actual[actual > 0].sort_index().to_dict() == expected.sort_index().to_dict()
+
+def test_every_snapshot_matches_full_recompute(tmp_path):
+    ingest_snapshots(SNAPSHOT_FILES, tmp_path)
+    counts = snapshot_counts(tmp_path)
+
+    stored = list_snapshots(tmp_path)
+    for snapshot, part in zip(stored["Snapshot"], stored["Path"]):
+        rows = pd.read_parquet(part)
+        expected = deduplicated_counts(chiefdom_counts(rows), rows, find_duplicates(rows))
+        assert counts[snapshot].sort_index().to_dict() == expected.sort_index().to_dict()
+
+    # Counted again from the stored repeat flags alone
+    snapshots._counts.clear()
+    pd.testing.assert_series_equal(snapshot_counts(tmp_path), counts)
+
+def test_history_follows_coverage_view_rules(tmp_path):
+    ingest_snapshots(SNAPSHOT_FILES, tmp_path)
+    targets = load_targets()
+    history = coverage_history(targets, tmp_path)
+    latest = history[history["Snapshot"] == history["Snapshot"].max()].drop(columns="Snapshot")
+
+    counts = snapshot_counts(tmp_path)
+    expected = coverage_from_counts(counts[counts.index.get_level_values("Snapshot").max()], targets)
+    pd.testing.assert_frame_equal(latest[latest["Actual"] > 0].reset_index(drop=True), expected)
+
+    districts = district_history(history)
+    latest_districts = districts[districts["Snapshot"] == districts["Snapshot"].max()]
+    pd.testing.assert_frame_equal(latest_districts.drop(columns="Snapshot").set_index("District"),
+                                  summarize_districts(latest))
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from sbd.clusters import build_cluster_index
+from sbd.dodge import MAX_RING_SIZE
+from sbd.webmap import school_level
+
+BOUNDS = (-12.0, 7.0, -11.0, 8.0)
+
+
+def points(*spots):
+    """School points frame with count schools at each (lat, lon, count), labelled in order"""
+    frame = pd.DataFrame([(lat, lon) for lat, lon, count in spots for _ in range(count)], columns=["Latitude", "Longitude"])
+    frame["Label"] = [f"School {i}" for i in range(len(frame))]
+    return frame
+
+def test_small_clusters_open_into_spread_schools():
+    schools = points((7.5, -11.5, 3), (7.2, -11.2, MAX_RING_SIZE + 1), (7.8, -11.8, 1))
+    level = school_level(build_cluster_index(schools), schools, BOUNDS)
+
+    assert sorted(level["Count"]) == [1, 1, 1, 1, MAX_RING_SIZE + 1]
+    opened = level[level["Label"].isin(["School 0", "School 1", "School 2"])]
+    assert len(opened) == 3
+    # Schools sharing one spot are spread apart around it
+    assert len(opened[["Latitude", "Longitude"]].drop_duplicates()) == 3
+    np.testing.assert_allclose(opened["Latitude"].mean(), 7.5, atol=1e-6)
+    assert level["Longitude"].is_monotonic_increasing